@@ -0,0 +1,38 @@
+import hashlib
+import json
+from collections import namedtuple
+
+from constants import ACCOUNTS_FILE, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID
+
+
+class Account(namedtuple('Account', ('token', 'chat_id'))):
+    """Practicum account and the Telegram chat that receives its statuses."""
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """Stable identifier of the account that does not expose the token."""
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16]
+
+    @property
+    def headers(self):
+        """Authorization headers for requests made on behalf of the account."""
+        return {'Authorization': f'OAuth {self.token}'}
+
+
+def read_accounts_file(path):
+    """Reads accounts from a JSON list of `{"token", "chat_id"}` objects."""
+    with open(path, encoding='utf-8') as file:
+        records = json.load(file)
+    return [Account(record['token'], record['chat_id']) for record in records]
+
+
+def load_accounts(path=ACCOUNTS_FILE, token=PRACTICUM_TOKEN,
+                  chat_id=TELEGRAM_CHAT_ID):
+    """Loads accounts from a JSON file or falls back to the .env account."""
+    if path is None:
+        if token is None or chat_id is None:
+            return []
+        return [Account(token, chat_id)]
+    return read_accounts_file(path)
@@ -0,0 +1,160 @@
+import argparse
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from constants import (
+    BACKFILL_CHUNK_SIZE,
+    BACKFILL_CONCURRENCY,
+    CURSOR_STORE_PATH,
+    ENDPOINT,
+)
+from accounts import load_accounts
+from circuit_breaker import get_breaker
+from cursor_store import open_cursor_store, shared_store_path
+from homework import check_response, fetch_api_answer, stream_api_answer
+from status_diff import HomeworkStateMap
+from streaming import should_stream
+
+
+logger = logging.getLogger('homework.backfill')
+
+
+def fetch_history(since, headers):
+    """Returns the homeworks updated after `since` and the server time.
+
+    Long histories are streamed, see `should_stream`.
+    """
+    if should_stream(since):
+        stream = stream_api_answer(since, headers)
+        try:
+            homeworks = list(stream)
+        finally:
+            stream.close()
+        return homeworks, stream.get('current_date')
+    response = fetch_api_answer(since, headers)
+    return check_response(response), response.get('current_date')
+
+
+class Backfill:
+    """Seeds cursors and homework states of many accounts from history.
+
+    `accounts` maps a cursor store key to the headers of the account.
+    Accounts are processed in chunks of `chunk_size`, with at most
+    `concurrency` requests in flight, and no notifications are sent. The
+    store is flushed after every chunk and accounts that already have a
+    cursor are skipped, so an interrupted run resumes after the last
+    saved chunk.
+    """
+
+    def __init__(self, accounts, cursor_store, since=0, fetch=fetch_history,
+                 concurrency=BACKFILL_CONCURRENCY,
+                 chunk_size=BACKFILL_CHUNK_SIZE, force=False, breaker=None):
+        self.accounts = accounts
+        self.cursor_store = cursor_store
+        self.since = since
+        self.fetch = fetch
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.force = force
+        self.breaker = breaker or get_breaker(ENDPOINT)
+        self.done = 0
+        self.failed = 0
+
+    def pending(self):
+        """Returns the keys of the accounts that still need a backfill."""
+        if self.force:
+            return list(self.accounts)
+        return [
+            key for key in self.accounts
+            if self.cursor_store.get(key) is None
+        ]
+
+    def _fetch(self, key):
+        """Fetches the history of one account."""
+        return self.breaker.call(self.fetch, self.since, self.accounts[key])
+
+    def _merge(self, key, homeworks, current_date):
+        """Adds fetched statuses to the saved ones and moves the cursor."""
+        states = HomeworkStateMap(self.cursor_store.get_homeworks(key))
+        states.update(homeworks)
+        self.cursor_store.set_homeworks(key, states.snapshot())
+        self.cursor_store.set(key, current_date)
+
+    def run(self):
+        """Backfills every pending account; returns done and failed counts."""
+        pending = self.pending()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for start in range(0, len(pending), self.chunk_size):
+                chunk = pending[start:start + self.chunk_size]
+                futures = [
+                    (key, executor.submit(self._fetch, key)) for key in chunk
+                ]
+                for key, future in futures:
+                    try:
+                        homeworks, current_date = future.result()
+                    except Exception as error:
+                        self.failed += 1
+                        logger.error(f'Backfill of {key} failed: {error}')
+                        continue
+                    self._merge(key, homeworks, current_date)
+                    self.done += 1
+                self.cursor_store.flush()
+                logger.info(
+                    f'Backfilled {self.done} of {len(pending)} accounts, '
+                    f'{self.failed} failed.'
+                )
+        return self.done, self.failed
+
+
+def parse_since(value):
+    """Parses a Unix timestamp or an ISO 8601 date, UTC unless specified."""
+    try:
+        return int(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def main():
+    """Imports past statuses of the configured accounts without notifying."""
+    parser = argparse.ArgumentParser(
+        description='Imports past homework statuses without notifications.'
+    )
+    parser.add_argument(
+        '--since', type=parse_since, default=0,
+        help='Unix timestamp or ISO date to import statuses from'
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=BACKFILL_CONCURRENCY
+    )
+    parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SIZE)
+    parser.add_argument(
+        '--force', action='store_true',
+        help='backfill accounts that already have a cursor'
+    )
+    args = parser.parse_args()
+
+    accounts = load_accounts()
+    if not accounts:
+        logger.critical('No accounts to backfill.')
+        sys.exit(1)
+    headers = {account.key: account.headers for account in accounts}
+
+    cursor_store = open_cursor_store(shared_store_path(CURSOR_STORE_PATH))
+    try:
+        done, failed = Backfill(
+            headers, cursor_store, args.since,
+            concurrency=args.concurrency, chunk_size=args.chunk_size,
+            force=args.force
+        ).run()
+    finally:
+        cursor_store.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""CPU time per poll with and without skipping unchanged answers.
+
+A local Practicum stand-in keeps the homeworks of the account between
+polls and moves on `--change-rate` of statuses per poll. Each mode polls
+`--polls` times through `fetch_api_answer` and `process_response`:
+`full` decodes and diffs every answer, `fingerprint` skips bodies equal
+to the last processed one and `etag` also lets the stand-in answer 304.
+The client CPU time is measured with `time.thread_time`, so the
+stand-in running in another thread is not counted.
+
+Run from the repository root:
+
+    python benchmarks/bench_conditional.py --homeworks 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stand_in import PracticumStandIn  # noqa: E402
+
+MODES = ('full', 'fingerprint', 'etag')
+
+
+class SilentBot:
+    """Bot stand-in that accepts every message."""
+
+    def send_message(self, chat_id, text):
+        pass
+
+
+def run(mode, homeworks, change_rate, polls):
+    """Returns client CPU microseconds per poll and the skipped share."""
+    import conditional
+    import homework
+    from status_diff import HomeworkStateMap
+
+    with PracticumStandIn(
+        homeworks=homeworks, change_rate=change_rate, stable=True,
+        etag=mode == 'etag'
+    ) as practicum:
+        homework.ENDPOINT = practicum.endpoint
+        homework.CONDITIONAL_REQUESTS = mode != 'full'
+        conditional._cache = None
+        cache = conditional.get_response_cache()
+        states = HomeworkStateMap()
+        bot = SilentBot()
+        started = time.thread_time()
+        for _ in range(polls):
+            answer = homework.fetch_api_answer(0, homework.HEADERS)
+            if homework.process_response(answer, states, bot):
+                cache.commit(homework.HEADERS)
+        elapsed = time.thread_time() - started
+    return elapsed / polls * 1e6, cache.stats()['short_circuited']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[10, 100, 1000]
+    )
+    parser.add_argument('--change-rate', type=float, default=0.001)
+    parser.add_argument('--polls', type=int, default=300)
+    args = parser.parse_args()
+
+    import homework
+
+    homework.logger.setLevel('INFO')
+    print(f'change_rate={args.change_rate} polls={args.polls}')
+    print(f'{"homeworks":>10} {"mode":>12} {"cpu us/poll":>12} {"skipped":>8}')
+    for count in args.homeworks:
+        for mode in MODES:
+            cpu, skipped = run(mode, count, args.change_rate, args.polls)
+            print(f'{count:>10} {mode:>12} {cpu:>12.0f} {skipped:>8.0%}')
+
+
+if __name__ == '__main__':
+    main()
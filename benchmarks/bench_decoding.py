@@ -0,0 +1,93 @@
+"""JSON decoding of API answers: backends and field projection.
+
+For each available backend the benchmark decodes a Practicum-like body of
+the given size in full mode and in fields-only mode, and reports the
+decode time and the memory retained by the decoded result (measured with
+`tracemalloc`). Fields-only mode still allocates the dropped values while
+parsing; what it saves is what stays alive until the next poll.
+
+Run from the repository root:
+
+    python benchmarks/bench_decoding.py --homeworks 100 1000 10000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import HOMEWORK_VERDICTS  # noqa: E402
+from decoding import Decoder, FAST_BACKENDS  # noqa: E402
+
+STATUSES = tuple(HOMEWORK_VERDICTS)
+
+
+def make_body(count):
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'username__hw{number}.zip',
+                'status': STATUSES[number % len(STATUSES)],
+                'reviewer_comment': 'Всё хорошо, но есть пара замечаний. ' * 4,
+                'date_updated': '2021-04-11T10:31:09Z',
+                'lesson_name': 'Итоговый проект спринта',
+            }
+            for number in range(count)
+        ],
+        'current_date': 1700000000,
+    }).encode()
+
+
+def available_backends():
+    names = ['json']
+    for name in FAST_BACKENDS:
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def retained_bytes(decoder, body):
+    tracemalloc.start()
+    data = decoder.decode(body)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[100, 1000, 10000]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"homeworks":>10} {"body KB":>8} {"backend":>8} {"mode":>7}'
+          f' {"decode ms":>10} {"retained KB":>12}')
+    for count in args.homeworks:
+        body = make_body(count)
+        number = max(1, 10000 // count)
+        for backend in available_backends():
+            for fields_only in (False, True):
+                decoder = Decoder(backend, fields_only)
+                seconds = min(timeit.repeat(
+                    lambda: decoder.decode(body), number=number,
+                    repeat=args.repeat
+                )) / number
+                retained = retained_bytes(decoder, body)
+                mode = 'fields' if fields_only else 'full'
+                print(f'{count:>10} {len(body) / 1024:>8.0f} {backend:>8}'
+                      f' {mode:>7} {seconds * 1000:>10.3f}'
+                      f' {retained / 1024:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Time to diff homework lists of growing size against the state map.
+
+Run from the repository root:
+
+    python benchmarks/bench_diff.py --homeworks 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from status_diff import HomeworkStateMap  # noqa: E402
+from validation import HomeworkRecord  # noqa: E402
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def make_homeworks(count, shift=0):
+    """Builds a synthetic list of validated homeworks."""
+    return [
+        HomeworkRecord(
+            number, f'hw{number}.zip',
+            STATUSES[(number + shift) % len(STATUSES)],
+            f'2021-04-11T10:{number % 60:02}:09Z',
+        )
+        for number in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[1000, 10000, 100000]
+    )
+    parser.add_argument('--changed', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"homeworks":>10} {"unchanged ms":>14} {"changed ms":>12}'
+          f' {"changes":>8}')
+    for count in args.homeworks:
+        homeworks = make_homeworks(count)
+        states = HomeworkStateMap()
+        states.update(homeworks)
+
+        step = max(1, int(1 / args.changed))
+        updated = list(homeworks)
+        for index in range(0, count, step):
+            homework = updated[index]
+            updated[index] = homework._replace(
+                status='reviewing' if homework.status != 'reviewing'
+                else 'approved'
+            )
+
+        unchanged = min(timeit.repeat(
+            lambda: states.diff(homeworks), number=1, repeat=args.repeat
+        ))
+        changed = min(timeit.repeat(
+            lambda: states.diff(updated), number=1, repeat=args.repeat
+        ))
+        print(f'{count:>10} {unchanged * 1000:>14.2f} {changed * 1000:>12.2f}'
+              f' {len(states.diff(updated)):>8}')
+
+
+if __name__ == '__main__':
+    main()
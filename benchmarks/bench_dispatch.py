@@ -0,0 +1,141 @@
+"""Notification latency under a fixed request budget: FIFO vs priority.
+
+Simulates `--accounts` students minute by minute. A student submits a
+homework (it goes to `reviewing`), gets a verdict after about
+`--review-hours`, fixes a rejected one in about half a day and sends the
+next homework about two days after an approval. Every account is due
+`RETRY_PERIOD` after its last poll, but only `--budget` polls a minute are
+allowed, fewer than are due. The FIFO dispatcher polls the longest
+overdue accounts first; the priority dispatcher uses `poll_priority`.
+The report shows how long status changes wait to be noticed.
+
+Run from the repository root:
+
+    python benchmarks/bench_dispatch.py --accounts 2000 --budget 100
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import RETRY_PERIOD  # noqa: E402
+from dispatch import PollQueue, poll_priority  # noqa: E402
+from status_diff import HomeworkStateMap  # noqa: E402
+from validation import HomeworkRecord  # noqa: E402
+
+MINUTE = 60
+
+
+class Student:
+    """Hidden homework status of one account and its known state."""
+
+    def __init__(self, rng, review_hours):
+        self.rng = rng
+        self.review = review_hours * 3600
+        self.homework = 0
+        self.status = None
+        self.changed_at = 0
+        self.next_change = rng.expovariate(1 / (2 * 86400))
+        self.known = HomeworkStateMap()
+        self.noticed = True
+        self.next_poll = rng.uniform(0, RETRY_PERIOD)
+
+    def advance(self, now):
+        """Moves the homework on if its next change has come."""
+        if now < self.next_change:
+            return
+        rng = self.rng
+        if self.status in (None, 'approved'):
+            self.homework += 1
+            self.status = 'reviewing'
+            delay = rng.expovariate(1 / self.review)
+        elif self.status == 'rejected':
+            self.status = 'reviewing'
+            delay = rng.expovariate(1 / self.review)
+        elif rng.random() < 0.6:
+            self.status = 'approved'
+            delay = rng.expovariate(1 / (2 * 86400))
+        else:
+            self.status = 'rejected'
+            delay = rng.expovariate(1 / (12 * 3600))
+        if self.noticed:
+            self.changed_at = now
+        self.noticed = False
+        self.next_change = now + delay
+
+    def poll(self, now):
+        """Returns the wait of an unnoticed change, `None` if there is none."""
+        self.next_poll = now + RETRY_PERIOD
+        if self.noticed:
+            return None
+        self.noticed = True
+        self.known.update([HomeworkRecord(
+            self.homework, f'hw{self.homework}.zip', self.status, now
+        )])
+        self.known.changed_at = now
+        return now - self.changed_at
+
+
+def simulate(dispatcher, accounts, budget, hours, review_hours, seed):
+    """Returns the waits of noticed changes in minutes."""
+    rng = random.Random(seed)
+    students = [Student(rng, review_hours) for _ in range(accounts)]
+    waits = []
+    warmup = 86400
+    now = 0
+    while now < warmup + hours * 3600:
+        now += MINUTE
+        for student in students:
+            student.advance(now)
+        due = [student for student in students if student.next_poll <= now]
+        if dispatcher == 'fifo':
+            due.sort(key=lambda student: student.next_poll)
+            chosen = due[:budget]
+        else:
+            queue = PollQueue()
+            for student in due:
+                queue.push(student, poll_priority(
+                    student.known, now - student.next_poll, now
+                ))
+            chosen = [queue.pop() for _ in range(min(budget, len(queue)))]
+        for student in chosen:
+            wait = student.poll(now)
+            if wait is not None and now > warmup:
+                waits.append(wait / MINUTE)
+    return sorted(waits)
+
+
+def percentile(values, share):
+    return values[max(0, int(len(values) * share) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--budget', type=int, default=100)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--review-hours', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    due_rate = args.accounts * MINUTE / RETRY_PERIOD
+    print(f'accounts={args.accounts} budget={args.budget} polls/min '
+          f'(due {due_rate:.0f}/min), {args.hours:g}h after a day of warm-up')
+    print(f'{"dispatcher":>10} {"changes":>8} {"mean min":>9} '
+          f'{"p50 min":>8} {"p90 min":>8} {"p99 min":>8}')
+    for dispatcher in ('fifo', 'priority'):
+        waits = simulate(
+            dispatcher, args.accounts, args.budget, args.hours,
+            args.review_hours, args.seed
+        )
+        print(f'{dispatcher:>10} {len(waits):>8} '
+              f'{sum(waits) / len(waits):>9.1f} '
+              f'{percentile(waits, 0.5):>8.1f} '
+              f'{percentile(waits, 0.9):>8.1f} '
+              f'{percentile(waits, 0.99):>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Polls per second of the asyncio engine as the account count grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_engine.py --latency 0.05 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from accounts import Account  # noqa: E402
+from engine import PollingEngine  # noqa: E402
+
+
+class SilentBot:
+    """Bot stand-in that accepts every message."""
+
+    def send_message(self, chat_id, text):
+        pass
+
+
+def make_fetch(latency):
+    """Builds a fetch function that simulates API latency."""
+    def fetch(timestamp, headers):
+        time.sleep(latency)
+        return {'homeworks': [], 'current_date': timestamp}
+    return fetch
+
+
+def run(account_count, latency, concurrency):
+    """Returns polls per second for one tick over `account_count` accounts."""
+    accounts = [Account(f'token-{i}', i) for i in range(account_count)]
+    engine = PollingEngine(
+        accounts, SilentBot(), concurrency=concurrency,
+        fetch=make_fetch(latency)
+    )
+    started = time.perf_counter()
+    asyncio.run(engine.run_tick())
+    elapsed = time.perf_counter() - started
+    engine.close()
+    return engine.polls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument(
+        '--accounts', type=int, nargs='+', default=[10, 100, 1000, 5000]
+    )
+    args = parser.parse_args()
+
+    print(f'latency={args.latency}s concurrency={args.concurrency}')
+    print(f'{"accounts":>10} {"polls/s":>12}')
+    for count in args.accounts:
+        rate = run(count, args.latency, args.concurrency)
+        print(f'{count:>10} {rate:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Telegram messages about errors under a flapping API: dedup vs digest.
+
+Simulates a day of polls every `--period` seconds against an API that
+fails on `--error-rate` of them with one of a few errors whose messages
+carry changing numbers. The old dedup sends an error unless it equals the
+last one sent; the aggregator sends the first error of a kind and one
+digest per window.
+
+Run from the repository root:
+
+    python benchmarks/bench_error_digest.py --error-rate 0.5
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from error_digest import ErrorAggregator  # noqa: E402
+from exceptions import (  # noqa: E402
+    ApiConnectionError,
+    HttpStatusNotOkError,
+    TickTimeoutError,
+)
+
+
+def flapping_errors(rng):
+    """Returns a random error of the kinds a flapping API causes."""
+    return rng.choice((
+        lambda: HttpStatusNotOkError(
+            f'Endpoint is not available. Status code {rng.choice((502, 503))}'
+        ),
+        lambda: ApiConnectionError(
+            f'Error Read timed out. (read timeout={rng.randint(5, 9)})'
+        ),
+        lambda: TickTimeoutError('Poll cycle deadline exceeded.'),
+    ))()
+
+
+class Clock:
+    """Clock moved by the simulation."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(ticks, period, error_rate, window, seed):
+    """Returns the messages sent by the old dedup and by the aggregator."""
+    rng = random.Random(seed)
+    clock = Clock()
+    errors = ErrorAggregator(window, clock)
+    previous_error_message = None
+    dedup_sent = digest_sent = 0
+    for _ in range(ticks):
+        if rng.random() < error_rate:
+            error = flapping_errors(rng)
+            error_message = f'Program error: {error}'
+            if error_message != previous_error_message:
+                previous_error_message = error_message
+                dedup_sent += 1
+            errors.record(error)
+        if errors.pending() is not None:
+            errors.delivered()
+            digest_sent += 1
+        clock.now += period
+    return dedup_sent, digest_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--period', type=float, default=600)
+    parser.add_argument('--window', type=float, default=3600)
+    parser.add_argument(
+        '--error-rate', type=float, nargs='+', default=[0.1, 0.5, 1.0]
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    ticks = int(24 * 3600 / args.period)
+    print(f'ticks={ticks} period={args.period}s window={args.window}s')
+    print(f'{"error rate":>10} {"dedup":>8} {"digest":>8}')
+    for rate in args.error_rate:
+        dedup, digest = simulate(
+            ticks, args.period, rate, args.window, args.seed
+        )
+        print(f'{rate:>10} {dedup:>8} {digest:>8}')
+
+
+if __name__ == '__main__':
+    main()
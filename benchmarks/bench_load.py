@@ -0,0 +1,141 @@
+"""End-to-end load benchmark against local Practicum and Telegram stand-ins.
+
+Drives the multi-account engine over real HTTP against the servers from
+`stand_in.py` and reports throughput, poll latency percentiles and peak
+memory. `--min-throughput` and `--max-p99` turn it into a regression gate:
+the script exits with status 1 if a threshold is missed.
+
+Run from the repository root:
+
+    python benchmarks/bench_load.py --accounts 2000 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stand_in import PracticumStandIn, TelegramStandIn  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Practicum stand-in latency, seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--homeworks', type=int, default=5,
+                        help='homeworks in every response')
+    parser.add_argument('--change-rate', type=float, default=0.05,
+                        help='share of statuses that change between polls')
+    parser.add_argument('--telegram-latency', type=float, default=0.005)
+    parser.add_argument('--telegram-rate', type=float, default=1000)
+    parser.add_argument('--min-throughput', type=float)
+    parser.add_argument('--max-p99', type=float)
+    return parser.parse_args()
+
+
+def run(args, practicum, telegram):
+    """Runs the engine for `args.ticks` ticks and returns the report."""
+    os.environ['PRACTICUM_ENDPOINT'] = practicum.endpoint
+    os.environ['POOL_MAXSIZE'] = str(args.concurrency)
+
+    from telebot import TeleBot, apihelper
+
+    from circuit_breaker import CircuitBreaker
+    from accounts import Account
+    from engine import PollingEngine
+    from homework import fetch_api_answer
+    from outbox import Outbox
+    from transport import get_transport, share_with_telegram
+
+    apihelper.API_URL = telegram.api_url
+    share_with_telegram(get_transport())
+    bot = TeleBot(token='1:bench')
+
+    durations = []
+
+    def timed_fetch(timestamp, headers):
+        started = time.perf_counter()
+        try:
+            return fetch_api_answer(timestamp, headers)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    outbox = Outbox(
+        bot, global_rate=args.telegram_rate, chat_rate=args.telegram_rate
+    )
+    outbox.start()
+    accounts = [
+        Account(f'token-{number}', number) for number in range(args.accounts)
+    ]
+    engine = PollingEngine(
+        accounts, bot, concurrency=args.concurrency, fetch=timed_fetch,
+        breaker=CircuitBreaker(practicum.endpoint), outbox=outbox
+    )
+
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        asyncio.run(engine.run_tick())
+    polled = time.perf_counter() - started
+    engine.close()
+    drained = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(durations, n=100)
+    return {
+        'polls': engine.polls,
+        'throughput': engine.polls / polled,
+        'p50': percentiles[49],
+        'p99': percentiles[98],
+        'sent': telegram.sent,
+        'outbox': outbox.stats(),
+        'drain': drained - polled,
+        'handshakes': get_transport().stats()['handshakes'],
+        'max_rss_mb': resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss / 1024,
+    }
+
+
+def main():
+    args = parse_args()
+    with PracticumStandIn(
+        latency=args.latency, error_rate=args.error_rate,
+        homeworks=args.homeworks, change_rate=args.change_rate
+    ) as practicum, TelegramStandIn(latency=args.telegram_latency) as telegram:
+        report = run(args, practicum, telegram)
+
+    print(f'accounts={args.accounts} ticks={args.ticks} '
+          f'concurrency={args.concurrency} latency={args.latency}s '
+          f'error_rate={args.error_rate} homeworks={args.homeworks}')
+    print(f'polls:          {report["polls"]}')
+    print(f'throughput:     {report["throughput"]:.1f} polls/s')
+    print(f'poll p50:       {report["p50"] * 1000:.1f} ms')
+    print(f'poll p99:       {report["p99"] * 1000:.1f} ms')
+    print(f'messages sent:  {report["sent"]} '
+          f'(coalesced {report["outbox"]["coalesced"]}, '
+          f'drain {report["drain"]:.2f}s)')
+    print(f'send latency:   avg {report["outbox"]["latency_avg"]:.3f}s, '
+          f'max {report["outbox"]["latency_max"]:.3f}s')
+    print(f'handshakes:     {report["handshakes"]}')
+    print(f'peak RSS:       {report["max_rss_mb"]:.1f} MB')
+
+    failed = False
+    if args.min_throughput and report['throughput'] < args.min_throughput:
+        print(f'FAIL: throughput below {args.min_throughput} polls/s')
+        failed = True
+    if args.max_p99 and report['p99'] > args.max_p99:
+        print(f'FAIL: p99 above {args.max_p99 * 1000:.0f} ms')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
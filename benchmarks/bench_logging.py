@@ -0,0 +1,94 @@
+"""Cost of logging on the polling thread: direct handler vs pipeline.
+
+Simulates polls that each log a few DEBUG lines and reports the time the
+calling thread spends in the logger and how many lines reach the output
+file, for the former synchronous `StreamHandler` and for `LogPipeline`.
+`--write-latency` makes every write slow, like stdout piped to a busy
+log collector.
+
+Run from the repository root:
+
+    python benchmarks/bench_logging.py --polls 20000 --write-latency 0.0001
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_pipeline import LOG_FORMAT, LogPipeline  # noqa: E402
+
+
+class SlowFile:
+    """File whose writes take at least `latency` seconds."""
+
+    def __init__(self, path, latency):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def poll(logger, number):
+    logger.debug('Start of message sending')
+    logger.debug(f'The structure of the API response is valid: {number}.')
+    logger.debug('No homework statuses have changed.')
+
+
+def run(logger, polls):
+    started = time.perf_counter()
+    for number in range(polls):
+        poll(logger, number)
+    return time.perf_counter() - started
+
+
+def count_lines(path):
+    with open(path, encoding='utf-8') as file:
+        return sum(1 for _ in file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--polls', type=int, default=20000)
+    parser.add_argument('--write-latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f'{"setup":>10} {"us/poll":>8} {"drain s":>8} {"lines":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for setup in ('direct', 'pipeline'):
+            path = os.path.join(directory, f'{setup}.log')
+            stream = SlowFile(path, args.write_latency)
+            logger = logging.getLogger(f'bench.{setup}')
+            logger.setLevel(logging.DEBUG)
+            logger.propagate = False
+            if setup == 'direct':
+                handler = logging.StreamHandler(stream)
+                handler.setFormatter(logging.Formatter(LOG_FORMAT))
+                logger.addHandler(handler)
+                pipeline = None
+            else:
+                pipeline = LogPipeline(stream=stream).attach(logger)
+            seconds = run(logger, args.polls)
+            drain_started = time.perf_counter()
+            if pipeline is not None:
+                pipeline.stop()
+            drain = time.perf_counter() - drain_started
+            stream.close()
+            print(f'{setup:>10} {seconds / args.polls * 1e6:>8.1f}'
+                  f' {drain:>8.2f} {count_lines(path):>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Shared Practicum rate limit: achieved rate and fairness between accounts.
+
+One heavy account (a backfill, say) queues `--heavy` requests at once,
+then `--light` accounts make one request each. Every request waits for
+the shared limiter of `--rate` requests per second. With one queue
+(`fifo`) the light accounts wait behind the whole backlog; with waiting
+served round-robin by account (`fair`) each waits about one turn.
+
+Run from the repository root:
+
+    python benchmarks/bench_rate_limit.py --rate 50 --heavy 100 --light 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import FairRateLimiter  # noqa: E402
+
+
+def run(mode, rate, heavy, light):
+    """Returns the achieved rate and the waits of light accounts."""
+    limiter = FairRateLimiter(rate, burst=1)
+    light_waits = []
+    lock = threading.Lock()
+
+    def request(key, light_account):
+        started = time.monotonic()
+        limiter.acquire(key if mode == 'fair' else None)
+        if light_account:
+            with lock:
+                light_waits.append(time.monotonic() - started)
+
+    threads = [
+        threading.Thread(target=request, args=('heavy', False))
+        for _ in range(heavy)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    while limiter.stats()['queued'] < heavy - 1:
+        time.sleep(0.001)
+    for index in range(light):
+        thread = threading.Thread(target=request, args=(index, True))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return (heavy + light) / elapsed, light_waits, limiter.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rate', type=float, default=50)
+    parser.add_argument('--heavy', type=int, default=100)
+    parser.add_argument('--light', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f'rate={args.rate}/s heavy={args.heavy} light={args.light}')
+    print(f'{"mode":>6} {"req/s":>8} {"light p50":>10} {"light max":>10}'
+          f' {"wait max":>9}')
+    for mode in ('fifo', 'fair'):
+        achieved, waits, stats = run(mode, args.rate, args.heavy, args.light)
+        print(
+            f'{mode:>6} {achieved:>8.1f} {statistics.median(waits):>9.2f}s'
+            f' {max(waits):>9.2f}s {stats["wait_max"]:>8.2f}s'
+        )
+
+
+if __name__ == '__main__':
+    main()
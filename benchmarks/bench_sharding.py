@@ -0,0 +1,105 @@
+"""Polling throughput of the sharded mode by number of worker processes.
+
+The Practicum stand-in runs in a process of its own; the supervisor
+starts the workers, each of them polls the accounts of its shard for
+`--duration` seconds in back-to-back ticks and adds its polls to a shared
+counter. Throughput should grow with the number of workers up to the
+number of cores (and of stand-in capacity).
+
+Run from the repository root:
+
+    python benchmarks/bench_sharding.py --accounts 2000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stand_in import PracticumStandIn  # noqa: E402
+
+
+def serve_practicum(homeworks, latency, ready):
+    with PracticumStandIn(latency=latency, homeworks=homeworks) as practicum:
+        ready.put(practicum.endpoint)
+        practicum.thread.join()
+
+
+class BenchWorker:
+    """Worker target that polls its shard in a loop for a fixed time."""
+
+    def __init__(self, accounts, duration, concurrency, endpoint):
+        self.accounts = accounts
+        self.duration = duration
+        self.concurrency = concurrency
+        self.endpoint = endpoint
+        self.polls = multiprocessing.Value('l', 0)
+
+    def __call__(self, shard, shards):
+        from circuit_breaker import CircuitBreaker
+        from engine import PollingEngine
+        from homework import logger
+        from sharding import shard_accounts
+
+        logger.setLevel('INFO')
+        engine = PollingEngine(
+            shard_accounts(self.accounts, shard, shards.value), bot=None,
+            concurrency=self.concurrency,
+            breaker=CircuitBreaker(self.endpoint),
+            send=lambda bot, chat_id, message: True
+        )
+        finish = time.monotonic() + self.duration
+        while time.monotonic() < finish:
+            asyncio.run(engine.run_tick())
+        engine.close()
+        with self.polls.get_lock():
+            self.polls.value += engine.polls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--homeworks', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve_practicum, args=(args.homeworks, args.latency, ready),
+        daemon=True
+    )
+    server.start()
+    endpoint = ready.get()
+    os.environ['PRACTICUM_ENDPOINT'] = endpoint
+    os.environ['CURSOR_STORE_PATH'] = ''
+
+    from accounts import Account
+    from supervisor import Supervisor
+
+    accounts = [
+        Account(f'token-{number}', number) for number in range(args.accounts)
+    ]
+    print(f'cores={os.cpu_count()} accounts={args.accounts} '
+          f'homeworks={args.homeworks}')
+    print(f'{"workers":>8} {"polls/s":>10}')
+    for workers in args.workers:
+        target = BenchWorker(
+            accounts, args.duration, args.concurrency, endpoint
+        )
+        supervisor = Supervisor(workers, target=target)
+        supervisor.start()
+        for process in supervisor.processes.values():
+            process.join()
+        print(f'{workers:>8} {target.polls.value / args.duration:>10.0f}')
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Memory of the per-account polling state: bytes per tracked account.
+
+Every account gets a cursor, a poll time and `--homeworks` tracked
+homeworks whose status strings are fresh objects, as after decoding an
+API answer. Compared layouts:
+
+- `dicts`: a dict of dicts per account, the naive multi-account version;
+- `objects`: one plain object per account with a dict of
+  `(status, date_updated)` tuples, the engine state before the table;
+- `table`: `StateTable`, with cursors in array columns, `__slots__`
+  records and statuses stored as `HomeworkStatus` members.
+
+Run from the repository root:
+
+    python benchmarks/bench_state_memory.py --accounts 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_table import StateTable  # noqa: E402
+from validation import HomeworkRecord  # noqa: E402
+
+STATUSES = (b'approved', b'reviewing', b'rejected')
+
+
+def make_homeworks(index, count):
+    """Returns homeworks with freshly allocated strings, like decoded JSON."""
+    return [
+        HomeworkRecord(
+            index * 10 + number, f'hw{number}.zip',
+            str(STATUSES[(index + number) % 3], 'ascii'),
+            f'2024-01-{number % 28 + 1:02d}T10:31:09Z'
+        )
+        for number in range(count)
+    ]
+
+
+class PlainState:
+    """Account state as the engine kept it before the table."""
+
+    def __init__(self, timestamp, homeworks):
+        self.timestamp = timestamp
+        self.next_poll_at = 0
+        self.errors = None
+        self.homework_states = {
+            homework.id: (homework.status, homework.date_updated)
+            for homework in homeworks
+        }
+        self.changed_at = None
+
+
+def build_dicts(accounts, homeworks, start):
+    states = {}
+    for index in range(accounts):
+        states[f'account-{index}'] = {
+            'timestamp': start + index,
+            'next_poll_at': time.monotonic(),
+            'errors': None,
+            'homeworks': {
+                homework.id: {
+                    'status': homework.status,
+                    'date_updated': homework.date_updated,
+                }
+                for homework in make_homeworks(index, homeworks)
+            },
+        }
+    return states
+
+
+def build_objects(accounts, homeworks, start):
+    states = {}
+    for index in range(accounts):
+        state = states[f'account-{index}'] = PlainState(
+            start + index, make_homeworks(index, homeworks)
+        )
+        state.next_poll_at = time.monotonic()
+    return states
+
+
+def build_table(accounts, homeworks, start):
+    states = StateTable()
+    for index in range(accounts):
+        state = states.add(f'account-{index}', start + index)
+        state.homework_states.update(make_homeworks(index, homeworks))
+        state.next_poll_at = time.monotonic()
+    return states
+
+
+def measure(build, accounts, homeworks):
+    """Returns the bytes per account held by the built state."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = build(accounts, homeworks, int(time.time()))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del states
+    return used / accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--accounts', type=int, nargs='+', default=[100000, 1000000]
+    )
+    parser.add_argument('--homeworks', type=int, nargs='+', default=[0, 1, 3])
+    args = parser.parse_args()
+
+    layouts = (
+        ('dicts', build_dicts),
+        ('objects', build_objects),
+        ('table', build_table),
+    )
+    print(f'{"accounts":>9} {"homeworks":>9}'
+          + ''.join(f' {name:>8}' for name, _ in layouts) + '  (bytes)')
+    for accounts in args.accounts:
+        for homeworks in args.homeworks:
+            sizes = [
+                measure(build, accounts, homeworks) for _, build in layouts
+            ]
+            print(f'{accounts:>9} {homeworks:>9}'
+                  + ''.join(f' {size:>8.0f}' for size in sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Status history writes: one commit per transition vs one per poll cycle.
+
+`--accounts` accounts are polled for `--ticks` cycles and a `--changes`
+share of them sees a status change each cycle. `per-row` commits every
+transition as it is seen, `per-tick` queues them with `record` and
+commits once per cycle with `flush`. The report shows the time spent
+writing per cycle and, on the filled database, the time of the two
+indexed queries: latest statuses of an account and the transitions of
+one cycle.
+
+Run from the repository root:
+
+    python benchmarks/bench_status_history.py --accounts 1000 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from status_diff import STATUS_CODES  # noqa: E402
+from status_history import StatusHistory  # noqa: E402
+from validation import HomeworkRecord  # noqa: E402
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+def transitions(rng, accounts, changes, tick):
+    """Returns the `(account, homework)` pairs changed in one cycle."""
+    changed = rng.sample(range(accounts), int(accounts * changes))
+    return [
+        (f'account-{index}', HomeworkRecord(
+            index, f'hw{index}.zip', STATUSES[(tick + index) % 3],
+            f'tick-{tick}'
+        ))
+        for index in changed
+    ]
+
+
+def write_per_row(history, cycle, observed_at):
+    """Commits every transition on its own, as it is seen."""
+    for account, homework in cycle:
+        with history.connection:
+            history.connection.execute(
+                'INSERT INTO transitions (account, homework, status, '
+                'date_updated, observed_at) VALUES (?, ?, ?, ?, ?)',
+                (account, homework.id, STATUS_CODES[homework.status],
+                 homework.date_updated, observed_at)
+            )
+
+
+def write_per_tick(history, cycle, observed_at):
+    """Queues the transitions and commits them together."""
+    for account, homework in cycle:
+        history.record(account, [homework], observed_at)
+    history.flush()
+
+
+def run(write, accounts, ticks, changes, seed):
+    """Returns write ms per cycle and query ms of the filled database."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        history = StatusHistory(os.path.join(directory, 'history.db'))
+        spent = 0
+        for tick in range(ticks):
+            cycle = transitions(rng, accounts, changes, tick)
+            started = time.perf_counter()
+            write(history, cycle, tick)
+            spent += time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(100):
+            history.latest(f'account-{rng.randrange(accounts)}')
+        latest = (time.perf_counter() - started) / 100
+        started = time.perf_counter()
+        for tick in range(10):
+            history.between(tick, tick + 1)
+        between = (time.perf_counter() - started) / 10
+        history.close()
+    return spent / ticks * 1000, latest * 1000, between * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--accounts', type=int, nargs='+', default=[1000, 5000]
+    )
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--changes', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f'ticks={args.ticks} changes={args.changes:.0%} per cycle')
+    print(f'{"accounts":>9} {"mode":>9} {"write ms/cycle":>15}'
+          f' {"latest ms":>10} {"range ms":>9}')
+    for accounts in args.accounts:
+        for name, write in (('per-row', write_per_row),
+                            ('per-tick', write_per_tick)):
+            write_ms, latest_ms, between_ms = run(
+                write, accounts, args.ticks, args.changes, args.seed
+            )
+            print(f'{accounts:>9} {name:>9} {write_ms:>15.1f}'
+                  f' {latest_ms:>10.3f} {between_ms:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Peak memory of reading a long history: whole body vs streaming.
+
+A local Practicum stand-in sends the history chunk by chunk, so the server
+side stays small. For each history size the benchmark runs the regular
+path (`fetch_api_answer`, `check_response`, diff) and the streaming path
+(`stream_api_answer`, `process_stream`) and reports the peak memory traced
+by `tracemalloc` while each ran. Sends are no-ops and the status map is
+not kept between homeworks, so only the cost of reading the answer is
+measured; the map itself grows with the number of distinct homeworks
+either way.
+
+Run from the repository root:
+
+    python benchmarks/bench_streaming.py --homeworks 1000 10000 50000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stand_in import PracticumStandIn  # noqa: E402
+
+
+class ForgetfulStateMap:
+    """Status map that sees every homework as changed and keeps nothing."""
+
+    def diff(self, homeworks):
+        return list(homeworks)
+
+    def update(self, homeworks):
+        pass
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[1000, 10000, 50000]
+    )
+    args = parser.parse_args()
+
+    with PracticumStandIn(chunked=True) as practicum:
+        os.environ['PRACTICUM_ENDPOINT'] = practicum.endpoint
+
+        import homework
+
+        homework.logger.setLevel('INFO')
+        headers = {'Authorization': 'OAuth bench'}
+        homework.send_message = lambda bot, message: True
+
+        def whole(timestamp):
+            response = homework.fetch_api_answer(timestamp, headers)
+            ForgetfulStateMap().diff(homework.check_response(response))
+
+        def streamed(timestamp):
+            stream = homework.stream_api_answer(timestamp, headers)
+            homework.process_stream(stream, ForgetfulStateMap(), None)
+
+        print(f'{"homeworks":>10} {"body MB":>8} {"whole s":>8}'
+              f' {"whole peak MB":>14} {"stream s":>9}'
+              f' {"stream peak MB":>15}')
+        for count in args.homeworks:
+            practicum.homeworks = count
+            body = homework.get_transport().get(
+                url=practicum.endpoint, headers=headers,
+                params={'from_date': 0}
+            ).content
+            whole_seconds, whole_peak = measure(lambda: whole(0))
+            stream_seconds, stream_peak = measure(lambda: streamed(0))
+            print(f'{count:>10} {len(body) / 2 ** 20:>8.1f}'
+                  f' {whole_seconds:>8.2f} {whole_peak / 2 ** 20:>14.1f}'
+                  f' {stream_seconds:>9.2f} {stream_peak / 2 ** 20:>15.1f}')
+            del body
+
+
+if __name__ == '__main__':
+    main()
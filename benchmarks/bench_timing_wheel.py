@@ -0,0 +1,159 @@
+"""Scheduling overhead and wake-up jitter of per-account poll timers.
+
+Overhead: `--accounts` timers due within `--period` seconds are inserted,
+then simulated time runs for one period and every timer that fires is
+rescheduled a period (with 10% jitter) later, as the engine does. The
+timing wheel is compared with a heap with lazy cancellation and with
+the former scan of every account on each wake-up.
+
+Jitter: the same number of timers are spread over one period of real
+time and waited for by sleeping until `next_expiry` for the first
+`--jitter-span` seconds; the report shows how late they fire, leaving
+out those that came due while the timers were being inserted.
+
+Run from the repository root:
+
+    python benchmarks/bench_timing_wheel.py --accounts 100000 1000000
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timing_wheel import TimingWheel  # noqa: E402
+
+
+class HeapTimers:
+    """Timers in a binary heap; cancelled entries are skipped when popped."""
+
+    def __init__(self):
+        self.heap = []
+        self.due = {}
+
+    def schedule(self, key, when):
+        self.due[key] = when
+        heapq.heappush(self.heap, (when, key))
+
+    def cancel(self, key):
+        self.due.pop(key, None)
+
+    def advance(self, now):
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            when, key = heapq.heappop(self.heap)
+            if self.due.get(key) == when:
+                del self.due[key]
+                expired.append(key)
+        return expired
+
+
+class ScanTimers:
+    """Due times in a dict scanned whole on every wake-up."""
+
+    def __init__(self):
+        self.due = {}
+
+    def schedule(self, key, when):
+        self.due[key] = when
+
+    def cancel(self, key):
+        self.due.pop(key, None)
+
+    def advance(self, now):
+        expired = [key for key, when in self.due.items() if when <= now]
+        for key in expired:
+            del self.due[key]
+        return expired
+
+
+def overhead(timers, accounts, period, step, seed=1):
+    """Returns microseconds per insert and per fired timer, and fired."""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for key in range(accounts):
+        timers.schedule(key, rng.uniform(0, period))
+    insert = (time.perf_counter() - started) / accounts
+    fired = 0
+    now = 0.0
+    started = time.perf_counter()
+    while now < period:
+        now += step
+        for key in timers.advance(now):
+            timers.schedule(key, now + period * rng.uniform(0.9, 1.1))
+            fired += 1
+    run = (time.perf_counter() - started) / max(fired, 1)
+    return insert * 1e6, run * 1e6, fired
+
+
+def jitter(accounts, period, span, tick, seed=1):
+    """Returns the lateness percentiles of timers waited for in real time."""
+    rng = random.Random(seed)
+    start = time.monotonic()
+    wheel = TimingWheel(start, tick=tick)
+    due = {}
+    for key in range(accounts):
+        due[key] = start + 0.5 + rng.uniform(0, period)
+        wheel.schedule(key, due[key])
+    lateness = []
+    began = time.monotonic()
+    end = began + span
+    while time.monotonic() < end:
+        delay = wheel.next_expiry() - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+        lateness.extend(
+            now - due[key] for key in wheel.advance(now) if due[key] > began
+        )
+    lateness.sort()
+    return len(lateness), [
+        lateness[int(len(lateness) * share) - 1] * 1000
+        for share in (0.5, 0.99, 1.0)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--accounts', type=int, nargs='+', default=[100_000, 1_000_000]
+    )
+    parser.add_argument('--period', type=float, default=600)
+    parser.add_argument('--step', type=float, default=1)
+    parser.add_argument('--jitter-span', type=float, default=10)
+    parser.add_argument('--tick', type=float, default=0.01)
+    parser.add_argument('--skip-scan', action='store_true')
+    args = parser.parse_args()
+
+    print(f'period={args.period}s wake-up every {args.step}s')
+    print(f'{"accounts":>10} {"timers":>8} {"insert us":>10} '
+          f'{"us/fired":>10} {"fired":>9}')
+    for count in args.accounts:
+        kinds = [('wheel', TimingWheel(0.0, tick=args.step)),
+                 ('heap', HeapTimers())]
+        if not args.skip_scan:
+            kinds.append(('scan', ScanTimers()))
+        for name, timers in kinds:
+            insert, run, fired = overhead(
+                timers, count, args.period, args.step
+            )
+            print(f'{count:>10} {name:>8} {insert:>10.2f} {run:>10.2f} '
+                  f'{fired:>9}')
+
+    print()
+    print(f'wake-up jitter, tick={args.tick}s, first {args.jitter_span}s')
+    print(f'{"accounts":>10} {"fired":>8} {"p50 ms":>8} {"p99 ms":>8} '
+          f'{"max ms":>8}')
+    for count in args.accounts:
+        fired, (p50, p99, worst) = jitter(
+            count, args.period, args.jitter_span, args.tick
+        )
+        print(f'{count:>10} {fired:>8} {p50:>8.2f} {p99:>8.2f} '
+              f'{worst:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
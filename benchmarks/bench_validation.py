@@ -0,0 +1,113 @@
+"""Compiled single-pass validator vs the former check chain.
+
+The former path called `check_response` twice per poll and validated every
+homework with its own chain of `isinstance`/key checks in `parse_status`.
+`legacy_validate` reproduces that chain for the whole list and then reads
+the fields the bot needs into the same `HomeworkRecord` tuples the compiled
+validator returns, so both sides produce the same result.
+
+Run from the repository root:
+
+    python benchmarks/bench_validation.py --homeworks 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import HOMEWORK_VERDICTS  # noqa: E402
+from exceptions import (  # noqa: E402
+    KeyNotFoundError,
+    NotDictTypeDataError,
+    NotListTypeDataError,
+    UnknownHomeworkError,
+)
+from validation import HomeworkRecord, validate_response  # noqa: E402
+
+STATUSES = tuple(HOMEWORK_VERDICTS)
+
+
+def legacy_check_response(response):
+    if not isinstance(response, dict):
+        raise NotDictTypeDataError(type(response))
+    if 'homeworks' not in response:
+        raise KeyNotFoundError('homeworks')
+    if not isinstance(response['homeworks'], list):
+        raise NotListTypeDataError(type(response['homeworks']))
+    if 'current_date' not in response:
+        raise KeyNotFoundError('current_date')
+    if len(response['homeworks']) == 0:
+        return False
+    return response['homeworks'][0]
+
+
+def legacy_check_homework(homework):
+    if not isinstance(homework, dict):
+        raise NotDictTypeDataError(type(homework))
+    if 'homework_name' not in homework:
+        raise KeyNotFoundError('homework_name')
+    if 'status' not in homework:
+        raise KeyNotFoundError('status')
+    if homework['status'] not in HOMEWORK_VERDICTS:
+        raise UnknownHomeworkError(homework['status'])
+    return homework
+
+
+def legacy_validate(response):
+    legacy_check_response(response)
+    legacy_check_response(response)
+    return [
+        HomeworkRecord(
+            homework.get('id'), homework['homework_name'],
+            homework['status'], homework.get('date_updated')
+        )
+        for homework in map(legacy_check_homework, response['homeworks'])
+    ]
+
+
+def make_response(count):
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'hw{number}.zip',
+                'status': STATUSES[number % len(STATUSES)],
+                'reviewer_comment': 'ok',
+                'date_updated': '2021-04-11T10:31:09Z',
+                'lesson_name': 'lesson',
+            }
+            for number in range(count)
+        ],
+        'current_date': 1700000000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[100, 1000, 10000]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"homeworks":>10} {"legacy ms":>10} {"compiled ms":>12}'
+          f' {"speedup":>8}')
+    for count in args.homeworks:
+        response = make_response(count)
+        number = max(1, 10000 // count)
+        legacy = min(timeit.repeat(
+            lambda: legacy_validate(response), number=number,
+            repeat=args.repeat
+        )) / number
+        compiled = min(timeit.repeat(
+            lambda: validate_response(response), number=number,
+            repeat=args.repeat
+        )) / number
+        print(f'{count:>10} {legacy * 1000:>10.3f} {compiled * 1000:>12.3f}'
+              f' {legacy / compiled:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""Local stand-ins for the Practicum API and the Telegram Bot API.
+
+Both servers run in background threads and accept keep-alive connections.
+`PracticumStandIn` answers homework status requests with a configurable
+latency, error rate, homework count and rate of status changes, and can
+send long histories chunk by chunk or answer 304 to a matching `ETag`;
+`TelegramStandIn` accepts `sendMessage` calls and counts them.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server that runs in a daemon thread."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, handler):
+        super().__init__(('127.0.0.1', 0), handler)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def count(self):
+        with self.lock:
+            self.requests += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in dict(headers).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def log_message(self, *args):
+        pass
+
+
+def iter_homeworks(count, change_rate, seed, owner=None):
+    """Yields homeworks where `change_rate` of statuses moved on.
+
+    Homework names belong to `owner`, or to `seed` if it is not given.
+    """
+    rng = random.Random(seed)
+    owner = seed if owner is None else owner
+    for number in range(count):
+        status = STATUSES[number % len(STATUSES)]
+        if rng.random() < change_rate:
+            status = rng.choice(STATUSES)
+        yield {
+            'id': number,
+            'homework_name': f'student_{owner}/hw{number}.zip',
+            'status': status,
+            'reviewer_comment': 'Комментарий ревьюера. ' * 4,
+            'date_updated': '2024-03-01T12:00:00Z',
+            'lesson_name': f'Спринт {number}',
+        }
+
+
+def make_homeworks(count, change_rate, seed, owner=None):
+    """Builds a homework list where `change_rate` of statuses moved on."""
+    return list(iter_homeworks(count, change_rate, seed, owner))
+
+
+class PracticumStandIn(StandInServer):
+    """Stand-in for `ENDPOINT` with tunable latency, errors and payload.
+
+    With `stable` an account keeps its homeworks between polls and only
+    `change_rate` of statuses move on; with `etag` the answer carries an
+    `ETag` and a matching `If-None-Match` gets 304.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, homeworks=1,
+                 change_rate=0.0, chunked=False, stable=False, etag=False):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.homeworks = homeworks
+        self.change_rate = change_rate
+        self.chunked = chunked
+        self.stable = stable
+        self.etag = etag
+        self.polls_by_token = {}
+        super().__init__(PracticumHandler)
+
+    @property
+    def endpoint(self):
+        return f'{self.url}/api/user_api/homework_statuses/'
+
+
+class PracticumHandler(Handler):
+
+    def do_GET(self):
+        server = self.server
+        server.count()
+        if server.latency:
+            time.sleep(server.latency)
+        if not self.headers.get('Authorization', '').startswith('OAuth '):
+            self.send_json(HTTPStatus.UNAUTHORIZED, {
+                'code': 'not_authenticated', 'source': '__response__'
+            })
+            return
+        if random.random() < server.error_rate:
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {})
+            return
+        token = self.headers['Authorization']
+        with server.lock:
+            poll = server.polls_by_token.get(token, 0)
+            server.polls_by_token[token] = poll + 1
+        query = parse_qs(urlparse(self.path).query)
+        from_date = int(query.get('from_date', ['0'])[0])
+        current_date = max(from_date, int(time.time()))
+        if server.chunked:
+            self.send_history(hash((token, poll)), current_date)
+            return
+        owner = zlib.crc32(token.encode()) if server.stable else None
+        homeworks = make_homeworks(
+            server.homeworks, server.change_rate, hash((token, poll)), owner
+        )
+        if not server.etag:
+            self.send_json(HTTPStatus.OK, {
+                'homeworks': homeworks, 'current_date': current_date,
+            })
+            return
+        etag = '"%x"' % zlib.crc32(json.dumps(homeworks).encode())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_json(HTTPStatus.OK, {
+            'homeworks': homeworks, 'current_date': current_date,
+        }, {'ETag': etag})
+
+    def send_history(self, seed, current_date, batch=100):
+        """Sends the homework list in chunks without building it whole."""
+        server = self.server
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.send_chunk(b'{"homeworks": [')
+        parts = []
+        homeworks = iter_homeworks(server.homeworks, server.change_rate, seed)
+        for number, homework in enumerate(homeworks):
+            parts.append((',' if number else '') + json.dumps(homework))
+            if len(parts) == batch:
+                self.send_chunk(''.join(parts).encode())
+                parts = []
+        parts.append(f'], "current_date": {current_date}}}')
+        self.send_chunk(''.join(parts).encode())
+        self.send_chunk(b'')
+
+
+class TelegramStandIn(StandInServer):
+    """Stand-in for the Bot API that accepts every `sendMessage`."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sent = 0
+        super().__init__(TelegramHandler)
+
+    @property
+    def api_url(self):
+        return self.url + '/bot{0}/{1}'
+
+
+class TelegramHandler(Handler):
+
+    def reply(self):
+        server = self.server
+        server.count()
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.sent += 1
+            message_id = server.sent
+        self.send_json(HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': 1, 'type': 'private'},
+            'text': '',
+        }})
+
+    do_GET = reply
+    do_POST = reply
@@ -0,0 +1,149 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from constants import (
+    BACKOFF_BASE_DELAY,
+    BACKOFF_MAX_DELAY,
+    BREAKER_FAILURE_THRESHOLD,
+)
+from exceptions import (
+    CircuitOpenError,
+    FatalError,
+    RetryableError,
+    ThrottledError,
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def parse_retry_after(value, now=None):
+    """Converts a `Retry-After` header to seconds, `None` if unparsable."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0, retry_at - now)
+
+
+class CircuitBreaker:
+    """Circuit breaker with exponential backoff for one endpoint.
+
+    Retryable failures are retried after `base_delay`, doubling with every
+    consecutive failure up to `max_delay`. After `failure_threshold`
+    consecutive failures the circuit opens and rejects requests until the
+    backoff delay passes; then a single probe is let through (half-open)
+    and its result closes or reopens the circuit. A `Retry-After` received
+    with 429/503 opens the circuit for at least that long. Fatal errors do
+    not affect the circuit, and neither do requests that were never sent
+    because the local rate limit held them back.
+    """
+
+    def __init__(self, endpoint, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 base_delay=BACKOFF_BASE_DELAY, max_delay=BACKOFF_MAX_DELAY,
+                 clock=time.monotonic):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0
+        self._delay = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Checks whether a request may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.open_until:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Closes the circuit and resets the backoff."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._delay = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error):
+        """Registers a failed request and returns the delay before a retry.
+
+        Returns `None` for fatal errors, which should wait for the regular
+        polling schedule instead of being retried quickly.
+        """
+        if isinstance(error, FatalError) or not isinstance(
+                error, RetryableError):
+            with self._lock:
+                self._probe_in_flight = False
+                self._delay = None
+            return None
+
+        with self._lock:
+            self.failures += 1
+            delay = min(
+                self.max_delay, self.base_delay * 2 ** (self.failures - 1)
+            )
+            retry_after = getattr(error, 'retry_after', None)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if (retry_after is not None or self.state == HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.open_until = self.clock() + delay
+            self._probe_in_flight = False
+            self._delay = delay
+            return delay
+
+    def retry_delay(self):
+        """Returns the backoff delay after the last failure, if any."""
+        with self._lock:
+            return self._delay
+
+    def time_until_retry(self):
+        """Returns the seconds left until the open circuit lets a probe in."""
+        with self._lock:
+            return max(0, self.open_until - self.clock())
+
+    def call(self, func, *args, **kwargs):
+        """Calls `func` through the breaker and records the outcome."""
+        if not self.allow():
+            raise CircuitOpenError(f'Circuit for {self.endpoint} is open.')
+        try:
+            result = func(*args, **kwargs)
+        except ThrottledError:
+            with self._lock:
+                self._probe_in_flight = False
+            raise
+        except Exception as error:
+            self.record_failure(error)
+            raise
+        self.record_success()
+        return result
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint):
+    """Returns the circuit breaker shared by all requests to `endpoint`."""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
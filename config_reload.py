@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import signal
+from collections import namedtuple
+
+from dotenv import dotenv_values
+
+from accounts import load_accounts
+from constants import (
+    CONFIG_FILE,
+    CONFIG_RELOAD_INTERVAL,
+    DOTENV_KEYS,
+    POLL_IDLE_AFTER,
+    POLL_JITTER,
+    POLL_MAX_PERIOD,
+    POLL_MIN_PERIOD,
+    RETRY_PERIOD,
+    REVIEW_HOURS,
+)
+from exceptions import ConfigError
+from scheduler import AdaptiveSchedule, FixedSchedule
+
+
+logger = logging.getLogger('homework.config')
+
+Config = namedtuple('Config', ('telegram_token', 'accounts', 'schedule'))
+
+
+def read_settings(path=CONFIG_FILE):
+    """Returns the environment with the values of the config file on top.
+
+    Unlike `load_dotenv`, the file wins over the environment, so that its
+    edits take effect, and the values `load_dotenv` took from the file at
+    start-up are left out, so that a key deleted from it is gone.
+    """
+    settings = {
+        name: value for name, value in os.environ.items()
+        if name not in DOTENV_KEYS
+    }
+    if path and os.path.exists(path):
+        settings.update(
+            (name, value) for name, value in dotenv_values(path).items()
+            if value is not None
+        )
+    return settings
+
+
+def read_seconds(settings, name, default):
+    """Reads a positive whole number of seconds from the settings."""
+    value = int(settings.get(name, default))
+    if value <= 0:
+        raise ValueError(f'{name} must be positive, got {value}.')
+    return value
+
+
+def build_schedule(settings):
+    """Builds the polling schedule described by the settings."""
+    period = read_seconds(settings, 'RETRY_PERIOD', RETRY_PERIOD)
+    if settings.get('ADAPTIVE_POLLING', '').lower() not in (
+            '1', 'true', 'yes'):
+        return FixedSchedule(period)
+    return AdaptiveSchedule(
+        min_period=read_seconds(settings, 'POLL_MIN_PERIOD', POLL_MIN_PERIOD),
+        base_period=period,
+        max_period=read_seconds(settings, 'POLL_MAX_PERIOD', POLL_MAX_PERIOD),
+        idle_after=read_seconds(settings, 'POLL_IDLE_AFTER', POLL_IDLE_AFTER),
+        jitter=float(settings.get('POLL_JITTER', POLL_JITTER)),
+        review_hours=settings.get('REVIEW_HOURS', REVIEW_HOURS),
+    )
+
+
+def build_config(settings):
+    """Validates the settings and builds the config from them.
+
+    Raises `ConfigError` naming the first problem found, so a broken edit
+    is never applied half-way.
+    """
+    telegram_token = settings.get('TELEGRAM_TOKEN')
+    if not telegram_token:
+        raise ConfigError('TELEGRAM_TOKEN is missing.')
+    try:
+        accounts = load_accounts(
+            settings.get('ACCOUNTS_FILE'), settings.get('TOKEN'),
+            settings.get('TELEGRAM_CHAT_ID')
+        )
+        schedule = build_schedule(settings)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        raise ConfigError(f'{type(error).__name__}: {error}') from error
+    if not accounts:
+        raise ConfigError('No accounts to poll.')
+    for account in accounts:
+        if not isinstance(account.token, str) or not account.token:
+            raise ConfigError('An account has no Practicum token.')
+        if account.chat_id in (None, ''):
+            raise ConfigError(f'Account {account.key} has no chat id.')
+    return Config(telegram_token, accounts, schedule)
+
+
+def file_stamp(path):
+    """Returns what changes when a file is rewritten, `None` if it is gone."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_config(path=CONFIG_FILE):
+    """Reads and validates the current config."""
+    return build_config(read_settings(path))
+
+
+class ConfigWatcher:
+    """Applies a changed configuration to a running process.
+
+    The config file and the accounts file it names are checked every
+    `interval` seconds, and SIGHUP forces a reload. The new config is
+    built and validated whole before `apply` gets it; an invalid one is
+    logged and the running config stays.
+    """
+
+    def __init__(self, apply, path=CONFIG_FILE,
+                 interval=CONFIG_RELOAD_INTERVAL):
+        self.apply = apply
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self.rejected = 0
+        self._accounts_file = read_settings(path).get('ACCOUNTS_FILE')
+        self._stamps = self._read_stamps()
+
+    def _read_stamps(self):
+        """Returns the stamps of the watched files."""
+        return file_stamp(self.path), file_stamp(self._accounts_file)
+
+    def changed(self):
+        """Checks whether a watched file was modified since the last load."""
+        return self._read_stamps() != self._stamps
+
+    def reload(self):
+        """Reads, validates and applies the config; returns it or `None`."""
+        stamps = self._read_stamps()
+        settings = read_settings(self.path)
+        if settings.get('ACCOUNTS_FILE') != self._accounts_file:
+            self._accounts_file = settings.get('ACCOUNTS_FILE')
+            stamps = self._read_stamps()
+        self._stamps = stamps
+        try:
+            config = build_config(settings)
+        except ConfigError as error:
+            self.rejected += 1
+            logger.error(f'Configuration was not reloaded: {error}')
+            return None
+        self.apply(config)
+        self.reloads += 1
+        logger.info(
+            f'Configuration reloaded: {len(config.accounts)} accounts.'
+        )
+        return config
+
+    async def run(self):
+        """Reloads the config on SIGHUP or when a watched file changes."""
+        loop = asyncio.get_running_loop()
+        requested = asyncio.Event()
+        loop.add_signal_handler(signal.SIGHUP, requested.set)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(requested.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                if requested.is_set() or self.changed():
+                    requested.clear()
+                    self.reload()
+        finally:
+            loop.remove_signal_handler(signal.SIGHUP)
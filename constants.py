@@ -1,15 +1,167 @@
 import os
 
-from dotenv import load_dotenv
+from dotenv import find_dotenv, load_dotenv
 
+# Configuration reloaded without a restart (the .env file by default): it
+# is checked every CONFIG_RELOAD_INTERVAL seconds and re-read on SIGHUP.
+CONFIG_FILE = os.getenv('CONFIG_FILE') or find_dotenv() or '.env'
+CONFIG_RELOAD_INTERVAL = float(os.getenv('CONFIG_RELOAD_INTERVAL', 5))
 
-load_dotenv()
+# Names the config file added to the environment; a reload drops those
+# that were removed from the file.
+_inherited = frozenset(os.environ)
+load_dotenv(CONFIG_FILE)
+DOTENV_KEYS = frozenset(os.environ) - _inherited
 PRACTICUM_TOKEN = os.getenv('TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 RETRY_PERIOD = 600
 
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+# Multi-account polling settings.
+ACCOUNTS_FILE = os.getenv('ACCOUNTS_FILE')
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 100))
+
+# Where the `from_date` cursors of all accounts survive restarts: an SQLite
+# database (a .json path is mapped to the .db file next to it). Accounts
+# are keyed by `Account.key`; CURSOR_KEY is where the single-account bot
+# kept its cursor before. An empty value keeps cursors in memory.
+CURSOR_STORE_PATH = os.getenv('CURSOR_STORE_PATH', 'cursors.db')
+CURSOR_KEY = 'default'
+
+# SQLite database (WAL mode) where every notified status change is kept.
+# An empty value disables the history.
+STATUS_HISTORY_PATH = os.getenv('STATUS_HISTORY_PATH', 'history.db')
+
+# HTTP connection pool shared by the Practicum and Telegram requests:
+# number of hosts to keep pools for and open connections per host.
+POOL_CONNECTIONS = int(os.getenv('POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(os.getenv('POOL_MAXSIZE', POLL_CONCURRENCY))
+
+# Adaptive polling: poll every POLL_MIN_PERIOD seconds while a homework is
+# being reviewed, every RETRY_PERIOD after a recent change and every
+# POLL_MAX_PERIOD when idle or outside REVIEW_HOURS (UTC, "start-end").
+ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING', '').lower() in (
+    '1', 'true', 'yes'
+)
+POLL_MIN_PERIOD = int(os.getenv('POLL_MIN_PERIOD', 120))
+POLL_MAX_PERIOD = int(os.getenv('POLL_MAX_PERIOD', 1800))
+POLL_IDLE_AFTER = int(os.getenv('POLL_IDLE_AFTER', 3600))
+POLL_JITTER = float(os.getenv('POLL_JITTER', 0.1))
+REVIEW_HOURS = os.getenv('REVIEW_HOURS', '6-21')
+
+# Retries of transient API errors: the first retry comes after
+# BACKOFF_BASE_DELAY seconds, doubling up to BACKOFF_MAX_DELAY; after
+# BREAKER_FAILURE_THRESHOLD failures in a row the circuit opens.
+BACKOFF_BASE_DELAY = int(os.getenv('BACKOFF_BASE_DELAY', 5))
+BACKOFF_MAX_DELAY = int(os.getenv('BACKOFF_MAX_DELAY', 3600))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+
+# Requests to the Practicum API from the whole process: sustained rate per
+# second and burst size; 0 turns the limit off. Sharded workers split it.
+PRACTICUM_RATE = float(os.getenv('PRACTICUM_RATE', 0))
+PRACTICUM_BURST = int(os.getenv('PRACTICUM_BURST', 0)) or None
+
+# Outgoing Telegram messages: messages per second overall and per chat,
+# Bot API message length limit, and the delay before a failed send is
+# retried, doubling with every failure up to the maximum, in seconds.
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 25))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+TELEGRAM_MESSAGE_LIMIT = 4096
+OUTBOX_RETRY_DELAY = float(os.getenv('OUTBOX_RETRY_DELAY', 1))
+OUTBOX_RETRY_MAX_DELAY = float(os.getenv('OUTBOX_RETRY_MAX_DELAY', 300))
+# Messages still queued when the process stops are saved here and sent
+# after the restart; an empty value drops them.
+OUTBOX_SPOOL_PATH = os.getenv('OUTBOX_SPOOL_PATH', 'outbox-spool.json')
+
+# Timeouts in seconds: (connect, read) for every request to the Practicum
+# API and to Telegram, and the overall budget of one poll cycle.
+API_TIMEOUT = (
+    float(os.getenv('API_CONNECT_TIMEOUT', 5)),
+    float(os.getenv('API_READ_TIMEOUT', 30)),
+)
+TELEGRAM_TIMEOUT = (
+    float(os.getenv('TELEGRAM_CONNECT_TIMEOUT', 5)),
+    float(os.getenv('TELEGRAM_READ_TIMEOUT', 15)),
+)
+TICK_DEADLINE = float(os.getenv('TICK_DEADLINE', 60))
+# Time to finish the polls in flight, send queued messages and save the
+# state after SIGTERM or SIGINT; Heroku kills the dyno 30 seconds after
+# SIGTERM.
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 25))
+
+# Timing wheel of the per-account poll timers: resolution in seconds,
+# slots per level (as a power of two) and levels; the defaults reach
+# 2 ** (6 * 4) seconds, about 194 days.
+TIMER_TICK = float(os.getenv('TIMER_TICK', 1))
+TIMER_SLOT_BITS = int(os.getenv('TIMER_SLOT_BITS', 6))
+TIMER_LEVELS = int(os.getenv('TIMER_LEVELS', 4))
+
+# Order of the due polls when not all of them fit in POLL_CONCURRENCY:
+# besides the last known status, a change less than POLL_IDLE_AFTER
+# seconds ago adds up to DISPATCH_RECENT_WEIGHT and every RETRY_PERIOD of
+# lateness adds DISPATCH_OVERDUE_WEIGHT.
+DISPATCH_RECENT_WEIGHT = float(os.getenv('DISPATCH_RECENT_WEIGHT', 2))
+DISPATCH_OVERDUE_WEIGHT = float(os.getenv('DISPATCH_OVERDUE_WEIGHT', 1))
+
+# Repeated program errors are reported in one digest every
+# ERROR_DIGEST_WINDOW seconds; the first error of a kind is sent at once.
+ERROR_DIGEST_WINDOW = float(os.getenv('ERROR_DIGEST_WINDOW', 3600))
+
+# Prometheus metrics endpoint, served at /metrics when the port is set.
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0)) or None
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# JSON decoding of API answers: backend (auto, orjson, ujson or json) and
+# whether to keep only the fields the bot reads.
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+JSON_FIELDS_ONLY = os.getenv('JSON_FIELDS_ONLY', '').lower() in (
+    '1', 'true', 'yes'
+)
+
+# Skipping of unchanged API answers: conditional requests and a hash of
+# the last processed body per account.
+CONDITIONAL_REQUESTS = os.getenv('CONDITIONAL_REQUESTS', '1').lower() in (
+    '1', 'true', 'yes'
+)
+
+# Streaming of long histories, off (`never`) by default: `auto` streams
+# answers requested from a `from_date` older than STREAM_HISTORY_AGE
+# seconds, `always` streams every answer. The body is read in
+# STREAM_CHUNK_SIZE bytes and changes are sent for every STREAM_BATCH_SIZE
+# homeworks read.
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'never')
+STREAM_HISTORY_AGE = int(os.getenv('STREAM_HISTORY_AGE', 30 * 24 * 3600))
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 64 * 1024))
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 20))
+
+# Backfill of past statuses: requests in flight and accounts per chunk;
+# progress is saved after every chunk.
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', 20))
+BACKFILL_CHUNK_SIZE = int(os.getenv('BACKFILL_CHUNK_SIZE', 500))
+
+# Sharded mode (supervisor.py): worker processes (one by default),
+# virtual nodes per worker on the hash ring, restart backoff of crashed
+# workers and how often workers check for a new worker count, in seconds.
+SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', 1))
+SHARD_VNODES = int(os.getenv('SHARD_VNODES', 128))
+WORKER_RESTART_DELAY = float(os.getenv('WORKER_RESTART_DELAY', 1))
+WORKER_RESTART_MAX_DELAY = float(os.getenv('WORKER_RESTART_MAX_DELAY', 60))
+REBALANCE_INTERVAL = float(os.getenv('REBALANCE_INTERVAL', 1))
+
+# Logging: level of the lines written to stdout and records kept in memory
+# to be written out when an error is logged. Of the DEBUG lines repeated
+# from one call site only the first LOG_SAMPLE_BURST in every
+# LOG_SAMPLE_WINDOW seconds are written, then one in LOG_SAMPLE_EVERY.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+LOG_BUFFER_SIZE = int(os.getenv('LOG_BUFFER_SIZE', 1000))
+LOG_SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', 10))
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', 100))
+LOG_SAMPLE_WINDOW = float(os.getenv('LOG_SAMPLE_WINDOW', 60))
+
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
 HOMEWORK_VERDICTS = {
@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import tempfile
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+class MemoryCursorStore:
+    """Keeps `from_date` cursors and homework states in memory only.
+
+    Homework states are the rows of `HomeworkStateMap.snapshot`.
+    """
+
+    def __init__(self):
+        self._cursors = {}
+        self._dirty = set()
+        self._homeworks = {}
+        self._dirty_homeworks = set()
+
+    def get(self, key, default=None):
+        """Returns the saved cursor for `key` or `default`."""
+        return self._cursors.get(key, default)
+
+    def set(self, key, value):
+        """Stores a new cursor; it is persisted on the next `flush`."""
+        if self._cursors.get(key) != value:
+            self._cursors[key] = value
+            self._dirty.add(key)
+
+    def get_homeworks(self, key):
+        """Returns the saved homework states for `key`."""
+        return self._homeworks.get(key, [])
+
+    def set_homeworks(self, key, rows):
+        """Stores homework states; they are persisted on the next `flush`."""
+        self._homeworks[key] = rows
+        self._dirty_homeworks.add(key)
+
+    def reload(self, keys):
+        """Re-reads the given keys written by another process."""
+
+    def flush(self):
+        """Persists changed cursors and homework states."""
+        self._dirty.clear()
+        self._dirty_homeworks.clear()
+
+    def close(self):
+        """Flushes pending cursors and releases resources."""
+        self.flush()
+
+
+class FileCursorStore(MemoryCursorStore):
+    """Keeps cursors in a JSON file that is replaced atomically on flush.
+
+    Files written before homework states were stored hold the cursors
+    only and are still read.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._cursors, self._homeworks = self._read()
+
+    def _read(self):
+        """Returns the cursors and homework states saved in the file."""
+        if not os.path.exists(self.path):
+            return {}, {}
+        with open(self.path, encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data.get('cursors'), dict):
+            return data['cursors'], data.get('homeworks', {})
+        return data, {}
+
+    def reload(self, keys):
+        """Re-reads the given keys from the file."""
+        cursors, homeworks = self._read()
+        for key in keys:
+            if key in cursors:
+                self._cursors[key] = cursors[key]
+            if key in homeworks:
+                self._homeworks[key] = homeworks[key]
+
+    def flush(self):
+        """Writes the whole store to a temporary file and swaps it in."""
+        if not self._dirty and not self._dirty_homeworks:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'cursors': self._cursors, 'homeworks': self._homeworks},
+                    file
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        super().flush()
+
+
+class SQLiteCursorStore(MemoryCursorStore):
+    """Keeps cursors in SQLite, writing changed rows in one transaction.
+
+    Homework states of an account are kept as one JSON document.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS cursors '
+            '(key TEXT PRIMARY KEY, value INTEGER NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS homeworks '
+            '(key TEXT PRIMARY KEY, states TEXT NOT NULL)'
+        )
+        self._cursors = dict(
+            self.connection.execute('SELECT key, value FROM cursors')
+        )
+        self._homeworks = {
+            key: json.loads(states) for key, states in
+            self.connection.execute('SELECT key, states FROM homeworks')
+        }
+
+    def reload(self, keys):
+        """Re-reads the given keys from the database."""
+        for key in keys:
+            for (value,) in self.connection.execute(
+                'SELECT value FROM cursors WHERE key = ?', (key,)
+            ):
+                self._cursors[key] = value
+            for (states,) in self.connection.execute(
+                'SELECT states FROM homeworks WHERE key = ?', (key,)
+            ):
+                self._homeworks[key] = json.loads(states)
+
+    def flush(self):
+        """Upserts changed cursors and states in a single transaction."""
+        if not self._dirty and not self._dirty_homeworks:
+            return
+        cursors = [(key, self._cursors[key]) for key in self._dirty]
+        homeworks = [
+            (key, json.dumps(self._homeworks[key]))
+            for key in self._dirty_homeworks
+        ]
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO cursors (key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                cursors
+            )
+            self.connection.executemany(
+                'INSERT INTO homeworks (key, states) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET states = excluded.states',
+                homeworks
+            )
+        super().flush()
+
+    def close(self):
+        """Flushes pending cursors and closes the connection."""
+        self.flush()
+        self.connection.close()
+
+
+def shared_store_path(path):
+    """Returns a cursor store path several processes can write to.
+
+    A JSON file is rewritten whole by every flush, so the bot, the engine,
+    the workers and the backfill all use an SQLite database next to it
+    instead, and see the same cursors.
+    """
+    if not path or path.endswith(SQLITE_SUFFIXES):
+        return path
+    return os.path.splitext(path)[0] + '.db'
+
+
+def open_cursor_store(path):
+    """Chooses a cursor store by path: none, SQLite database or JSON file."""
+    if not path:
+        return MemoryCursorStore()
+    if path.endswith(SQLITE_SUFFIXES):
+        return SQLiteCursorStore(path)
+    return FileCursorStore(path)
@@ -0,0 +1,84 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from exceptions import TickTimeoutError
+
+_current_deadline = ContextVar('current_deadline', default=None)
+
+
+class Deadline:
+    """Time budget shared by all stages of one poll cycle."""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        """Returns the seconds left in the budget."""
+        return max(0, self.expires_at - self.clock())
+
+    def check(self, stage):
+        """Raises `TickTimeoutError` if the budget ran out before `stage`."""
+        if self.clock() >= self.expires_at:
+            raise TickTimeoutError(
+                f'Poll cycle deadline exceeded before {stage}.'
+            )
+
+    def shorten(self, seconds):
+        """Moves the end of the budget to at most `seconds` from now."""
+        self.expires_at = min(self.expires_at, self.clock() + seconds)
+
+    def clamp(self, timeout):
+        """Shortens a `(connect, read)` timeout to the remaining budget.
+
+        Raises `TickTimeoutError` if nothing is left, since a zero timeout
+        is rejected by `requests`.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise TickTimeoutError(
+                'Poll cycle deadline exceeded before the request.'
+            )
+        return tuple(min(value, remaining) for value in timeout)
+
+
+@contextmanager
+def tick_deadline(seconds):
+    """Sets the deadline of the poll cycle run inside the block."""
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def check_deadline(stage):
+    """Checks the current poll cycle deadline, if there is one."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def time_left():
+    """Returns the seconds left in the current poll cycle, if there is one."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline.remaining()
+
+
+def request_timeout(timeout):
+    """Returns `timeout` shortened to the current poll cycle deadline."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    return deadline.clamp(timeout)
+
+
+def shorten_deadline(seconds):
+    """Leaves the current poll cycle at most `seconds`, if there is one."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.shorten(seconds)
@@ -0,0 +1,87 @@
+import importlib
+import json
+
+from constants import JSON_BACKEND, JSON_FIELDS_ONLY
+
+# Every key the bot reads from a response: `current_date`, `homeworks` and
+# the `id`, `homework_name`, `status` and `date_updated` of each homework.
+NEEDED_FIELDS = frozenset((
+    'homeworks', 'current_date',
+    'id', 'homework_name', 'status', 'date_updated',
+))
+FAST_BACKENDS = ('orjson', 'ujson')
+
+
+def _project(pairs):
+    """Builds an object from the needed key-value pairs only."""
+    return {key: value for key, value in pairs if key in NEEDED_FIELDS}
+
+
+def _project_tree(data):
+    """Drops the keys the bot does not read from a decoded response."""
+    if not isinstance(data, dict):
+        return data
+    projected = _project(data.items())
+    homeworks = projected.get('homeworks')
+    if isinstance(homeworks, list):
+        projected['homeworks'] = [
+            _project(homework.items()) if isinstance(homework, dict)
+            else homework
+            for homework in homeworks
+        ]
+    return projected
+
+
+def load_backend(name=JSON_BACKEND):
+    """Returns the name and `loads` of the JSON backend to use.
+
+    `auto` picks the first installed fast backend and falls back to the
+    standard library.
+    """
+    candidates = FAST_BACKENDS if name == 'auto' else (name,)
+    for candidate in candidates:
+        if candidate == 'json':
+            break
+        try:
+            return candidate, importlib.import_module(candidate).loads
+        except ImportError:
+            if name != 'auto':
+                raise
+    return 'json', json.loads
+
+
+class Decoder:
+    """Decodes API bodies with the configured backend.
+
+    In `fields_only` mode only the keys listed in `NEEDED_FIELDS` are kept:
+    the standard library drops the others while parsing each object, a
+    fast backend decodes the body first and then projects it.
+    """
+
+    def __init__(self, backend=JSON_BACKEND, fields_only=JSON_FIELDS_ONLY):
+        self.backend, self._loads = load_backend(backend)
+        self.fields_only = fields_only
+
+    def decode(self, body):
+        """Decodes a JSON body; raises `ValueError` if it is invalid."""
+        if self.backend == 'json':
+            if self.fields_only:
+                return json.loads(body, object_pairs_hook=_project)
+            return json.loads(body)
+        data = self._loads(body)
+        return _project_tree(data) if self.fields_only else data
+
+    def decode_response(self, response):
+        """Decodes the body of an HTTP response."""
+        return self.decode(response.content)
+
+
+_decoder = None
+
+
+def get_decoder():
+    """Returns the process-wide decoder, creating it on first use."""
+    global _decoder
+    if _decoder is None:
+        _decoder = Decoder()
+    return _decoder
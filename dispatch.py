@@ -0,0 +1,59 @@
+import heapq
+import itertools
+import time
+
+from constants import (
+    DISPATCH_OVERDUE_WEIGHT,
+    DISPATCH_RECENT_WEIGHT,
+    POLL_IDLE_AFTER,
+    RETRY_PERIOD,
+)
+
+# How likely a homework in each status of HOMEWORK_VERDICTS is to change
+# soon: a reviewed one gets a verdict, a rejected one comes back for review
+# after a fix, an approved one is final. An account without homeworks may
+# send its first one.
+STATUS_WEIGHTS = {'reviewing': 4.0, 'rejected': 1.0, 'approved': 0.0}
+NO_HOMEWORK_WEIGHT = 0.5
+
+
+def poll_priority(homework_states, overdue=0, now=None,
+                  period=RETRY_PERIOD, idle_after=POLL_IDLE_AFTER,
+                  recent_weight=DISPATCH_RECENT_WEIGHT,
+                  overdue_weight=DISPATCH_OVERDUE_WEIGHT):
+    """Returns how soon an account should be polled; higher goes first.
+
+    It adds up the weight of the most promising known status, up to
+    `recent_weight` for a change less than `idle_after` seconds ago
+    (fading linearly) and `overdue_weight` for every `period` the poll is
+    late, so that no account waits forever.
+    """
+    statuses = homework_states.statuses()
+    priority = max(
+        (STATUS_WEIGHTS.get(status, 0) for status in statuses),
+        default=NO_HOMEWORK_WEIGHT
+    )
+    if homework_states.changed_at is not None:
+        now = time.time() if now is None else now
+        since = max(0, now - homework_states.changed_at)
+        priority += recent_weight * max(0, 1 - since / idle_after)
+    return priority + overdue_weight * overdue / period
+
+
+class PollQueue:
+    """Max-priority queue of accounts to poll; ties keep the push order."""
+
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, priority):
+        """Adds an item with the given priority."""
+        heapq.heappush(self._heap, (-priority, next(self._order), item))
+
+    def pop(self):
+        """Removes and returns the item with the highest priority."""
+        return heapq.heappop(self._heap)[2]
@@ -0,0 +1,474 @@
+import asyncio
+import contextvars
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot import TeleBot
+
+from constants import (
+    CURSOR_STORE_PATH,
+    ENDPOINT,
+    METRICS_HOST,
+    METRICS_PORT,
+    POLL_CONCURRENCY,
+    SHUTDOWN_TIMEOUT,
+    STATUS_HISTORY_PATH,
+    TICK_DEADLINE,
+)
+from circuit_breaker import get_breaker
+from conditional import UnchangedResponse, get_response_cache
+from config_reload import ConfigWatcher, load_config
+from cursor_store import (
+    FileCursorStore,
+    MemoryCursorStore,
+    open_cursor_store,
+    shared_store_path,
+)
+from deadline import check_deadline, tick_deadline
+from dispatch import PollQueue, poll_priority
+from error_digest import ErrorAggregator
+from exceptions import (
+    CircuitOpenError,
+    ConfigError,
+    RetryableError,
+    ThrottledError,
+    TickTimeoutError,
+)
+from homework import (
+    build_notifications,
+    check_response,
+    fetch_api_answer,
+    flush_history,
+    send_chat_message,
+)
+from metrics import POLL_LAG, REGISTRY, start_metrics_server
+from outbox import Outbox
+from rate_limit import get_rate_limiter
+from scheduler import make_schedule
+from state_table import StateTable
+from status_history import open_status_history
+from timing_wheel import TimingWheel
+from shutdown import SHUTDOWN_SIGNALS
+from transport import get_transport, share_with_telegram
+
+
+logger = logging.getLogger('homework.engine')
+
+
+class PollingEngine:
+    """Polls many accounts concurrently from a single event loop.
+
+    Blocking I/O (the Practicum request and the Telegram call) runs in a
+    thread pool, while a semaphore bounds the number of accounts that are
+    being polled at the same time. The next poll of every account is a
+    timer in a timing wheel, so finding the due accounts does not scan
+    them all.
+    """
+
+    def __init__(self, accounts, bot, concurrency=POLL_CONCURRENCY,
+                 fetch=fetch_api_answer, send=send_chat_message,
+                 cursor_store=None, schedule=None, breaker=None,
+                 outbox=None, tick_deadline=TICK_DEADLINE, history=None):
+        self.accounts = list(accounts)
+        self.bot = bot
+        self.concurrency = concurrency
+        self.fetch = fetch
+        self.send = send
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.cursor_store = cursor_store or MemoryCursorStore()
+        if isinstance(self.cursor_store, FileCursorStore) and len(
+                self.accounts) > 1:
+            logger.warning(
+                f'{self.cursor_store.path} is rewritten whole after every '
+                f'poll of {len(self.accounts)} accounts; use an SQLite '
+                'cursor store (.db) instead.'
+            )
+        self.schedule = schedule or make_schedule()
+        self.breaker = breaker or get_breaker(ENDPOINT)
+        self.outbox = outbox
+        self.tick_deadline = tick_deadline
+        self.history = history
+        self.timeouts = 0
+        self.throttled = 0
+        start = int(time.time())
+        self.states = StateTable()
+        for account in self.accounts:
+            self.states.add(
+                account.key, self.cursor_store.get(account.key, start),
+                self.cursor_store.get_homeworks(account.key)
+            )
+        self.timers = TimingWheel(time.monotonic())
+        for key in self.states:
+            self.timers.schedule(key, 0)
+        self._by_key = {account.key: account for account in self.accounts}
+        self.polls = 0
+        self.stopping = False
+        self._wakeup = asyncio.Event()
+
+    async def _run_blocking(self, func, *args):
+        """Runs a blocking call in the engine thread pool.
+
+        The call runs in a copy of the current context, so it sees the
+        deadline of the poll cycle it belongs to.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, context.run, func, *args
+        )
+
+    async def _notify(self, account, message):
+        """Sends a message to the account chat without blocking the loop.
+
+        With an outbox the message is only queued and sent in background.
+        """
+        if self.outbox is not None:
+            return self.outbox.put(account.chat_id, message)
+        return await self._run_blocking(
+            self.send, self.bot, account.chat_id, message
+        )
+
+    async def _deliver_changes(self, account, state, changed):
+        """Sends the changes in Telegram-sized messages, committing each.
+
+        Returns `False` if a message was not delivered; the changes of the
+        messages sent before it stay committed.
+        """
+        delivered = True
+        for batch, message in build_notifications(changed):
+            delivered = await self._notify(account, message)
+            if not delivered:
+                break
+            state.homework_states.update(batch)
+            if self.history is not None:
+                self.history.record(account.key, batch)
+        self.cursor_store.set_homeworks(
+            account.key, state.homework_states.snapshot()
+        )
+        return delivered
+
+    async def _process_response(self, account, state, response):
+        """Notifies the account chat about changed homeworks.
+
+        The cursor only moves forward once the notification is delivered,
+        so undelivered changes are fetched again on the next poll.
+        """
+        if isinstance(response, UnchangedResponse):
+            self._advance_cursor(account, state, response.current_date)
+            return
+        homeworks = check_response(response)
+        if homeworks:
+            changed = state.homework_states.diff(homeworks)
+            if changed and not await self._deliver_changes(
+                    account, state, changed):
+                return
+        self._advance_cursor(account, state, response.get('current_date'))
+        get_response_cache().commit(account.headers)
+
+    def _record_error(self, account, state, error):
+        """Logs a polling error and counts it for the account digest."""
+        logger.error(f'Account {account.key}: Program error: {error}')
+        if state.errors is None:
+            state.errors = ErrorAggregator()
+        state.errors.record(error)
+
+    async def _report_errors(self, account, state):
+        """Sends new errors and digests of repeated ones to the chat."""
+        message = state.errors.pending()
+        if message is not None and await self._notify(account, message):
+            state.errors.delivered()
+
+    async def _poll(self, account, state):
+        """Fetches the account statuses and processes them in time."""
+        with tick_deadline(self.tick_deadline):
+            response = await self._run_blocking(
+                self.breaker.call,
+                self.fetch, state.timestamp, account.headers
+            )
+            check_deadline('check_response')
+            await self._process_response(account, state, response)
+
+    async def poll_account(self, account, semaphore):
+        """Polls one account and notifies its chat about new statuses.
+
+        A poll that overruns `tick_deadline` is cancelled and counted in
+        `timeouts`; the account is retried after the backoff delay. One
+        that got no rate limit token in time is retried as quietly, without
+        telling the chat.
+        """
+        state = self.states[account.key]
+        retry_delay = None
+        async with semaphore:
+            if state.next_poll_at:
+                POLL_LAG.observe(max(0, time.monotonic() - state.next_poll_at))
+            try:
+                await asyncio.wait_for(
+                    self._poll(account, state), self.tick_deadline
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                retry_delay = self.breaker.base_delay
+                self._record_error(account, state, TickTimeoutError(
+                    'Poll cycle deadline exceeded.'
+                ))
+            except ThrottledError:
+                self.throttled += 1
+                retry_delay = self.breaker.base_delay
+                logger.debug(
+                    f'Account {account.key}: no rate limit token in time.'
+                )
+            except CircuitOpenError:
+                retry_delay = max(
+                    self.breaker.time_until_retry(), self.breaker.base_delay
+                )
+                logger.debug(f'Account {account.key}: circuit is open.')
+            except Exception as error:
+                if isinstance(error, RetryableError):
+                    retry_delay = self.breaker.retry_delay()
+                self._record_error(account, state, error)
+            finally:
+                self.polls += 1
+                state.next_poll_at = time.monotonic() + (
+                    retry_delay
+                    or self.schedule.next_delay(state.homework_states)
+                )
+                if self.states.get(account.key) is state:
+                    self.timers.schedule(account.key, state.next_poll_at)
+            if state.errors:
+                await self._report_errors(account, state)
+
+    def _advance_cursor(self, account, state, current_date):
+        """Moves the account `from_date` to the server time of the poll."""
+        if current_date:
+            state.timestamp = current_date
+            self.cursor_store.set(account.key, current_date)
+
+    def assign(self, accounts):
+        """Replaces the polled accounts, keeping the state of those that stay.
+
+        Cursors of the accounts that leave are flushed for their new owner,
+        those of the new accounts are reloaded from the store. Returns the
+        number of added and removed accounts.
+        """
+        accounts = list(accounts)
+        keys = {account.key for account in accounts}
+        removed = [key for key in self.states if key not in keys]
+        added = [
+            account for account in accounts if account.key not in self.states
+        ]
+        self.cursor_store.flush()
+        for key in removed:
+            del self.states[key]
+            self.timers.cancel(key)
+        self.cursor_store.reload([account.key for account in added])
+        start = int(time.time())
+        for account in added:
+            self.states.add(
+                account.key, self.cursor_store.get(account.key, start),
+                self.cursor_store.get_homeworks(account.key)
+            )
+            self.timers.schedule(account.key, 0)
+        self.accounts = accounts
+        self._by_key = {account.key: account for account in accounts}
+        self._wakeup.set()
+        return len(added), len(removed)
+
+    def apply_config(self, config):
+        """Swaps a reloaded config in between two polls.
+
+        It runs on the event loop, so every poll sees either the old config
+        or the new one. A new Telegram token replaces the bot, in the outbox
+        too; a new schedule applies from the next poll of each account.
+        Returns the number of added and removed accounts.
+        """
+        if config.telegram_token != getattr(self.bot, 'token', None):
+            self.bot = TeleBot(token=config.telegram_token)
+            if self.outbox is not None:
+                self.outbox.bot = self.bot
+        self.schedule = config.schedule
+        return self.assign(config.accounts)
+
+    def prioritize(self, accounts):
+        """Returns a queue of the accounts, most likely to notify first."""
+        now = time.monotonic()
+        wall_now = time.time()
+        queue = PollQueue()
+        for account in accounts:
+            state = self.states[account.key]
+            overdue = now - state.next_poll_at if state.next_poll_at else 0
+            queue.push(account, poll_priority(
+                state.homework_states, max(0, overdue), wall_now
+            ))
+        return queue
+
+    async def run_tick(self, accounts=None):
+        """Polls the given accounts (all by default) once each.
+
+        `concurrency` workers take the accounts from a priority queue, so
+        when not all of them can be polled at once, those most likely to
+        bring a notification go first.
+        """
+        if accounts is None:
+            accounts = self.accounts
+        queue = self.prioritize(accounts)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker():
+            while queue and not self.stopping:
+                await self.poll_account(queue.pop(), semaphore)
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.concurrency, len(queue))))
+        )
+        self.cursor_store.flush()
+        if self.history is not None:
+            flush_history(self.history)
+
+    def due_accounts(self, now):
+        """Returns accounts whose next poll time has come."""
+        return [self._by_key[key] for key in self.timers.advance(now)]
+
+    async def run_forever(self):
+        """Polls every account whenever its schedule says it is due.
+
+        Returns after `stop`, once the polls in flight have finished.
+        """
+        while not self.stopping:
+            due = self.due_accounts(time.monotonic())
+            if due:
+                started = time.monotonic()
+                await self.run_tick(due)
+                logger.debug(
+                    f'Polled {len(due)} accounts in '
+                    f'{time.monotonic() - started:.2f}s, '
+                    f'connections: {get_transport().stats()}, '
+                    f'outbox: {self.outbox and self.outbox.stats()}, '
+                    f'answers: {get_response_cache().stats()}, '
+                    f'rate limit: {get_rate_limiter().stats()}, '
+                    f'timeouts: {self.timeouts}, '
+                    f'throttled: {self.throttled}.'
+                )
+            await self._sleep_until_due()
+
+    async def _sleep_until_due(self):
+        """Waits for the next due account or for a change of accounts."""
+        timeout = None
+        wake_at = self.timers.next_expiry()
+        if wake_at is not None:
+            timeout = max(0, wake_at - time.monotonic())
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self):
+        """Asks `run_forever` to return without starting new polls."""
+        self.stopping = True
+        self._wakeup.set()
+
+    async def run_until_signalled(self, timeout=SHUTDOWN_TIMEOUT):
+        """Runs the engine until SIGTERM or SIGINT, then stops it.
+
+        Polls in flight get half of `timeout` to finish and are cancelled
+        after that; the other half is left to `close` for sending the
+        queued messages.
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+
+        def request_stop():
+            if not self.stopping:
+                logger.info('Shutdown requested, finishing polls in flight.')
+                self.stop()
+                loop.call_later(timeout / 2, task.cancel)
+
+        for signum in SHUTDOWN_SIGNALS:
+            loop.add_signal_handler(signum, request_stop)
+        try:
+            await self.run_forever()
+        except asyncio.CancelledError:
+            logger.warning('Polls in flight were cancelled at shutdown.')
+        finally:
+            for signum in SHUTDOWN_SIGNALS:
+                loop.remove_signal_handler(signum)
+
+    def register_metrics(self, registry=REGISTRY):
+        """Exposes engine, outbox and connection counters as gauges."""
+        registry.gauge(
+            'homework_poll_timeouts', 'Polls cancelled by the deadline.',
+            function=lambda: self.timeouts
+        )
+        registry.gauge(
+            'homework_accounts', 'Accounts polled by the engine.',
+            function=lambda: len(self.accounts)
+        )
+        registry.gauge(
+            'homework_http_handshakes', 'New HTTP connections opened.',
+            function=lambda: get_transport().stats()['handshakes']
+        )
+        if self.outbox is not None:
+            registry.gauge(
+                'homework_outbox_depth', 'Messages waiting to be sent.',
+                function=self.outbox.depth
+            )
+            registry.gauge(
+                'homework_outbox_latency_max_seconds',
+                'Longest wait of a message in the outbox.',
+                function=lambda: self.outbox.stats()['latency_max']
+            )
+
+    def close(self, timeout=None):
+        """Releases the thread pool, sends queued messages, saves cursors.
+
+        Messages the outbox cannot send within `timeout` are spooled.
+        """
+        self.executor.shutdown(wait=False)
+        if self.outbox is not None:
+            self.outbox.stop(timeout)
+        self.cursor_store.close()
+        if self.history is not None:
+            self.history.close()
+
+
+async def serve(engine, watcher):
+    """Runs the engine, applying config changes, until it is signalled."""
+    reloader = asyncio.create_task(watcher.run())
+    try:
+        await engine.run_until_signalled()
+    finally:
+        reloader.cancel()
+
+
+def main():
+    """Runs the multi-account polling engine."""
+    try:
+        config = load_config()
+    except ConfigError as error:
+        logger.critical(f'Invalid configuration: {error}')
+        sys.exit(1)
+
+    share_with_telegram(get_transport())
+    bot = TeleBot(token=config.telegram_token)
+    outbox = Outbox(bot)
+    outbox.start()
+    engine = PollingEngine(
+        config.accounts, bot,
+        cursor_store=open_cursor_store(shared_store_path(CURSOR_STORE_PATH)),
+        schedule=config.schedule, outbox=outbox,
+        history=open_status_history(STATUS_HISTORY_PATH)
+    )
+    watcher = ConfigWatcher(engine.apply_config)
+    if METRICS_PORT:
+        engine.register_metrics()
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+    try:
+        asyncio.run(serve(engine, watcher))
+    finally:
+        engine.close(SHUTDOWN_TIMEOUT / 2)
+
+
+if __name__ == '__main__':
+    main()
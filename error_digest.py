@@ -0,0 +1,139 @@
+import re
+import time
+
+from constants import ERROR_DIGEST_WINDOW
+
+VOLATILE_PARTS = re.compile(
+    r'[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}'
+    r'|0x[0-9a-f]+'
+    r'|\d+(?:\.\d+)?',
+    re.IGNORECASE
+)
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def normalize_message(message):
+    """Replaces numbers and ids in an error message so repeats match."""
+    return ' '.join(VOLATILE_PARTS.sub('<n>', message).split())
+
+
+def format_time(timestamp):
+    """Formats a Unix time as local date and time."""
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+
+class ErrorGroup:
+    """Errors of one class with the same normalized message."""
+
+    __slots__ = (
+        'name', 'message', 'count', 'reported', 'first_seen', 'last_seen',
+        'fresh'
+    )
+
+    def __init__(self, name, message, now):
+        self.name = name
+        self.message = message
+        self.count = 0
+        self.reported = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.fresh = True
+
+    def describe(self):
+        """Returns the digest line of the group."""
+        return (
+            f'{self.name} x{self.count} (first {format_time(self.first_seen)},'
+            f' last {format_time(self.last_seen)}): {self.message}'
+        )
+
+
+class ErrorAggregator:
+    """Groups errors by class and normalized message over a time window.
+
+    The first error of a group is reported at once, as before; its
+    repeats are only counted and reported in one digest with counts and
+    first/last-seen times when the window ends. A group that recurs in
+    the next window is not reported at once again. What `pending`
+    returned is marked as reported by `delivered`, so errors whose
+    message could not be sent go into the next one.
+    """
+
+    def __init__(self, window=ERROR_DIGEST_WINDOW, clock=time.time):
+        self.window = window
+        self.clock = clock
+        self._groups = {}
+        self._window_start = None
+        self._outgoing = None
+
+    def __len__(self):
+        return len(self._groups)
+
+    def record(self, error):
+        """Counts an error in its group."""
+        now = self.clock()
+        name = type(error).__name__
+        message = str(error)
+        key = (name, normalize_message(message))
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ErrorGroup(name, message, now)
+        if self._window_start is None:
+            self._window_start = now
+        if not group.count:
+            group.first_seen = now
+        group.message = message
+        group.count += 1
+        group.last_seen = now
+
+    def _roll(self, now):
+        """Starts a new window, keeping only the groups seen in this one."""
+        self._groups = {
+            key: group for key, group in self._groups.items() if group.count
+        }
+        for group in self._groups.values():
+            group.count = group.reported = 0
+            group.fresh = False
+        self._window_start = now if self._groups else None
+
+    def pending(self):
+        """Returns the message to send now or `None`.
+
+        It is either the first error of a new group or, once the window is
+        over, the digest of the errors that were not reported yet.
+        """
+        if not self._groups:
+            return None
+        now = self.clock()
+        due = now - self._window_start >= self.window
+        if due:
+            groups = [
+                group for group in self._groups.values()
+                if group.count > group.reported
+            ]
+            if not groups:
+                self._roll(now)
+                return None
+            self._outgoing = (groups, True)
+            return '\n'.join(
+                [f'Program errors over the last {self.window / 60:g} min:']
+                + [group.describe() for group in groups]
+            )
+        groups = [group for group in self._groups.values() if group.fresh]
+        if not groups:
+            return None
+        self._outgoing = (groups, False)
+        return '\n'.join(
+            f'Program error: {group.message}' for group in groups
+        )
+
+    def delivered(self):
+        """Marks the message returned by `pending` as sent."""
+        if self._outgoing is None:
+            return
+        groups, due = self._outgoing
+        self._outgoing = None
+        for group in groups:
+            group.reported = group.count
+            group.fresh = False
+        if due:
+            self._roll(self.clock())
@@ -1,20 +1,60 @@
-class HttpStatusNotOkError(Exception):
-    pass
+class RetryableError(Exception):
+    """Class responsible for errors that may go away if the request is repeated."""
 
-class NotDictTypeDataError(TypeError):
+class FatalError(Exception):
+    """Class responsible for errors that repeating the request will not fix."""
+
+class HttpStatusNotOkError(RetryableError):
+    """Class responsible for handling errors when the API answers not with 200."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class HttpClientError(HttpStatusNotOkError, FatalError):
+    """Class responsible for handling 4xx answers other than 429."""
+
+class TelegramSendError(RetryableError):
+    """Class responsible for handling messages the Bot API did not accept."""
+
+    def __init__(self, message, error_code=None, retry_after=None):
+        super().__init__(message)
+        self.error_code = error_code
+        self.retry_after = retry_after
+
+class TelegramChatError(TelegramSendError, FatalError):
+    """Class responsible for handling messages rejected with 400 or 403, such as for a blocked or missing chat."""
+
+class TickTimeoutError(RetryableError):
+    """Class responsible for handling poll cycles that ran out of time."""
+
+class ThrottledError(Exception):
+    """Class responsible for requests not sent because the local rate limit ran out of time."""
+
+class ShutdownRequested(BaseException):
+    """Class responsible for waking a waiting process up when it has to stop."""
+
+class CircuitOpenError(RetryableError):
+    """Class responsible for handling requests rejected by an open circuit breaker."""
+
+class ConfigError(ValueError, FatalError):
+    """Class responsible for handling invalid configuration."""
+
+class NotDictTypeDataError(TypeError, FatalError):
     """Class responsible for handling errors when the data type is not a dictionary."""
 
-class NotListTypeDataError(TypeError):
+class NotListTypeDataError(TypeError, FatalError):
     """Class responsible for handling errors when the data type is not a list."""
 
-class KeyNotFoundError(KeyError):
+class KeyNotFoundError(KeyError, FatalError):
     """Class responsible for handling errors when the key is not found."""
 
-class ApiConnectionError(Exception):
+class ApiConnectionError(RetryableError):
     """Class responsible for handling errors related to API issues."""
 
-class JsonTypeError(Exception):
+class JsonTypeError(RetryableError):
     """Class responsible for handling errors when the data is not in JSON format."""
 
-class UnknownHomeworkError(ValueError):
+class UnknownHomeworkError(ValueError, FatalError):
     """Class responsible for handling errors when the homework status is unknown."""
@@ -1,7 +1,9 @@
 import logging
+import sqlite3
 import sys
 import time
 from http import HTTPStatus
+from itertools import islice
 
 import requests
 from telebot import TeleBot, apihelper
@@ -9,34 +11,74 @@ from telebot import TeleBot, apihelper
 from constants import (
     PRACTICUM_TOKEN,
     TELEGRAM_CHAT_ID,
+    TELEGRAM_MESSAGE_LIMIT,
     TELEGRAM_TOKEN,
     RETRY_PERIOD,
     HOMEWORK_VERDICTS,
     ENDPOINT,
-    HEADERS
+    HEADERS,
+    CURSOR_STORE_PATH,
+    CURSOR_KEY,
+    STATUS_HISTORY_PATH,
+    API_TIMEOUT,
+    CONDITIONAL_REQUESTS,
+    STREAM_BATCH_SIZE,
+    STREAM_CHUNK_SIZE,
+    TICK_DEADLINE,
+    METRICS_PORT,
+    METRICS_HOST,
 )
+from accounts import Account
+from circuit_breaker import get_breaker, parse_retry_after
+from conditional import UnchangedResponse, get_response_cache
+from cursor_store import open_cursor_store, shared_store_path
+from decoding import get_decoder
+from deadline import (
+    check_deadline,
+    request_timeout,
+    tick_deadline,
+    time_left,
+)
+from error_digest import ErrorAggregator
+from log_pipeline import setup_logging
+from metrics import (
+    MESSAGES_SENT,
+    POLL_LAG,
+    record_error,
+    start_metrics_server,
+    timed,
+)
+from rate_limit import get_rate_limiter
+from scheduler import make_schedule
+from shutdown import GracefulShutdown
+from status_diff import HomeworkStateMap
+from status_history import open_status_history
+from streaming import HomeworkStream, should_stream
+from transport import get_transport, share_with_telegram
+from validation import HomeworkRecord, validate_homework, validate_response
 from exceptions import (
+    HttpClientError,
     HttpStatusNotOkError,
-    NotDictTypeDataError,
-    NotListTypeDataError,
-    KeyNotFoundError,
     ApiConnectionError,
     JsonTypeError,
-    UnknownHomeworkError,
+    TelegramChatError,
+    TelegramSendError,
+    ThrottledError,
+    TickTimeoutError,
 )
 
+RETRY_AFTER_STATUSES = (
+    HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE
+)
+# The .env account is stored under the key the engine and backfill use.
+ACCOUNT_KEY = Account(PRACTICUM_TOKEN or '', TELEGRAM_CHAT_ID).key
 
 # Logging settings.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-# Handler settings.
-handler = logging.StreamHandler(sys.stdout)
-handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter(
-    '%(asctime)s - %(levelname)s - %(message)s'
-)
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+# Handler settings: records are formatted, sampled and written to stdout
+# by a background thread.
+log_pipeline = setup_logging(logger)
 
 
 def check_tokens():
@@ -53,40 +95,125 @@ def check_tokens():
 
 def send_message(bot, message):
     """The function is responsible for sending messages to the user."""
+    return send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot, chat_id, message):
+    """The function is responsible for sending messages to the given chat."""
     try:
-        logger.debug('Start of message sending')
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-    except apihelper.ApiException as error:
+        return deliver_chat_message(bot, chat_id, message)
+    except TickTimeoutError:
+        raise
+    except TelegramSendError as error:
         logger.error(f'Error while sending the message: {error}')
-        return False
-    except requests.exceptions.RequestException as requests_error:
-        logger.error(f'Requests library error: {requests_error}')
+        record_error('send_message', error)
         return False
     except Exception as global_error:
         logger.error(f'Error while sending the message: {global_error}')
+        record_error('send_message', global_error)
         return False
-    else:
-        logger.debug('Message sent successfully')
-        return True
+
+
+@timed('send_message')
+def deliver_chat_message(bot, chat_id, message):
+    """Sends a message to the chat and returns True.
+
+    Raises `TelegramSendError` with the Bot API error code and
+    `retry_after` if the message was not sent.
+    """
+    check_deadline('send_message')
+    try:
+        logger.debug('Start of message sending')
+        bot.send_message(chat_id, message)
+    except apihelper.ApiTelegramException as error:
+        raise telegram_send_error(error) from error
+    except apihelper.ApiException as error:
+        raise TelegramSendError(f'Bot API error: {error}') from error
+    except requests.exceptions.RequestException as requests_error:
+        raise TelegramSendError(
+            f'Requests library error: {requests_error}'
+        ) from requests_error
+    logger.debug('Message sent successfully')
+    MESSAGES_SENT.inc()
+    return True
+
+
+def telegram_send_error(error):
+    """Builds the exception matching an error answer of the Bot API."""
+    code = error.error_code
+    message = f'Bot API error {code}: {error.description}'
+    if code == HTTPStatus.TOO_MANY_REQUESTS:
+        parameters = error.result_json.get('parameters') or {}
+        return TelegramSendError(message, code, parameters.get('retry_after'))
+    if code in (HTTPStatus.BAD_REQUEST, HTTPStatus.FORBIDDEN):
+        return TelegramChatError(message, code)
+    return TelegramSendError(message, code)
 
 
 def get_api_answer(timestamp):
     """The function is responsible for retrieving information from the API."""
+    return fetch_api_answer(timestamp, HEADERS)
+
+
+def http_status_error(response):
+    """Builds the exception matching an unexpected API status code."""
+    status = response.status_code
+    message = f'Error while making a request to the API: {status}'
+    if status in RETRY_AFTER_STATUSES:
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        return HttpStatusNotOkError(message, status, retry_after)
+    if HTTPStatus.BAD_REQUEST <= status < HTTPStatus.INTERNAL_SERVER_ERROR:
+        return HttpClientError(message, status)
+    return HttpStatusNotOkError(message, status)
+
+
+def request_api(timestamp, headers, stream=False):
+    """Requests the API and returns the response once its status is OK.
+
+    The request first waits for the shared rate limit, but not past the
+    poll cycle deadline; `ThrottledError` is raised if no token came.
+    """
+    check_deadline('get_api_answer')
+    if not get_rate_limiter().acquire(
+            headers.get('Authorization'), time_left()):
+        raise ThrottledError(
+            'No rate limit token before the poll cycle deadline.'
+        )
     data = {'params': {'from_date': timestamp},
-            'headers': HEADERS, 'url': ENDPOINT}
+            'headers': headers, 'url': ENDPOINT,
+            'timeout': request_timeout(API_TIMEOUT)}
+    if stream:
+        data['stream'] = True
     try:
-        response = requests.get(**data)
+        response = get_transport().get(**data)
 
     except requests.RequestException as error:
         raise ApiConnectionError(f'Error {error} while making'
                                  f'a request to the API: {error}')
 
-    if response.status_code != HTTPStatus.OK:
-        raise HttpStatusNotOkError('Error while making a request to the API:'
-                                   f'{requests.status_codes}')
+    if response.status_code not in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+        raise http_status_error(response)
+    return response
+
+
+@timed('get_api_answer')
+def fetch_api_answer(timestamp, headers):
+    """Retrieves information from the API with the given account headers.
 
+    An answer equal to the last processed one is not decoded: an
+    `UnchangedResponse` is returned instead.
+    """
+    if not CONDITIONAL_REQUESTS:
+        response = request_api(timestamp, headers)
+    else:
+        cache = get_response_cache()
+        response = request_api(timestamp, cache.request_headers(headers))
+        unchanged = cache.check(headers, response)
+        if unchanged is not None:
+            logger.debug('The API answer has not changed.')
+            return unchanged
     try:
-        data = response.json()
+        data = get_decoder().decode_response(response)
     except ValueError as error:
         raise JsonTypeError('JSON decoding error:'
                             f'{error}. Answer: {response.text}')
@@ -95,106 +222,255 @@ def get_api_answer(timestamp):
     return data
 
 
-def check_response(response):
-    """Checks that the API response matches the expected structure."""
-    if not isinstance(response, dict):
-        raise NotDictTypeDataError('The API response must'
-                                   f' be a dictionary, now: {type(response)}')
-
-    if 'homeworks' not in response:
-        raise KeyNotFoundError('The API response is'
-                               ' missing the key "homeworks".')
-
-    if not isinstance(response['homeworks'], list):
-        homework = response['homeworks']
-        raise NotListTypeDataError(f'The key "homeworks"'
-                                   ' must contain a list,'
-                                   f' now: {type(homework)}')
-
-    if 'current_date' not in response:
-        raise KeyNotFoundError('The API response is'
-                               ' missing the key ‘current_date.')
-
-    if len(response['homeworks']) == 0:
-        return False
+def read_body(response):
+    """Yields the response body in chunks and closes the response."""
+    try:
+        yield from response.iter_content(STREAM_CHUNK_SIZE)
+    except requests.RequestException as error:
+        raise ApiConnectionError(f'Error {error} while reading'
+                                 ' the API answer.')
+    finally:
+        response.close()
 
-    logger.debug('The structure of the API response is valid.')
 
-    return response['homeworks'][0]
+@timed('get_api_answer')
+def stream_api_answer(timestamp, headers):
+    """Requests the API and returns a stream over the homeworks it sends."""
+    response = request_api(timestamp, headers, stream=True)
+    logger.debug('Streaming the API answer.')
+    return HomeworkStream(read_body(response))
 
 
-def parse_status(homework):
-    """A function to generate a string with the homework check status."""
-    if not isinstance(homework, dict):
-        raise NotDictTypeDataError('The argument ‘homework’'
-                                   ' must be a dictionary,'
-                                   f' now: {type(homework)}')
+@timed('check_response')
+def check_response(response):
+    """Checks that the API response matches the expected structure.
 
-    if 'homework_name' not in homework:
-        raise KeyNotFoundError('The API response'
-                               'is missing the key "homeworks".')
+    The whole response, every homework included, is checked in one pass
+    by the validator compiled from `RESPONSE_SCHEMA`; the homeworks are
+    returned as `HomeworkRecord` tuples.
+    """
+    homeworks = validate_response(response)['homeworks']
+    logger.debug('The structure of the API response is valid.')
+    return homeworks
 
-    if 'status' not in homework:
-        raise KeyNotFoundError('The API response is missing the key "status".')
 
-    homework_name = homework['homework_name']
-    homework_status = homework['status']
+@timed('parse_status')
+def parse_status(homework):
+    """A function to generate a string with the homework check status."""
+    if not isinstance(homework, HomeworkRecord):
+        homework = validate_homework(homework)
+
+    verdict = HOMEWORK_VERDICTS[homework.status]
+    return ('Изменился статус проверки работы '
+            f'"{homework.homework_name}": {verdict}')
+
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Splits a text into parts of at most `limit` characters.
+
+    Parts end at line breaks where possible; a longer line is cut.
+    """
+    parts = []
+    part = ''
+    for line in text.split('\n'):
+        while len(line) > limit:
+            if part:
+                parts.append(part)
+                part = ''
+            parts.append(line[:limit])
+            line = line[limit:]
+        if part and len(part) + 1 + len(line) > limit:
+            parts.append(part)
+            part = line
+        else:
+            part = f'{part}\n{line}' if part else line
+    if part:
+        parts.append(part)
+    return parts
+
+
+def build_notifications(homeworks, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Joins the status messages of homeworks into Telegram-sized messages.
+
+    Returns `(homeworks, message)` pairs, so the homeworks of every
+    delivered message can be committed on their own.
+    """
+    notifications = []
+    batch, lines, length = [], [], -1
+    for homework in homeworks:
+        line = parse_status(homework)[:limit]
+        if batch and length + 1 + len(line) > limit:
+            notifications.append((batch, '\n'.join(lines)))
+            batch, lines, length = [], [], -1
+        batch.append(homework)
+        lines.append(line)
+        length += 1 + len(line)
+    if batch:
+        notifications.append((batch, '\n'.join(lines)))
+    return notifications
+
+
+def deliver_changes(bot, changed, homework_states, history=None):
+    """Sends the changed statuses and remembers each delivered message.
+
+    Returns `False` as soon as a message is not delivered; the changes
+    sent before it stay committed and are not sent again.
+    """
+    for batch, message in build_notifications(changed):
+        if not send_message(bot, message):
+            return False
+        homework_states.update(batch)
+        if history is not None:
+            history.record(ACCOUNT_KEY, batch)
+    return True
+
+
+def process_response(response, homework_states, bot, history=None):
+    """Response checking.
+
+    Sends one message about every homework whose status changed and returns
+    the server `current_date` to poll from next time, or `None` if the
+    notification could not be delivered and the same changes must be
+    fetched again. An unchanged answer is skipped. Delivered changes are
+    queued in `history`, if given.
+    """
+    check_deadline('check_response')
+    if isinstance(response, UnchangedResponse):
+        return response.current_date
+    homeworks = check_response(response)
+    if not homeworks:
+        logger.debug('The ‘homeworks’ list is empty.')
+        return response.get('current_date')
 
-    if homework_status not in HOMEWORK_VERDICTS:
-        raise UnknownHomeworkError('Unknown homework status:'
-                                   f' {homework_status}')
+    changed = homework_states.diff(homeworks)
+    if changed:
+        if not deliver_changes(bot, changed, homework_states, history):
+            return None
+    else:
+        logger.debug('No homework statuses have changed.')
+    return response.get('current_date')
 
-    verdict = HOMEWORK_VERDICTS[homework_status]
-    return f'Изменился статус проверки работы "{homework_name}": {verdict}'
 
+def process_stream(stream, homework_states, bot, history=None):
+    """Checks a streamed response while it is being received.
 
-def process_response(response, previous_message, bot):
-    """Response checking."""
-    if not check_response(response):
-        logger.debug('The ‘homeworks’ list is empty.')
-        return None, None
+    Homeworks are diffed in batches of `STREAM_BATCH_SIZE` and changes are
+    sent after every batch, so neither the body nor the list of changes
+    is ever held in memory whole. Returns `current_date` like
+    `process_response`.
+    """
+    check_deadline('check_response')
+    homeworks = iter(stream)
+    try:
+        while True:
+            batch = list(islice(homeworks, STREAM_BATCH_SIZE))
+            if not batch:
+                break
+            changed = homework_states.diff(batch)
+            if changed and not deliver_changes(
+                    bot, changed, homework_states, history):
+                return None
+    finally:
+        stream.close()
+    logger.debug(f'Streamed {stream.count} homeworks.')
+    return stream.get('current_date')
+
+
+def poll_api(timestamp, homework_states, bot, breaker, history=None):
+    """Fetches and processes one API answer.
+
+    Answers for an old `from_date` may hold the whole history and are
+    streamed; the rest are decoded at once.
+    """
+    if should_stream(timestamp):
+        stream = breaker.call(stream_api_answer, timestamp, HEADERS)
+        return process_stream(stream, homework_states, bot, history)
+    response = breaker.call(get_api_answer, timestamp)
+    return process_response(response, homework_states, bot, history)
+
+
+def report_errors(bot, errors):
+    """Sends new program errors and digests of repeated ones to Telegram."""
+    message = errors.pending()
+    if message is None:
+        return
+    try:
+        if all(send_message(bot, part) for part in split_message(message)):
+            errors.delivered()
+    except Exception as telegram_error:
+        logger.error(
+            'Error while sending error message to Telegram:'
+            f' {telegram_error}'
+        )
 
-    homework = check_response(response)
-    message = parse_status(homework)
 
-    if message != previous_message:
-        if send_message(bot, message):
-            return message, response.get('current_date')
-    return previous_message, None
+def flush_history(history):
+    """Writes the queued status changes; a failed write is retried later."""
+    try:
+        history.flush()
+    except sqlite3.Error as error:
+        logger.error(f'Status history was not saved: {error}')
 
 
 def main():
     """The main logic of the bot’s operation."""
     check_tokens()
+    share_with_telegram(get_transport())
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    previous_message = None
-    previous_error_message = None
-    response = get_api_answer(timestamp)
-
-    while True:
-        try:
-
-            response = get_api_answer(timestamp)
-            previous_message, new_timestamp = (
-                process_response(response, previous_message, bot))
-
-        except Exception as error:
-            error_message = f'Program error: {error}'
-            logger.error(error_message)
-            if error_message != previous_error_message:
-                try:
-                    if send_message(bot, error_message):
-                        previous_error_message = error_message
-
-                        previous_error_message = error_message
-                except Exception as telegram_error:
-                    logger.error(
-                        'Error while sending error message to Telegram:'
-                        f' {telegram_error}'
+    cursor_store = open_cursor_store(shared_store_path(CURSOR_STORE_PATH))
+    timestamp = cursor_store.get(
+        ACCOUNT_KEY, cursor_store.get(CURSOR_KEY, int(time.time()))
+    )
+    homework_states = HomeworkStateMap(
+        cursor_store.get_homeworks(ACCOUNT_KEY)
+        or cursor_store.get_homeworks(CURSOR_KEY)
+    )
+    history = open_status_history(STATUS_HISTORY_PATH)
+    schedule = make_schedule(RETRY_PERIOD)
+    breaker = get_breaker(ENDPOINT)
+    errors = ErrorAggregator()
+    scheduled_at = None
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+
+    with GracefulShutdown() as shutdown:
+        while True:
+            if scheduled_at is not None:
+                POLL_LAG.observe(max(0, time.monotonic() - scheduled_at))
+            try:
+
+                with tick_deadline(TICK_DEADLINE):
+                    new_timestamp = poll_api(
+                        timestamp, homework_states, bot, breaker, history
+                    )
+                if new_timestamp:
+                    timestamp = new_timestamp
+                    cursor_store.set(ACCOUNT_KEY, timestamp)
+                    cursor_store.set_homeworks(
+                        ACCOUNT_KEY, homework_states.snapshot()
                     )
-        finally:
-            time.sleep(RETRY_PERIOD)
+                    cursor_store.flush()
+                    get_response_cache().commit(HEADERS)
+
+            except ThrottledError as error:
+                logger.debug(f'Poll skipped: {error}')
+            except Exception as error:
+                logger.error(f'Program error: {error}')
+                errors.record(error)
+            finally:
+                if history is not None:
+                    flush_history(history)
+                report_errors(bot, errors)
+                delay = (breaker.retry_delay()
+                         or schedule.next_delay(homework_states))
+                scheduled_at = time.monotonic() + delay
+                with shutdown.waiting():
+                    time.sleep(delay)
+
+    cursor_store.close()
+    if history is not None:
+        history.close()
+    logger.info('The bot has stopped.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,159 @@
+import atexit
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+from constants import (
+    LOG_BUFFER_SIZE,
+    LOG_LEVEL,
+    LOG_SAMPLE_BURST,
+    LOG_SAMPLE_EVERY,
+    LOG_SAMPLE_WINDOW,
+)
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class SamplingFilter(logging.Filter):
+    """Thins out DEBUG records that repeat from the same line of code.
+
+    In every `window` seconds the first `burst` records of a call site
+    pass, then only one in `every`. Records of other levels always pass.
+    """
+
+    def __init__(self, burst=LOG_SAMPLE_BURST, every=LOG_SAMPLE_EVERY,
+                 window=LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.every = every
+        self.window = window
+        self._counts = {}
+        self._window_start = None
+        self.dropped = 0
+
+    def filter(self, record):
+        """Decides whether the record is written."""
+        if record.levelno > logging.DEBUG:
+            return True
+        if (self._window_start is None
+                or record.created - self._window_start >= self.window):
+            self._window_start = record.created
+            self._counts.clear()
+        site = (record.pathname, record.lineno)
+        count = self._counts.get(site, 0) + 1
+        self._counts[site] = count
+        if count <= self.burst or (count - self.burst) % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class FlightRecorder(logging.Handler):
+    """Passes records to `target` and remembers the ones it did not write.
+
+    The last `capacity` records that were filtered out or were below the
+    target level are kept in memory and written out, oldest first, right
+    before a record of `dump_level` or higher.
+    """
+
+    def __init__(self, target, capacity=LOG_BUFFER_SIZE,
+                 dump_level=logging.ERROR):
+        super().__init__()
+        self.target = target
+        self.dump_level = dump_level
+        self.buffer = deque(maxlen=capacity)
+
+    def emit(self, record):
+        """Writes the record, first dumping the buffer on an error."""
+        if record.levelno >= self.dump_level:
+            self.dump()
+        written = (
+            record.levelno >= self.target.level
+            and self.target.handle(record)
+        )
+        if not written:
+            self.buffer.append(record)
+
+    def dump(self):
+        """Writes the remembered records to the target and forgets them."""
+        if not self.buffer:
+            return
+        records, self.buffer = list(self.buffer), deque(
+            maxlen=self.buffer.maxlen
+        )
+        self.target.emit(logging.makeLogRecord({
+            'levelname': 'INFO', 'levelno': logging.INFO,
+            'msg': f'Flight recorder: {len(records)} earlier records.',
+        }))
+        for record in records:
+            self.target.emit(record)
+
+
+class LocalQueueHandler(QueueHandler):
+    """Puts records on a queue read by a thread of the same process.
+
+    The records never leave the process, so they are queued as they are
+    and formatted by the listener instead of the logging thread.
+    """
+
+    def prepare(self, record):
+        """Returns the record unchanged."""
+        return record
+
+
+class LogPipeline:
+    """Writes the records of a logger from a background thread.
+
+    The logger only puts records on a queue; formatting, sampling and
+    writing to `stream` happen in the listener thread. The listener is
+    restarted in processes forked from this one.
+    """
+
+    def __init__(self, stream=None, level=LOG_LEVEL,
+                 capacity=LOG_BUFFER_SIZE, sampling=None):
+        self.queue = SimpleQueue()
+        self.console = logging.StreamHandler(stream or sys.stdout)
+        self.console.setLevel(level)
+        self.console.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.sampling = sampling or SamplingFilter()
+        self.console.addFilter(self.sampling)
+        self.recorder = FlightRecorder(self.console, capacity)
+        self.handler = LocalQueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, self.recorder)
+        self._lock = threading.Lock()
+
+    def attach(self, logger):
+        """Routes the records of `logger` through the pipeline."""
+        logger.addHandler(self.handler)
+        self.start()
+        return self
+
+    def start(self):
+        """Starts the listener thread."""
+        with self._lock:
+            if self.listener._thread is None:
+                self.listener.start()
+
+    def stop(self):
+        """Writes out the queued records and stops the listener thread."""
+        with self._lock:
+            if self.listener._thread is not None:
+                self.listener.stop()
+
+    def _restart_in_child(self):
+        """Starts a new listener thread after a fork."""
+        self._lock = threading.Lock()
+        self.listener._thread = None
+        self.start()
+
+
+def setup_logging(logger, **kwargs):
+    """Attaches a `LogPipeline` to `logger` and stops it at exit."""
+    pipeline = LogPipeline(**kwargs).attach(logger)
+    atexit.register(pipeline.stop)
+    os.register_at_fork(after_in_child=pipeline._restart_in_child)
+    return pipeline
@@ -0,0 +1,285 @@
+import functools
+import logging
+import math
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger('homework.metrics')
+
+
+def _escape(value):
+    """Escapes a label value for the Prometheus text format."""
+    return (str(value).replace('\\', '\\\\')
+            .replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _format_labels(names, values, extra=()):
+    """Formats label pairs as `{name="value",...}`."""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    inner = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + inner + '}'
+
+
+def _format_value(value):
+    """Formats a sample value, including infinities."""
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """Base class of metrics with a fixed set of label names."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """Returns label values in the order of `labelnames`."""
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def samples(self):
+        """Yields `(suffix, label values, extra labels, value)` samples."""
+        raise NotImplementedError
+
+    def render(self):
+        """Returns the metric in the Prometheus text format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, values, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, values, extra)
+            lines.append(
+                f'{self.name}{suffix}{labels} {_format_value(value)}'
+            )
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Increases the counter of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Returns the current value of the given labels."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        """Yields one `_total` sample per label set."""
+        with self._lock:
+            items = list(self._values.items())
+        for values, value in items:
+            yield '_total', values, (), value
+
+
+class Gauge(Metric):
+    """Value that goes up and down, or is read from `function`."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        """Sets the gauge of the given labels."""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        """Yields the current values of the gauge."""
+        if self.function is not None:
+            yield '', (), (), self.function()
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for values, value in items:
+            yield '', values, (), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values over cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+
+    def observe(self, value, **labels):
+        """Records one observation."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(
+                key, ([0] * len(self.buckets), 0)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        """Returns the number of observations of the given labels."""
+        counts, _ = self._values.get(self._key(labels), ((), 0))
+        return sum(counts)
+
+    def samples(self):
+        """Yields cumulative buckets, sum and count per label set."""
+        with self._lock:
+            items = [
+                (values, list(counts), total)
+                for values, (counts, total) in self._values.items()
+            ]
+        for values, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield '_bucket', values, (('le', _format_value(bound)),), (
+                    cumulative
+                )
+            yield '_sum', values, (), total
+            yield '_count', values, (), cumulative
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Adds a metric, returning the one already registered by name."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        """Registers and returns a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        """Registers and returns a gauge."""
+        return self.register(
+            Gauge(name, documentation, labelnames, function)
+        )
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DEFAULT_BUCKETS):
+        """Registers and returns a histogram."""
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self):
+        """Returns all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    'homework_stage_seconds', 'Latency of pipeline stages.', ('stage',)
+)
+STAGE_ERRORS = REGISTRY.counter(
+    'homework_stage_errors', 'Pipeline stage errors by exception class.',
+    ('stage', 'exception')
+)
+MESSAGES_SENT = REGISTRY.counter(
+    'homework_messages_sent', 'Messages delivered to Telegram.'
+)
+POLL_ANSWERS = REGISTRY.counter(
+    'homework_poll_answers',
+    'API answers by outcome: changed, unchanged body or not modified.',
+    ('outcome',)
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    'homework_rate_limit_wait_seconds',
+    'Wait of Practicum requests for the shared rate limit.'
+)
+POLL_LAG = REGISTRY.histogram(
+    'homework_poll_lag_seconds',
+    'Delay between the scheduled and the actual start of a poll.'
+)
+
+
+def record_error(stage, error):
+    """Counts an error of a stage that handles its exceptions itself."""
+    STAGE_ERRORS.inc(stage=stage, exception=type(error).__name__)
+
+
+def timed(stage):
+    """Decorator recording latency and errors of a pipeline stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                record_error(stage, error)
+                raise
+            finally:
+                STAGE_SECONDS.observe(
+                    time.perf_counter() - started, stage=stage
+                )
+        return wrapper
+    return decorator
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry at `/metrics`."""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        """Returns the rendered registry."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.registry.render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Sends access logs to the debug log instead of stderr."""
+        logger.debug(format % args)
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Serves `/metrics` from a background thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    )
+    thread.start()
+    logger.debug(f'Metrics are served at http://{host}:{port}/metrics')
+    return server
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from constants import (
+    OUTBOX_RETRY_DELAY,
+    OUTBOX_RETRY_MAX_DELAY,
+    OUTBOX_SPOOL_PATH,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MESSAGE_LIMIT,
+)
+from exceptions import TelegramChatError
+from homework import deliver_chat_message, split_message
+from rate_limit import TokenBucket
+
+
+logger = logging.getLogger('homework.outbox')
+
+
+class Outbox:
+    """Queue of outgoing Telegram messages sent by a background thread.
+
+    Sending is limited by a global token bucket and one bucket per chat.
+    Messages that pile up for the same chat while it is rate limited are
+    coalesced into one message of at most `message_limit` characters.
+    `send` returns True once a message is sent; a false result or an
+    exception, such as `TelegramSendError`, is a failed send. A message
+    the chat cannot get, such as for a blocked bot or a missing chat
+    (`TelegramChatError`), is dropped and counted. Any other failure is
+    retried: after the `retry_after` of the Bot API if it sent one, else
+    after `retry_delay` seconds, doubling with every failure up to
+    `max_retry_delay`, while the other messages of the chat wait behind
+    it. Messages that are still queued when `stop` runs out of time are
+    saved to `spool_path` and queued again by the next `start`, together
+    with the batch that is being sent at that moment: it may then be
+    delivered twice, but is never lost.
+    """
+
+    def __init__(self, bot, send=deliver_chat_message,
+                 global_rate=TELEGRAM_GLOBAL_RATE,
+                 chat_rate=TELEGRAM_CHAT_RATE,
+                 message_limit=TELEGRAM_MESSAGE_LIMIT,
+                 retry_delay=OUTBOX_RETRY_DELAY,
+                 max_retry_delay=OUTBOX_RETRY_MAX_DELAY,
+                 spool_path=OUTBOX_SPOOL_PATH):
+        self.bot = bot
+        self.send = send
+        self.spool_path = spool_path
+        self.chat_rate = chat_rate
+        self.message_limit = message_limit
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.global_bucket = TokenBucket(global_rate)
+        self._chat_buckets = {}
+        self._pending = OrderedDict()
+        self._attempts = {}
+        self._retry_at = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._in_flight = None
+        self._spooled = False
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.latency_total = 0
+        self.latency_max = 0
+
+    def put(self, chat_id, message):
+        """Queues a message for the chat and returns immediately.
+
+        A message longer than `message_limit` is queued in parts.
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._pending.setdefault(chat_id, []).extend(
+                (part, now)
+                for part in split_message(message, self.message_limit)
+            )
+            self.max_depth = max(self.max_depth, self.depth())
+            self._condition.notify()
+        return True
+
+    def depth(self):
+        """Returns the number of queued messages."""
+        return sum(len(items) for items in self._pending.values())
+
+    def _chat_bucket(self, chat_id):
+        """Returns the rate limiter of the chat."""
+        if chat_id not in self._chat_buckets:
+            self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, 1)
+        return self._chat_buckets[chat_id]
+
+    def _take_batch(self, chat_id):
+        """Pops as many queued messages of the chat as fit in one message."""
+        items = self._pending[chat_id]
+        batch = [items.pop(0)]
+        length = len(batch[0][0])
+        while items and length + 1 + len(items[0][0]) <= self.message_limit:
+            length += 1 + len(items[0][0])
+            batch.append(items.pop(0))
+        if not items:
+            del self._pending[chat_id]
+        return batch
+
+    def _next_batch(self):
+        """Returns the next chat and batch allowed by the rate limits.
+
+        Returns `None` and the time to wait if nothing can be sent yet.
+        """
+        wait = self.global_bucket.wait_time()
+        if wait:
+            return None, wait
+        wait = None
+        now = time.monotonic()
+        for chat_id in self._pending:
+            retry_wait = self._retry_at.get(chat_id, now) - now
+            if retry_wait > 0:
+                wait = retry_wait if wait is None else min(wait, retry_wait)
+                continue
+            bucket = self._chat_bucket(chat_id)
+            chat_wait = bucket.wait_time()
+            if not chat_wait:
+                bucket.try_acquire()
+                self.global_bucket.try_acquire()
+                return (chat_id, self._take_batch(chat_id)), 0
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+        return None, wait
+
+    def _deliver(self, chat_id, batch):
+        """Sends a coalesced batch, requeueing it if the send fails."""
+        text = '\n'.join(message for message, _ in batch)
+        retry_after = None
+        try:
+            sent = self.send(self.bot, chat_id, text)
+        except TelegramChatError as error:
+            with self._condition:
+                self.dropped += len(batch)
+                self._attempts.pop(chat_id, None)
+                self._retry_at.pop(chat_id, None)
+            logger.error(
+                f'Dropped {len(batch)} messages to chat {chat_id}: {error}'
+            )
+            return
+        except Exception as error:
+            sent = False
+            retry_after = getattr(error, 'retry_after', None)
+            logger.debug(f'Sending to chat {chat_id} failed: {error}')
+        if sent:
+            now = time.monotonic()
+            with self._condition:
+                self.sent += 1
+                self.coalesced += len(batch) - 1
+                for _, enqueued_at in batch:
+                    latency = now - enqueued_at
+                    self.latency_total += latency
+                    self.latency_max = max(self.latency_max, latency)
+                self._attempts.pop(chat_id, None)
+                self._retry_at.pop(chat_id, None)
+            return
+
+        with self._condition:
+            if self._spooled:
+                self.failed += 1
+                logger.warning(
+                    f'Sending {len(batch)} messages to chat {chat_id} '
+                    'failed after stop, they are in the spool.'
+                )
+                return
+            attempts = self._attempts.get(chat_id, 0) + 1
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                delay = min(
+                    self.max_retry_delay,
+                    self.retry_delay * 2 ** (attempts - 1)
+                )
+            self.failed += 1
+            self._attempts[chat_id] = attempts
+            self._retry_at[chat_id] = time.monotonic() + delay
+            self._pending[chat_id] = batch + self._pending.get(chat_id, [])
+            self._pending.move_to_end(chat_id)
+        logger.warning(
+            f'Sending {len(batch)} messages to chat {chat_id} failed '
+            f'{attempts} times, retrying in {delay:g}s.'
+        )
+
+    def _run(self):
+        """Sends queued messages until stopped and the queue is empty."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                item, wait = self._next_batch()
+                if item is None:
+                    self._condition.wait(wait)
+                    continue
+                self._in_flight = item
+            try:
+                self._deliver(*item)
+            finally:
+                with self._condition:
+                    self._in_flight = None
+
+    def start(self):
+        """Queues the spooled messages and starts the background sender."""
+        for chat_id, message in self._read_spool():
+            self.put(chat_id, message)
+        self._stopping = False
+        self._spooled = False
+        self._thread = threading.Thread(
+            target=self._run, name='outbox', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Sends what is queued and stops the sender within `timeout`.
+
+        Returns the messages that were not sent in time, including the
+        batch still being sent; they are saved to the spool file.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._condition:
+            unsent = []
+            if self._in_flight is not None:
+                chat_id, batch = self._in_flight
+                unsent.extend((chat_id, message) for message, _ in batch)
+            unsent.extend(
+                (chat_id, message)
+                for chat_id, items in self._pending.items()
+                for message, _ in items
+            )
+            self._pending.clear()
+            self._spooled = True
+        if unsent:
+            self._write_spool(unsent)
+        return unsent
+
+    def _read_spool(self):
+        """Takes the messages saved by the previous `stop` out of the spool."""
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return []
+        with open(self.spool_path, encoding='utf-8') as file:
+            messages = json.load(file)
+        os.unlink(self.spool_path)
+        logger.info(f'Queued {len(messages)} messages from the spool.')
+        return messages
+
+    def _write_spool(self, messages):
+        """Saves messages to be sent after a restart."""
+        if not self.spool_path:
+            logger.error(f'Dropped {len(messages)} unsent messages.')
+            return
+        tmp_path = f'{self.spool_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(messages, file, ensure_ascii=False)
+        os.replace(tmp_path, self.spool_path)
+        logger.warning(
+            f'Saved {len(messages)} unsent messages to {self.spool_path}.'
+        )
+
+    def stats(self):
+        """Returns queue depth, delivery and latency counters."""
+        with self._condition:
+            delivered = self.sent + self.coalesced
+            return {
+                'depth': self.depth(),
+                'max_depth': self.max_depth,
+                'sent': self.sent,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'latency_avg': (
+                    self.latency_total / delivered if delivered else 0
+                ),
+                'latency_max': self.latency_max,
+            }
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from constants import PRACTICUM_BURST, PRACTICUM_RATE
+from metrics import RATE_LIMIT_WAIT
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` operations per second on average.
+
+    Up to `capacity` tokens accumulate while the bucket is not used, which
+    allows short bursts above the sustained rate.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Adds the tokens accumulated since the last call."""
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, tokens=1):
+        """Returns the seconds until `tokens` tokens are available."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Takes `tokens` tokens if they are available right now."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+
+class FairRateLimiter:
+    """Token bucket shared by many accounts that waits its turn fairly.
+
+    `acquire` blocks until a token is free. Waiting callers are served
+    round-robin by key, so one account with many requests in the queue
+    cannot hold the others back, and first come first served within a
+    key. A rate of 0 disables limiting but still counts requests.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.bucket = TokenBucket(rate, burst, clock) if rate else None
+        self.clock = clock
+        self._waiting = OrderedDict()
+        self._condition = threading.Condition()
+        self.requests = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.wait_total = 0
+        self.wait_max = 0
+
+    def _is_next(self, key, ticket):
+        """Checks whether the ticket is the next one to be served."""
+        first_key = next(iter(self._waiting))
+        return first_key == key and self._waiting[key][0] is ticket
+
+    def _leave(self, key, ticket, served):
+        """Removes the ticket; a served key goes to the back of the line."""
+        tickets = self._waiting[key]
+        tickets.remove(ticket)
+        if not tickets:
+            del self._waiting[key]
+        elif served:
+            self._waiting.move_to_end(key)
+        self._condition.notify_all()
+
+    def acquire(self, key=None, timeout=None):
+        """Waits for a token; returns `False` if `timeout` ran out first."""
+        if self.bucket is None:
+            with self._condition:
+                self.requests += 1
+            return True
+        started = self.clock()
+        ticket = object()
+        with self._condition:
+            self._waiting.setdefault(key, deque()).append(ticket)
+            waited = 0
+            while True:
+                delay = None
+                if self._is_next(key, ticket):
+                    delay = self.bucket.wait_time()
+                    if delay <= 0 and self.bucket.try_acquire():
+                        self._leave(key, ticket, served=True)
+                        self._count(waited)
+                        return True
+                if timeout is not None:
+                    left = timeout - waited
+                    if left <= 0 or (delay is not None and delay > left):
+                        self._leave(key, ticket, served=False)
+                        self.timeouts += 1
+                        return False
+                    delay = left if delay is None else delay
+                self._condition.wait(delay)
+                waited = self.clock() - started
+
+    def _count(self, waited):
+        """Records the wait of a served request."""
+        self.requests += 1
+        if waited > 0:
+            self.waited += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        RATE_LIMIT_WAIT.observe(waited)
+
+    def stats(self):
+        """Returns request counts and wait times in seconds."""
+        with self._condition:
+            return {
+                'requests': self.requests,
+                'waited': self.waited,
+                'timeouts': self.timeouts,
+                'queued': sum(map(len, self._waiting.values())),
+                'wait_mean': self.wait_total / self.requests
+                if self.requests else 0,
+                'wait_max': self.wait_max,
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Returns the limiter of Practicum requests, creating it on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = FairRateLimiter(PRACTICUM_RATE, PRACTICUM_BURST)
+        return _limiter
+
+
+def set_rate_limit(rate, burst=None):
+    """Replaces the limiter of Practicum requests with a new rate."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = FairRateLimiter(rate, burst)
+        return _limiter
@@ -0,0 +1,88 @@
+import random
+import time
+
+from constants import (
+    ADAPTIVE_POLLING,
+    POLL_IDLE_AFTER,
+    POLL_JITTER,
+    POLL_MAX_PERIOD,
+    POLL_MIN_PERIOD,
+    RETRY_PERIOD,
+    REVIEW_HOURS,
+)
+
+REVIEWING = 'reviewing'
+
+
+def parse_hours(hours):
+    """Parses a "start-end" range of UTC hours."""
+    start, end = hours.split('-')
+    return int(start), int(end)
+
+
+class FixedSchedule:
+    """Polls with the same period regardless of homework statuses."""
+
+    def __init__(self, period=RETRY_PERIOD):
+        self.period = period
+
+    def next_delay(self, homework_states, now=None):
+        """Returns the delay before the next poll."""
+        return self.period
+
+
+class AdaptiveSchedule:
+    """Polls often while a homework is reviewed and rarely when idle.
+
+    The delay is `min_period` while any homework is `reviewing`,
+    `max_period` outside review hours or when nothing has changed for
+    `idle_after` seconds, and `base_period` otherwise. A random jitter of
+    up to `jitter` (a fraction of the delay) spreads the polls out; the
+    result always stays within `min_period` and `max_period`.
+    """
+
+    def __init__(self, min_period=POLL_MIN_PERIOD, base_period=RETRY_PERIOD,
+                 max_period=POLL_MAX_PERIOD, idle_after=POLL_IDLE_AFTER,
+                 jitter=POLL_JITTER, review_hours=REVIEW_HOURS):
+        if not min_period <= base_period <= max_period:
+            raise ValueError(
+                'Polling periods must satisfy min <= base <= max, now: '
+                f'{min_period}, {base_period}, {max_period}'
+            )
+        self.min_period = min_period
+        self.base_period = base_period
+        self.max_period = max_period
+        self.idle_after = idle_after
+        self.jitter = jitter
+        self.review_hours = parse_hours(review_hours)
+
+    def in_review_hours(self, now):
+        """Checks whether reviewers are expected to work at `now`."""
+        hour = time.gmtime(now).tm_hour
+        start, end = self.review_hours
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def next_delay(self, homework_states, now=None):
+        """Returns the delay before the next poll."""
+        now = time.time() if now is None else now
+        if homework_states.has_status(REVIEWING):
+            delay = self.min_period
+        elif not self.in_review_hours(now):
+            delay = self.max_period
+        elif (homework_states.changed_at is None
+              or now - homework_states.changed_at > self.idle_after):
+            delay = self.max_period
+        else:
+            delay = self.base_period
+
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return min(max(delay, self.min_period), self.max_period)
+
+
+def make_schedule(period=RETRY_PERIOD):
+    """Builds the schedule selected by the ADAPTIVE_POLLING setting."""
+    if ADAPTIVE_POLLING:
+        return AdaptiveSchedule(base_period=period)
+    return FixedSchedule(period)
@@ -0,0 +1,69 @@
+import bisect
+import hashlib
+from functools import lru_cache
+
+from constants import SHARD_VNODES
+
+
+def ring_hash(value):
+    """Maps a string to a position on the ring."""
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Every node owns `vnodes` points on the ring and a key belongs to the
+    node of the first point after the key hash. Adding or removing a node
+    only moves the keys that node gains or loses, about 1/N of them.
+    """
+
+    def __init__(self, nodes=(), vnodes=SHARD_VNODES):
+        self.vnodes = vnodes
+        self._points = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(set(self._nodes))
+
+    def add(self, node):
+        """Places the virtual nodes of `node` on the ring."""
+        for replica in range(self.vnodes):
+            point = ring_hash(f'{node}#{replica}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove(self, node):
+        """Takes `node` off the ring."""
+        pairs = [
+            (point, owner) for point, owner in zip(self._points, self._nodes)
+            if owner != node
+        ]
+        self._points = [point for point, _ in pairs]
+        self._nodes = [owner for _, owner in pairs]
+
+    def node_for(self, key):
+        """Returns the node that owns `key`."""
+        if not self._points:
+            raise LookupError('The hash ring has no nodes.')
+        index = bisect.bisect(self._points, ring_hash(key))
+        return self._nodes[index % len(self._points)]
+
+
+@lru_cache(maxsize=8)
+def shard_ring(shards):
+    """Returns the ring of shards `0..shards - 1`."""
+    return HashRing(range(shards))
+
+
+def shard_accounts(accounts, shard, shards):
+    """Returns the accounts that belong to `shard` out of `shards`."""
+    ring = shard_ring(shards)
+    return [
+        account for account in accounts
+        if ring.node_for(account.key) == shard
+    ]
@@ -0,0 +1,60 @@
+import signal
+import threading
+from contextlib import contextmanager
+
+from constants import SHUTDOWN_TIMEOUT
+from deadline import shorten_deadline
+from exceptions import ShutdownRequested
+
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+class GracefulShutdown:
+    """Turns SIGTERM and SIGINT into a request to stop between polls.
+
+    A signal that arrives while the process waits inside `waiting()` ends
+    the wait at once with `ShutdownRequested`. A signal that arrives during
+    a poll only sets `requested` and leaves the poll `timeout` seconds to
+    finish, so a Telegram message being sent is not cut off. Used as a
+    context manager, it installs the handlers, restores the previous ones
+    on exit and swallows `ShutdownRequested`.
+    """
+
+    def __init__(self, timeout=SHUTDOWN_TIMEOUT, signals=SHUTDOWN_SIGNALS):
+        self.timeout = timeout
+        self.signals = signals
+        self.requested = False
+        self._waiting = False
+        self._previous = {}
+
+    def __enter__(self):
+        if threading.current_thread() is threading.main_thread():
+            for signum in self.signals:
+                self._previous[signum] = signal.signal(signum, self._handle)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+        return exc_type is not None and issubclass(
+            exc_type, ShutdownRequested
+        )
+
+    def _handle(self, signum, frame):
+        """Records the request and interrupts a wait in progress."""
+        self.requested = True
+        if self._waiting:
+            raise ShutdownRequested(signum)
+        shorten_deadline(self.timeout)
+
+    @contextmanager
+    def waiting(self):
+        """Marks a wait that a shutdown signal may interrupt."""
+        if self.requested:
+            raise ShutdownRequested()
+        self._waiting = True
+        try:
+            yield
+        finally:
+            self._waiting = False
@@ -0,0 +1,117 @@
+from array import array
+
+from status_diff import HomeworkStateMap
+
+
+class _Columns:
+    """Array columns of the per-account numbers, one row per account."""
+
+    __slots__ = ('timestamps', 'next_poll_at')
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.next_poll_at = array('d')
+
+    def append(self, timestamp, next_poll_at=0.0):
+        """Adds a row and returns its index."""
+        self.timestamps.append(timestamp)
+        self.next_poll_at.append(next_poll_at)
+        return len(self.timestamps) - 1
+
+
+class AccountState:
+    """Polling state of a single account, a row of a `StateTable`.
+
+    The cursor and the time of the next poll live in the array columns
+    of the table, so they cost 16 bytes instead of two number objects.
+    """
+
+    __slots__ = ('_columns', '_row', 'homework_states', 'errors')
+
+    def __init__(self, columns, row, snapshot=()):
+        self._columns = columns
+        self._row = row
+        self.homework_states = HomeworkStateMap(snapshot)
+        self.errors = None
+
+    @property
+    def timestamp(self):
+        """The `from_date` cursor of the account."""
+        return self._columns.timestamps[self._row]
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self._columns.timestamps[self._row] = value
+
+    @property
+    def next_poll_at(self):
+        """Monotonic time of the next poll, 0 before the first one."""
+        return self._columns.next_poll_at[self._row]
+
+    @next_poll_at.setter
+    def next_poll_at(self, value):
+        self._columns.next_poll_at[self._row] = value
+
+    def _detach(self):
+        """Moves the row out of the table into columns of its own."""
+        columns = _Columns()
+        self._row = columns.append(self.timestamp, self.next_poll_at)
+        self._columns = columns
+
+
+class StateTable:
+    """Polling state of many accounts, looked up by account key.
+
+    Behaves like a dict of `AccountState`. Rows of removed accounts are
+    reused by the next added ones; a removed state keeps working on a
+    copy of its row, so a poll that is still running cannot overwrite
+    the account that took the row over.
+    """
+
+    __slots__ = ('_states', '_columns', '_free')
+
+    def __init__(self):
+        self._states = {}
+        self._columns = _Columns()
+        self._free = []
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, key):
+        return key in self._states
+
+    def __iter__(self):
+        return iter(self._states)
+
+    def __getitem__(self, key):
+        return self._states[key]
+
+    def __delitem__(self, key):
+        state = self._states.pop(key)
+        row = state._row
+        state._detach()
+        self._free.append(row)
+
+    def get(self, key, default=None):
+        """Returns the state of the account or `default`."""
+        return self._states.get(key, default)
+
+    def values(self):
+        """Returns the states of all accounts."""
+        return self._states.values()
+
+    def add(self, key, timestamp, snapshot=()):
+        """Adds an account with the given cursor and homework states."""
+        if key in self._states:
+            del self[key]
+        if self._free:
+            row = self._free.pop()
+            self._columns.timestamps[row] = timestamp
+            self._columns.next_poll_at[row] = 0.0
+        else:
+            row = self._columns.append(timestamp)
+        state = self._states[key] = AccountState(
+            self._columns, row, snapshot
+        )
+        return state
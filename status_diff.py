@@ -0,0 +1,133 @@
+import time
+from enum import IntEnum
+
+
+class HomeworkStatus(IntEnum):
+    """Review status of a homework, stored instead of the API string."""
+
+    APPROVED = 0
+    REVIEWING = 1
+    REJECTED = 2
+
+    @property
+    def label(self):
+        """Returns the status as the API spells it."""
+        return self.name.lower()
+
+
+STATUS_CODES = {status.label: status for status in HomeworkStatus}
+SMALL_MAP_SIZE = 8
+
+
+class HomeworkStateMap:
+    """Last seen status of every homework, keyed by homework id.
+
+    Works with the `HomeworkRecord` tuples returned by `check_response`;
+    homeworks without an `id` are keyed by `homework_name`. The map can be
+    restored from the rows returned by `snapshot`.
+
+    Statuses are kept as `HomeworkStatus` members rather than strings.
+    Most accounts track a few homeworks, so up to `SMALL_MAP_SIZE` of them
+    are stored as one flat `(key, status, date_updated, ...)` tuple, which
+    is several times smaller than a dict; larger maps use a dict.
+    """
+
+    __slots__ = ('_states', 'changed_at')
+
+    def __init__(self, snapshot=()):
+        self._states = None
+        self._store({
+            key: (STATUS_CODES[status], date_updated)
+            for key, status, date_updated in snapshot
+        })
+        self.changed_at = None
+
+    def __len__(self):
+        states = self._states
+        if isinstance(states, tuple):
+            return len(states) // 3
+        return len(states) if states else 0
+
+    def _as_dict(self):
+        """Returns the states as a dict of `key: (status, date_updated)`."""
+        states = self._states
+        if states is None:
+            return {}
+        if isinstance(states, tuple):
+            return {
+                states[index]: (states[index + 1], states[index + 2])
+                for index in range(0, len(states), 3)
+            }
+        return states
+
+    def _store(self, states):
+        """Keeps the states in the most compact form for their number."""
+        if not states:
+            self._states = None
+        elif len(states) <= SMALL_MAP_SIZE:
+            self._states = tuple(
+                item for key, state in states.items() for item in (key, *state)
+            )
+        else:
+            self._states = states
+
+    @staticmethod
+    def _key(homework):
+        """Returns the identifier the homework is tracked by."""
+        if homework.id is None:
+            return homework.homework_name
+        return homework.id
+
+    def diff(self, homeworks):
+        """Returns homeworks whose status or update date changed.
+
+        The list is walked once; the map itself is not modified, so the
+        changes can be committed with `update` after they were delivered.
+        """
+        if self._states is None:
+            return list(homeworks)
+        states = self._as_dict()
+        key = self._key
+        codes = STATUS_CODES
+        return [
+            homework for homework in homeworks
+            if states.get(key(homework)) != (
+                codes[homework.status], homework.date_updated
+            )
+        ]
+
+    def update(self, homeworks):
+        """Remembers the current status of the given homeworks."""
+        if not homeworks:
+            return
+        states = self._as_dict()
+        for homework in homeworks:
+            states[self._key(homework)] = (
+                STATUS_CODES[homework.status], homework.date_updated
+            )
+        self._store(states)
+        self.changed_at = time.time()
+
+    def snapshot(self):
+        """Returns the tracked states as `[key, status, date_updated]` rows."""
+        return [
+            [key, status.label, date_updated]
+            for key, (status, date_updated) in self._as_dict().items()
+        ]
+
+    def _codes(self):
+        """Returns the statuses of the tracked homeworks, with repeats."""
+        states = self._states
+        if states is None:
+            return ()
+        if isinstance(states, tuple):
+            return states[1::3]
+        return [state[0] for state in states.values()]
+
+    def statuses(self):
+        """Returns the set of statuses of the tracked homeworks."""
+        return {status.label for status in set(self._codes())}
+
+    def has_status(self, status):
+        """Checks whether any tracked homework is in the given status."""
+        return STATUS_CODES[status] in self._codes()
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+
+from status_diff import STATUS_CODES, HomeworkStatus
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS transitions ('
+    'id INTEGER PRIMARY KEY, account TEXT NOT NULL, homework NOT NULL, '
+    'status INTEGER NOT NULL, date_updated TEXT, observed_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS transitions_latest '
+    'ON transitions (account, homework, observed_at)',
+    'CREATE INDEX IF NOT EXISTS transitions_observed '
+    'ON transitions (observed_at)',
+)
+
+
+class StatusHistory:
+    """Every homework status change ever notified, kept in SQLite.
+
+    `record` only queues the rows in memory, so the poll path does not
+    wait for the disk; `flush` writes all queued rows in one transaction,
+    once per poll cycle. The database is in WAL mode, so readers do not
+    block the writer and several worker processes can share it. Statuses
+    are stored as `HomeworkStatus` codes and read back as strings.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        self._pending = []
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def record(self, account, homeworks, observed_at=None):
+        """Queues the transitions of the given homeworks of an account."""
+        if observed_at is None:
+            observed_at = time.time()
+        rows = [
+            (
+                account,
+                homework.homework_name if homework.id is None
+                else homework.id,
+                STATUS_CODES[homework.status], homework.date_updated,
+                observed_at,
+            )
+            for homework in homeworks
+        ]
+        with self._lock:
+            self._pending.extend(rows)
+
+    def flush(self):
+        """Writes the queued transitions in one transaction."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT INTO transitions (account, homework, status, '
+                    'date_updated, observed_at) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+        except sqlite3.Error:
+            with self._lock:
+                self._pending[:0] = rows
+            raise
+        self.written += len(rows)
+        return len(rows)
+
+    @staticmethod
+    def _rows(cursor):
+        """Returns the rows with the status codes turned into strings."""
+        return [
+            (account, homework, HomeworkStatus(status).label, date_updated,
+             observed_at)
+            for account, homework, status, date_updated, observed_at in cursor
+        ]
+
+    def latest(self, account):
+        """Returns the last transition of every homework of the account."""
+        return self._rows(self.connection.execute(
+            'SELECT account, homework, status, date_updated, '
+            'MAX(observed_at) FROM transitions WHERE account = ? '
+            'GROUP BY homework ORDER BY homework',
+            (account,)
+        ))
+
+    def between(self, since, until):
+        """Returns the transitions observed in `[since, until)` in order."""
+        return self._rows(self.connection.execute(
+            'SELECT account, homework, status, date_updated, observed_at '
+            'FROM transitions WHERE observed_at >= ? AND observed_at < ? '
+            'ORDER BY observed_at, id',
+            (since, until)
+        ))
+
+    def close(self):
+        """Writes the queued transitions and closes the connection."""
+        self.flush()
+        self.connection.close()
+
+
+def open_status_history(path):
+    """Opens the status history at `path`, `None` if it is disabled."""
+    if not path:
+        return None
+    return StatusHistory(path)
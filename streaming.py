@@ -0,0 +1,164 @@
+import codecs
+import json
+import re
+import time
+
+from constants import STREAM_HISTORY_AGE, STREAM_RESPONSES
+from exceptions import (
+    JsonTypeError,
+    KeyNotFoundError,
+    NotDictTypeDataError,
+    NotListTypeDataError,
+)
+from validation import validate_homework
+
+WHITESPACE = re.compile(r'\s*')
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+DECODER = json.JSONDecoder()
+
+
+class JsonReader:
+    """Reads JSON values one by one from an iterable of byte chunks.
+
+    Only the unread tail of the body is kept in memory, so a value is
+    never held longer than it takes to decode it.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk; returns False at the end of the body."""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._decoder.decode(b'', final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return chunk is not None
+
+    def peek(self):
+        """Returns the next significant character without consuming it."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise JsonTypeError('Unexpected end of the JSON body.')
+
+    def take(self, *expected):
+        """Consumes the next character, which must be one of `expected`."""
+        char = self.peek()
+        if char not in expected:
+            raise JsonTypeError(
+                f'Expected one of {expected!r}, got {char!r} in the JSON body.'
+            )
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if self.fill():
+                    continue
+                raise JsonTypeError(f'JSON decoding error: {error}')
+            # A number that ends the buffer, or is followed only by the
+            # start of a fraction or an exponent, may go on in the next
+            # chunk.
+            tail = NUMBER_TAIL.match(self.buffer, end).end()
+            if tail == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+class HomeworkStream:
+    """API answer whose homeworks are validated as they are received.
+
+    Iterating yields one `HomeworkRecord` at a time; the other top-level
+    fields, `current_date` among them, are available through `get` once
+    the iteration is over.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.reader = JsonReader(chunks)
+        self.fields = {}
+        self.count = 0
+
+    def get(self, key, default=None):
+        """Returns a top-level field read so far."""
+        return self.fields.get(key, default)
+
+    def close(self):
+        """Stops reading the body, releasing the connection."""
+        close = getattr(self.chunks, 'close', None)
+        if close is not None:
+            close()
+
+    def __iter__(self):
+        for homework in self._homeworks():
+            yield validate_homework(homework)
+            self.count += 1
+        if 'current_date' not in self.fields:
+            raise KeyNotFoundError('current_date')
+
+    def _homeworks(self):
+        """Yields the raw homeworks while reading the top-level object."""
+        reader = self.reader
+        if reader.peek() != '{':
+            raise NotDictTypeDataError(type(reader.value()))
+        reader.take('{')
+        seen_homeworks = False
+        if reader.peek() == '}':
+            reader.take('}')
+        else:
+            while True:
+                key = reader.value()
+                reader.take(':')
+                if key == 'homeworks':
+                    seen_homeworks = True
+                    yield from self._array(key)
+                else:
+                    self.fields[key] = reader.value()
+                if reader.take(',', '}') == '}':
+                    break
+        if not seen_homeworks:
+            raise KeyNotFoundError('homeworks')
+
+    def _array(self, key):
+        """Yields the items of the array that is the value of `key`."""
+        reader = self.reader
+        if reader.peek() != '[':
+            raise NotListTypeDataError(type(reader.value()))
+        reader.take('[')
+        if reader.peek() == ']':
+            reader.take(']')
+            return
+        while True:
+            yield reader.value()
+            if reader.take(',', ']') == ']':
+                return
+
+
+def should_stream(timestamp, mode=STREAM_RESPONSES, now=None):
+    """Decides whether the answer for `timestamp` should be streamed."""
+    if mode == 'always':
+        return True
+    if mode == 'never':
+        return False
+    if now is None:
+        now = time.time()
+    return timestamp < now - STREAM_HISTORY_AGE
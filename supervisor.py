@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from telebot import TeleBot
+
+from constants import (
+    CURSOR_STORE_PATH,
+    METRICS_HOST,
+    METRICS_PORT,
+    OUTBOX_SPOOL_PATH,
+    PRACTICUM_BURST,
+    PRACTICUM_RATE,
+    REBALANCE_INTERVAL,
+    SHARD_WORKERS,
+    SHUTDOWN_TIMEOUT,
+    STATUS_HISTORY_PATH,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_GLOBAL_RATE,
+    WORKER_RESTART_DELAY,
+    WORKER_RESTART_MAX_DELAY,
+)
+from config_reload import ConfigWatcher, load_config
+from cursor_store import open_cursor_store, shared_store_path
+from engine import PollingEngine
+from exceptions import ConfigError
+from metrics import start_metrics_server
+from outbox import Outbox
+from rate_limit import set_rate_limit
+from sharding import shard_accounts
+from status_history import open_status_history
+from transport import get_transport, share_with_telegram
+
+
+logger = logging.getLogger('homework.supervisor')
+
+# A worker that dies sooner than this after its start counts as crashing
+# repeatedly, and its restarts are spaced out.
+STABLE_AFTER = 60
+
+
+def shard_path(path, shard):
+    """Returns the per-worker variant of a file path."""
+    if not path:
+        return path
+    stem, extension = os.path.splitext(path)
+    return f'{stem}.{shard}{extension}'
+
+
+async def follow_shards(engine, accounts, shard, shards,
+                        interval=REBALANCE_INTERVAL):
+    """Re-partitions the accounts of a worker when the shard count changes."""
+    current = shards.value
+    while True:
+        await asyncio.sleep(interval)
+        if shards.value == current or shard >= shards.value:
+            continue
+        current = shards.value
+        added, removed = engine.assign(
+            shard_accounts(accounts, shard, current)
+        )
+        logger.info(
+            f'Worker {shard}/{current}: {added} accounts added, '
+            f'{removed} removed.'
+        )
+
+
+async def serve(engine, accounts, shard, shards):
+    """Runs the engine of a worker until it receives SIGTERM or SIGINT.
+
+    A reloaded config replaces `accounts` in place, so re-partitioning
+    after a resize uses the new account list.
+    """
+    def apply_config(config):
+        accounts[:] = config.accounts
+        added, removed = engine.apply_config(config._replace(
+            accounts=shard_accounts(config.accounts, shard, shards.value)
+        ))
+        logger.info(
+            f'Worker {shard}: {added} accounts added, {removed} removed '
+            'by the new configuration.'
+        )
+
+    tasks = [
+        asyncio.create_task(follow_shards(engine, accounts, shard, shards)),
+        asyncio.create_task(ConfigWatcher(apply_config).run()),
+    ]
+    try:
+        await engine.run_until_signalled()
+    finally:
+        for task in tasks:
+            task.cancel()
+    logger.info(f'Worker {shard} is stopping.')
+
+
+def run_worker(shard, shards):
+    """Polls the accounts of one shard; `shards` is a shared value.
+
+    The config is read anew, so a restarted worker picks up the edits.
+    The Telegram and Practicum rate limits are split evenly between the
+    workers, and the metrics of worker N are served on `METRICS_PORT + N`.
+    """
+    config = load_config()
+    accounts = list(config.accounts)
+    count = shards.value
+    if PRACTICUM_RATE:
+        set_rate_limit(
+            PRACTICUM_RATE / count,
+            PRACTICUM_BURST and max(1, PRACTICUM_BURST // count)
+        )
+    share_with_telegram(get_transport())
+    bot = TeleBot(token=config.telegram_token)
+    outbox = Outbox(
+        bot, global_rate=TELEGRAM_GLOBAL_RATE / count,
+        chat_rate=TELEGRAM_CHAT_RATE,
+        spool_path=shard_path(OUTBOX_SPOOL_PATH, shard)
+    )
+    outbox.start()
+    engine = PollingEngine(
+        shard_accounts(accounts, shard, count), bot,
+        cursor_store=open_cursor_store(
+            shared_store_path(CURSOR_STORE_PATH)
+        ),
+        schedule=config.schedule, outbox=outbox,
+        history=open_status_history(STATUS_HISTORY_PATH)
+    )
+    logger.info(
+        f'Worker {shard}/{count} polls {len(engine.accounts)} accounts.'
+    )
+    if METRICS_PORT:
+        engine.register_metrics()
+        start_metrics_server(METRICS_PORT + shard, METRICS_HOST)
+    try:
+        asyncio.run(serve(engine, accounts, shard, shards))
+    finally:
+        engine.close(SHUTDOWN_TIMEOUT / 2)
+
+
+class Supervisor:
+    """Keeps one worker process per shard running.
+
+    A worker that exits is restarted; restarts of a worker that keeps
+    crashing soon after start are delayed exponentially from
+    `restart_delay` up to `max_restart_delay`. `resize` changes the
+    number of shards: workers re-partition in place, so only the accounts
+    whose shard changed move between processes.
+    """
+
+    def __init__(self, workers=SHARD_WORKERS, target=run_worker,
+                 restart_delay=WORKER_RESTART_DELAY,
+                 max_restart_delay=WORKER_RESTART_MAX_DELAY,
+                 clock=time.monotonic):
+        self.shards = multiprocessing.Value('i', workers)
+        self.target = target
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.clock = clock
+        self.processes = {}
+        self.started_at = {}
+        self.crashes = {}
+        self.restart_at = {}
+        self.restarts = 0
+        self.running = False
+        self.pending_resize = 0
+        self.pending_reload = False
+
+    @property
+    def workers(self):
+        """Current number of shards."""
+        return self.shards.value
+
+    def _spawn(self, shard):
+        """Starts the worker process of a shard."""
+        process = multiprocessing.Process(
+            target=self.target, args=(shard, self.shards),
+            name=f'homework-worker-{shard}'
+        )
+        process.start()
+        self.processes[shard] = process
+        self.started_at[shard] = self.clock()
+        self.restart_at.pop(shard, None)
+
+    def _stop(self, shard, timeout=SHUTDOWN_TIMEOUT + 5):
+        """Stops the worker of a shard, killing it if it does not exit."""
+        self._stop_all([shard], timeout)
+
+    def _stop_all(self, shards, timeout):
+        """Asks the workers to stop, then kills those still running."""
+        processes = []
+        for shard in shards:
+            process = self.processes.pop(shard, None)
+            self.restart_at.pop(shard, None)
+            self.crashes.pop(shard, None)
+            if process is not None and process.is_alive():
+                process.terminate()
+                processes.append(process)
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error(f'{process.name} did not stop in time.')
+                process.kill()
+                process.join()
+
+    def start(self):
+        """Starts a worker for every shard."""
+        self.running = True
+        for shard in range(self.workers):
+            self._spawn(shard)
+
+    def resize(self, workers):
+        """Changes the number of shards and workers."""
+        workers = max(1, workers)
+        previous = self.workers
+        # Workers that go away flush their cursors before the others take
+        # their accounts over; new workers start after the old ones were
+        # told to hand accounts over.
+        for shard in range(workers, previous):
+            self._stop(shard)
+        self.shards.value = workers
+        for shard in range(previous, workers):
+            self._spawn(shard)
+        logger.info(f'Resized from {previous} to {workers} workers.')
+
+    def check(self):
+        """Schedules restarts of exited workers and runs the due ones."""
+        now = self.clock()
+        for shard, process in list(self.processes.items()):
+            if process.is_alive() or shard in self.restart_at:
+                continue
+            if now - self.started_at[shard] < STABLE_AFTER:
+                self.crashes[shard] = self.crashes.get(shard, 0) + 1
+            else:
+                self.crashes[shard] = 1
+            delay = min(
+                self.restart_delay * 2 ** (self.crashes[shard] - 1),
+                self.max_restart_delay
+            )
+            logger.error(
+                f'Worker {shard} exited with code {process.exitcode}, '
+                f'restarting in {delay:.0f}s.'
+            )
+            self.restart_at[shard] = now + delay
+        for shard, restart_at in list(self.restart_at.items()):
+            if restart_at <= now:
+                self.restarts += 1
+                self._spawn(shard)
+
+    def stop(self, timeout=SHUTDOWN_TIMEOUT + 5):
+        """Stops every worker; they drain in parallel within `timeout`."""
+        self.running = False
+        self._stop_all(list(self.processes), timeout)
+
+    def reload(self):
+        """Asks every running worker to reload the config."""
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGHUP)
+
+    def _handle_signal(self, signum, frame):
+        """Stops on SIGTERM/SIGINT, adds or removes a worker on TTIN/TTOU.
+
+        SIGHUP is passed on to the workers.
+        """
+        if signum == signal.SIGTTIN:
+            self.pending_resize += 1
+        elif signum == signal.SIGTTOU:
+            self.pending_resize -= 1
+        elif signum == signal.SIGHUP:
+            self.pending_reload = True
+        else:
+            self.running = False
+
+    def run(self, interval=1):
+        """Supervises the workers until SIGTERM or SIGINT."""
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP,
+                       signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self._handle_signal)
+        self.start()
+        try:
+            while self.running:
+                if self.pending_resize:
+                    delta, self.pending_resize = self.pending_resize, 0
+                    self.resize(self.workers + delta)
+                if self.pending_reload:
+                    self.pending_reload = False
+                    self.reload()
+                self.check()
+                time.sleep(interval)
+        finally:
+            self.stop()
+
+
+def main():
+    """Runs the sharded multi-process polling mode."""
+    parser = argparse.ArgumentParser(
+        description='Polls accounts with several worker processes.'
+    )
+    parser.add_argument('--workers', type=int, default=SHARD_WORKERS)
+    args = parser.parse_args()
+    try:
+        load_config()
+    except ConfigError as error:
+        logger.critical(f'Invalid configuration: {error}')
+        sys.exit(1)
+    Supervisor(args.workers).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 import os
 import sys
+import threading
+import time
 
+import pytest
 import pytest_timeout
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -53,3 +56,69 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+class FakeClock:
+    """Clock for the `clock=` arguments, moved forward by setting `now`."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def wait_until():
+    """Waits for a condition set by another thread or process."""
+    def wait(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                pytest.fail('Условие не выполнилось вовремя.')
+            time.sleep(0.005)
+    return wait
+
+
+@pytest.fixture
+def states_with():
+    """Builds the states of one homework with the given status."""
+    from status_diff import HomeworkStateMap
+    from validation import HomeworkRecord
+
+    def build(status, changed_at=None):
+        states = HomeworkStateMap()
+        states.update([HomeworkRecord(1, 'hw.zip', status, '2024-01-01')])
+        states.changed_at = changed_at
+        return states
+    return build
+
+
+@pytest.fixture
+def make_fetch():
+    """Builds a `fetch` for the engine that records the polled accounts.
+
+    `answer` is returned as is, or called with the account headers if it
+    is callable; accounts from `fail_for` get a `ConnectionError`.
+    """
+    def build(answer, fail_for=(), latency=0):
+        calls = []
+        lock = threading.Lock()
+
+        def fetch(timestamp, headers):
+            with lock:
+                calls.append(headers)
+            if latency:
+                time.sleep(latency)
+            if headers in fail_for:
+                raise ConnectionError(headers)
+            return answer(headers) if callable(answer) else answer
+
+        fetch.calls = calls
+        return fetch
+    return build
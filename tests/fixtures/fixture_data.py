@@ -3,6 +3,7 @@ import string
 from datetime import datetime
 
 import pytest
+import requests
 
 
 @pytest.fixture
@@ -46,3 +47,42 @@ def data_with_new_hw_status(random_timestamp):
         ],
         'current_date': random_timestamp
     }
+
+
+@pytest.fixture(autouse=True)
+def cursor_store_path(tmp_path, monkeypatch):
+    import homework
+    path = str(tmp_path / 'cursors.json')
+    monkeypatch.setattr(homework, 'CURSOR_STORE_PATH', path)
+    return path
+
+
+@pytest.fixture
+def session_through_requests_get(monkeypatch):
+    # The bot tests mock `requests.get`; send the requests of the pooled
+    # session to it, with the arguments the transport passes on.
+    import transport
+    monkeypatch.setattr(
+        transport.get_transport().session, 'request',
+        lambda method, url, **kwargs: requests.get(url, **kwargs)
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_response_cache(monkeypatch):
+    import conditional
+    monkeypatch.setattr(conditional, '_cache', None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter(monkeypatch):
+    import rate_limit
+    monkeypatch.setattr(rate_limit, '_limiter', None)
+
+
+@pytest.fixture(autouse=True)
+def status_history_path(tmp_path, monkeypatch):
+    import homework
+    path = str(tmp_path / 'history.db')
+    monkeypatch.setattr(homework, 'STATUS_HISTORY_PATH', path)
+    return path
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from backfill import Backfill, parse_since
+from circuit_breaker import CircuitBreaker
+from cursor_store import open_cursor_store
+from status_diff import HomeworkStateMap
+from validation import HomeworkRecord
+
+
+def answer_for(current_date):
+    """Answers every account with one approved homework of its own."""
+    def answer(headers):
+        homework = HomeworkRecord(1, f'{headers}.zip', 'approved', 'date')
+        return [homework], current_date
+    return answer
+
+
+class TestBackfill:
+
+    def test_seeds_cursor_and_states(self, make_fetch, tmp_path,
+                                     random_timestamp):
+        store = open_cursor_store(str(tmp_path / 'cursors.json'))
+        accounts = {f'key-{i}': f'headers-{i}' for i in range(5)}
+        backfill = Backfill(
+            accounts, store,
+            fetch=make_fetch(answer_for(random_timestamp)),
+            concurrency=2, chunk_size=2, breaker=CircuitBreaker('test')
+        )
+        assert backfill.run() == (5, 0)
+        store.close()
+
+        restored = open_cursor_store(str(tmp_path / 'cursors.json'))
+        assert restored.get('key-3') == random_timestamp, (
+            'Убедитесь, что после импорта сохраняется курсор аккаунта.'
+        )
+        states = HomeworkStateMap(restored.get_homeworks('key-3'))
+        assert states.diff([
+            HomeworkRecord(1, 'headers-3.zip', 'approved', 'date')
+        ]) == [], (
+            'Убедитесь, что импортированные статусы не считаются новыми.'
+        )
+
+    def test_resumes_after_failures(self, make_fetch, tmp_path,
+                                    random_timestamp):
+        path = str(tmp_path / 'cursors.db')
+        accounts = {f'key-{i}': f'headers-{i}' for i in range(6)}
+        store = open_cursor_store(path)
+        first = Backfill(
+            accounts, store, chunk_size=3, breaker=CircuitBreaker('test'),
+            fetch=make_fetch(
+                answer_for(random_timestamp), fail_for=('headers-4',)
+            )
+        )
+        assert first.run() == (5, 1)
+        store.close()
+
+        store = open_cursor_store(path)
+        fetch = make_fetch(answer_for(random_timestamp))
+        second = Backfill(
+            accounts, store, fetch=fetch, breaker=CircuitBreaker('test')
+        )
+        assert second.run() == (1, 0)
+        assert fetch.calls == ['headers-4'], (
+            'Убедитесь, что повторный запуск импортирует только '
+            'необработанные аккаунты.'
+        )
+        store.close()
+
+    def test_concurrency_is_bounded(self, make_fetch, random_timestamp):
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+        fetch = make_fetch(answer_for(random_timestamp))
+
+        def counting_fetch(since, headers):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.01)
+            with lock:
+                active['now'] -= 1
+            return fetch(since, headers)
+
+        accounts = {f'key-{i}': f'headers-{i}' for i in range(20)}
+        Backfill(
+            accounts, open_cursor_store(''), fetch=counting_fetch,
+            concurrency=4, breaker=CircuitBreaker('test')
+        ).run()
+        assert 1 < active['max'] <= 4
+
+    @pytest.mark.parametrize('value, expected', [
+        ('1700000000', 1700000000),
+        ('2023-11-14T22:13:20', 1700000000),
+        ('2023-11-15T01:13:20+03:00', 1700000000),
+    ])
+    def test_parse_since(self, value, expected):
+        assert parse_since(value) == expected
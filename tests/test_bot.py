@@ -13,6 +13,8 @@ import tests.check_utils as check_utils
 
 old_sleep = time.sleep
 
+pytestmark = pytest.mark.usefixtures('session_through_requests_get')
+
 
 def create_mock_response_get_with_custom_status_and_data(
         random_timestamp, http_status, data
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+
+import tests.check_utils as check_utils
+from circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    parse_retry_after,
+)
+from exceptions import (
+    ApiConnectionError,
+    CircuitOpenError,
+    FatalError,
+    HttpStatusNotOkError,
+    KeyNotFoundError,
+    RetryableError,
+)
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        'endpoint', failure_threshold=3, base_delay=5, max_delay=60,
+        clock=clock
+    )
+
+
+class TestCircuitBreaker:
+
+    def test_exponential_backoff(self, breaker):
+        delays = [
+            breaker.record_failure(ApiConnectionError('down'))
+            for _ in range(6)
+        ]
+        assert delays == [5, 10, 20, 40, 60, 60], (
+            'Убедитесь, что задержка растёт экспоненциально до максимума.'
+        )
+
+    def test_opens_after_threshold_and_probes_once(self, breaker, clock):
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure(ApiConnectionError('down'))
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        clock.now = 20
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow(), (
+            'Убедитесь, что в состоянии half-open проходит один запрос.'
+        )
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.retry_delay() is None
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure(ApiConnectionError('down'))
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_failure(ApiConnectionError('down'))
+        assert breaker.state == OPEN
+        assert breaker.time_until_retry() == 40
+
+    def test_retry_after_honored(self, breaker):
+        error = HttpStatusNotOkError(
+            '429', HTTPStatus.TOO_MANY_REQUESTS, retry_after=120
+        )
+        assert breaker.record_failure(error) == 120
+        assert breaker.state == OPEN, (
+            'Убедитесь, что `Retry-After` открывает цепь.'
+        )
+
+    def test_fatal_errors_do_not_trip(self, breaker):
+        for _ in range(5):
+            assert breaker.record_failure(KeyNotFoundError('x')) is None
+        assert breaker.state == CLOSED
+
+    def test_call_rejected_when_open(self, breaker):
+        for _ in range(3):
+            breaker.record_failure(ApiConnectionError('down'))
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: None)
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('30') == 30
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('garbage') is None
+        assert parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:30 GMT', now=1445412480
+        ) == 30
+
+
+class TestHttpStatusErrors:
+
+    @pytest.mark.parametrize('status, error_class', [
+        (HTTPStatus.UNAUTHORIZED, FatalError),
+        (HTTPStatus.INTERNAL_SERVER_ERROR, RetryableError),
+        (HTTPStatus.TOO_MANY_REQUESTS, RetryableError),
+    ])
+    def test_status_classified(self, homework_module, status, error_class):
+        response = check_utils.MockResponseGET(http_status=status)
+        response.headers = {'Retry-After': '15'}
+        error = homework_module.http_status_error(response)
+        assert isinstance(error, error_class)
+        assert error.status_code == status
+
+    def test_retry_after_read_from_429(self, homework_module):
+        response = check_utils.MockResponseGET(
+            http_status=HTTPStatus.TOO_MANY_REQUESTS
+        )
+        response.headers = {'Retry-After': '15'}
+        assert homework_module.http_status_error(response).retry_after == 15
@@ -0,0 +1,131 @@
+import json
+from http import HTTPStatus
+
+import homework
+from conditional import ResponseCache, UnchangedResponse, fingerprint
+
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+def make_body(current_date, status='approved'):
+    return json.dumps({
+        'homeworks': [{
+            'id': 1,
+            'homework_name': 'hw.zip',
+            'status': status,
+            'date_updated': '2021-04-11T10:31:09Z',
+        }],
+        'current_date': current_date,
+    }).encode()
+
+
+class Response:
+
+    def __init__(self, content=b'', status_code=HTTPStatus.OK, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TestFingerprint:
+
+    def test_current_date_is_ignored(self):
+        first, first_date = fingerprint(make_body(100))
+        second, second_date = fingerprint(make_body(200))
+        assert first == second, (
+            'Убедитесь, что `current_date` не влияет на отпечаток ответа.'
+        )
+        assert (first_date, second_date) == (100, 200)
+
+    def test_status_change_changes_fingerprint(self):
+        assert fingerprint(make_body(100))[0] != (
+            fingerprint(make_body(100, 'rejected'))[0]
+        ), 'Убедитесь, что смена статуса меняет отпечаток ответа.'
+
+
+class TestResponseCache:
+
+    def test_same_body_is_short_circuited_after_commit(self):
+        cache = ResponseCache()
+        assert cache.check(HEADERS, Response(make_body(100))) is None
+        cache.commit(HEADERS)
+        unchanged = cache.check(HEADERS, Response(make_body(200)))
+        assert isinstance(unchanged, UnchangedResponse), (
+            'Убедитесь, что повторный ответ не разбирается заново.'
+        )
+        assert unchanged.get('current_date') == 200
+
+    def test_uncommitted_answer_is_processed_again(self):
+        cache = ResponseCache()
+        cache.check(HEADERS, Response(make_body(100)))
+        assert cache.check(HEADERS, Response(make_body(200))) is None, (
+            'Ответ, обработка которого не завершилась, нужно обработать '
+            'снова.'
+        )
+
+    def test_conditional_headers_and_not_modified(self):
+        cache = ResponseCache()
+        assert cache.request_headers(HEADERS) == HEADERS
+        cache.check(HEADERS, Response(make_body(100), headers={
+            'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'
+        }))
+        cache.commit(HEADERS)
+        assert cache.request_headers(HEADERS) == {
+            **HEADERS,
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+        }, 'Убедитесь, что запрос содержит валидаторы прошлого ответа.'
+        assert HEADERS == {'Authorization': 'OAuth token'}
+        unchanged = cache.check(
+            HEADERS, Response(status_code=HTTPStatus.NOT_MODIFIED)
+        )
+        assert unchanged.get('current_date') is None
+
+    def test_accounts_are_kept_apart(self):
+        cache = ResponseCache()
+        cache.check(HEADERS, Response(make_body(100)))
+        cache.commit(HEADERS)
+        other = {'Authorization': 'OAuth other'}
+        assert cache.check(other, Response(make_body(100))) is None
+
+    def test_stats_show_short_circuited_share(self):
+        cache = ResponseCache()
+        cache.check(HEADERS, Response(make_body(100)))
+        cache.commit(HEADERS)
+        cache.check(HEADERS, Response(make_body(200)))
+        cache.check(HEADERS, Response(status_code=HTTPStatus.NOT_MODIFIED))
+        cache.check(HEADERS, Response(make_body(300, 'rejected')))
+        assert cache.stats() == {
+            'polls': 4, 'not_modified': 1, 'unchanged': 1,
+            'short_circuited': 0.5,
+        }
+
+
+class TestPolling:
+
+    def test_unchanged_answer_moves_cursor_without_messages(
+            self, monkeypatch):
+        responses = iter([Response(make_body(100)), Response(make_body(200))])
+        monkeypatch.setattr(
+            homework, 'request_api',
+            lambda timestamp, headers, stream=False: next(responses)
+        )
+        sent = []
+        monkeypatch.setattr(
+            homework, 'send_message',
+            lambda bot, message: sent.append(message) or True
+        )
+        states = homework.HomeworkStateMap()
+        first = homework.fetch_api_answer(0, HEADERS)
+        assert homework.process_response(first, states, None) == 100
+        homework.get_response_cache().commit(HEADERS)
+        second = homework.fetch_api_answer(100, HEADERS)
+        assert isinstance(second, UnchangedResponse)
+        assert homework.process_response(second, states, None) == 200
+        assert len(sent) == 1, (
+            'Убедитесь, что неизменившийся ответ не порождает сообщений.'
+        )
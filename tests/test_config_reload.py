@@ -0,0 +1,188 @@
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+
+import tests.check_utils as check_utils
+from accounts import Account
+from config_reload import ConfigWatcher, build_config, read_settings
+from engine import PollingEngine
+from exceptions import ConfigError
+from scheduler import AdaptiveSchedule, FixedSchedule
+
+
+def write_env(path, **values):
+    path.write_text(
+        ''.join(f'{name}={value}\n' for name, value in values.items())
+    )
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def write_accounts(path, accounts):
+    path.write_text(json.dumps([
+        {'token': token, 'chat_id': chat_id} for token, chat_id in accounts
+    ]))
+
+
+@pytest.fixture
+def config_files(tmp_path, monkeypatch):
+    for name in ('ACCOUNTS_FILE', 'TOKEN', 'TELEGRAM_CHAT_ID',
+                 'ADAPTIVE_POLLING'):
+        monkeypatch.delenv(name, raising=False)
+    env = tmp_path / '.env'
+    accounts = tmp_path / 'accounts.json'
+    write_accounts(accounts, [('token-1', 1), ('token-2', 2)])
+    write_env(env, TELEGRAM_TOKEN='bot-token', ACCOUNTS_FILE=accounts)
+    return env, accounts
+
+
+class TestBuildConfig:
+
+    def test_file_wins_over_environment(self, config_files, monkeypatch):
+        env, _ = config_files
+        monkeypatch.setenv('TELEGRAM_TOKEN', 'old-token')
+        assert read_settings(env)['TELEGRAM_TOKEN'] == 'bot-token', (
+            'Убедитесь, что изменения файла конфигурации применяются.'
+        )
+
+    def test_valid_config(self, config_files):
+        env, _ = config_files
+        config = build_config(read_settings(env))
+        assert config.telegram_token == 'bot-token'
+        assert config.accounts == [
+            Account('token-1', 1), Account('token-2', 2)
+        ]
+        assert isinstance(config.schedule, FixedSchedule)
+
+    def test_single_account_from_env(self):
+        config = build_config({
+            'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '5',
+            'ADAPTIVE_POLLING': '1', 'POLL_MIN_PERIOD': '60',
+        })
+        assert config.accounts == [Account('token', '5')]
+        assert isinstance(config.schedule, AdaptiveSchedule)
+        assert config.schedule.min_period == 60
+
+    def test_fixed_period_from_settings(self):
+        config = build_config({
+            'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '5',
+            'RETRY_PERIOD': '120',
+        })
+        assert config.schedule.next_delay(None) == 120, (
+            'Убедитесь, что интервал опроса берётся из настроек.'
+        )
+
+    def test_key_removed_from_file_is_dropped(self, config_files,
+                                              monkeypatch):
+        import config_reload
+
+        env, _ = config_files
+        monkeypatch.setenv('ACCOUNTS_FILE', 'from-old-file.json')
+        monkeypatch.setattr(
+            config_reload, 'DOTENV_KEYS', frozenset({'ACCOUNTS_FILE'})
+        )
+        write_env(env, TELEGRAM_TOKEN='bot-token')
+        assert 'ACCOUNTS_FILE' not in read_settings(env), (
+            'Убедитесь, что удалённая из файла настройка не остаётся '
+            'после перезагрузки.'
+        )
+
+    @pytest.mark.parametrize('settings', [
+        {'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '1'},
+        {'TELEGRAM_TOKEN': 'bot'},
+        {'TELEGRAM_TOKEN': 'bot', 'ACCOUNTS_FILE': '/nonexistent.json'},
+        {'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '1',
+         'ADAPTIVE_POLLING': '1', 'POLL_MIN_PERIOD': '9000'},
+        {'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '1',
+         'ADAPTIVE_POLLING': '1', 'POLL_JITTER': 'often'},
+        {'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '1',
+         'RETRY_PERIOD': '0'},
+        {'TELEGRAM_TOKEN': 'bot', 'TOKEN': 'token', 'TELEGRAM_CHAT_ID': '1',
+         'RETRY_PERIOD': 'hourly'},
+    ])
+    def test_invalid_config_raises(self, settings):
+        with pytest.raises(ConfigError):
+            build_config(settings)
+
+    def test_account_without_chat_is_rejected(self, tmp_path):
+        accounts = tmp_path / 'accounts.json'
+        write_accounts(accounts, [('token-1', 1), ('token-2', '')])
+        with pytest.raises(ConfigError):
+            build_config({
+                'TELEGRAM_TOKEN': 'bot', 'ACCOUNTS_FILE': str(accounts)
+            })
+
+
+class TestConfigWatcher:
+
+    def test_edit_is_detected_and_applied(self, config_files):
+        env, accounts = config_files
+        applied = []
+        watcher = ConfigWatcher(applied.append, str(env))
+        assert not watcher.changed()
+        write_accounts(accounts, [('token-3', 3)])
+        assert watcher.changed(), (
+            'Убедитесь, что изменение файла аккаунтов замечается.'
+        )
+        watcher.reload()
+        assert not watcher.changed()
+        assert applied[0].accounts == [Account('token-3', 3)]
+
+    def test_invalid_edit_keeps_running_config(self, config_files):
+        env, accounts = config_files
+        applied = []
+        watcher = ConfigWatcher(applied.append, str(env))
+        accounts.write_text('[{"token": "token-3"')
+        assert watcher.reload() is None
+        assert applied == [], (
+            'Убедитесь, что некорректная конфигурация не применяется.'
+        )
+        assert watcher.rejected == 1
+
+    def test_sighup_forces_reload(self, config_files):
+        env, _ = config_files
+        applied = []
+        watcher = ConfigWatcher(applied.append, str(env), interval=60)
+
+        async def run():
+            task = asyncio.create_task(watcher.run())
+            await asyncio.sleep(0.01)
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(100):
+                if applied:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(run())
+        assert len(applied) == 1, (
+            'Убедитесь, что по SIGHUP конфигурация перечитывается.'
+        )
+
+
+class TestApplyConfig:
+
+    def test_accounts_schedule_and_bot_are_swapped(self, config_files):
+        env, accounts = config_files
+        bot = check_utils.MockTelegramBot()
+        engine = PollingEngine([Account('token-1', 1)], bot)
+        state = engine.states[Account('token-1', 1).key]
+        write_accounts(accounts, [('token-1', 10), ('token-2', 2)])
+        write_env(
+            env, TELEGRAM_TOKEN='new-bot-token', ACCOUNTS_FILE=accounts,
+            ADAPTIVE_POLLING=1
+        )
+        config = build_config(read_settings(env))
+        assert engine.apply_config(config) == (1, 0)
+        engine.close()
+        assert engine.accounts == [
+            Account('token-1', 10), Account('token-2', 2)
+        ]
+        assert engine.states[Account('token-1', 10).key] is state, (
+            'Состояние оставшегося аккаунта должно сохраняться.'
+        )
+        assert engine.schedule is config.schedule
+        assert engine.bot is not bot and engine.bot.token == 'new-bot-token'
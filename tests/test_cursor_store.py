@@ -0,0 +1,133 @@
+import pytest
+
+from cursor_store import (
+    FileCursorStore,
+    MemoryCursorStore,
+    SQLiteCursorStore,
+    open_cursor_store,
+    shared_store_path,
+)
+
+
+class TestCursorStore:
+
+    @pytest.mark.parametrize('path, expected', [
+        ('cursors.json', 'cursors.db'),
+        ('state.sqlite', 'state.sqlite'),
+        ('', ''),
+    ])
+    def test_shared_store_path(self, path, expected):
+        assert shared_store_path(path) == expected
+
+    @pytest.mark.parametrize('filename', ['cursors.json', 'cursors.db'])
+    def test_cursor_survives_restart(self, tmp_path, filename,
+                                     random_timestamp):
+        path = str(tmp_path / filename)
+        store = open_cursor_store(path)
+        store.set('default', random_timestamp)
+        store.close()
+
+        restored = open_cursor_store(path)
+        assert restored.get('default') == random_timestamp, (
+            'Убедитесь, что курсор `from_date` восстанавливается после '
+            'перезапуска.'
+        )
+        restored.close()
+
+    @pytest.mark.parametrize('filename', ['cursors.json', 'cursors.db'])
+    def test_homework_states_survive_restart(self, tmp_path, filename):
+        path = str(tmp_path / filename)
+        rows = [
+            [1, 'approved', '2021-04-11T10:31:09Z'],
+            ['hw', 'reviewing', None],
+        ]
+        store = open_cursor_store(path)
+        store.set_homeworks('default', rows)
+        store.close()
+
+        restored = open_cursor_store(path)
+        assert restored.get_homeworks('default') == rows, (
+            'Убедитесь, что статусы работ восстанавливаются после '
+            'перезапуска.'
+        )
+        restored.close()
+
+    def test_reads_cursor_only_file(self, tmp_path):
+        path = tmp_path / 'cursors.json'
+        path.write_text('{"default": 42}', encoding='utf-8')
+        store = open_cursor_store(str(path))
+        assert store.get('default') == 42
+        assert store.get_homeworks('default') == []
+
+    def test_store_type_by_path(self, tmp_path):
+        assert isinstance(open_cursor_store(''), MemoryCursorStore)
+        assert isinstance(
+            open_cursor_store(str(tmp_path / 'c.json')), FileCursorStore
+        )
+        assert isinstance(
+            open_cursor_store(str(tmp_path / 'c.sqlite')), SQLiteCursorStore
+        )
+
+    def test_unsaved_cursor_returns_default(self, tmp_path):
+        store = open_cursor_store(str(tmp_path / 'cursors.json'))
+        assert store.get('missing', 42) == 42
+
+    def test_main_advances_cursor(self, monkeypatch, random_timestamp,
+                                  homework_module, cursor_store_path):
+        import tests.check_utils as check_utils
+
+        monkeypatch.setattr(homework_module, 'check_tokens', lambda: None)
+        monkeypatch.setattr(
+            homework_module, 'TeleBot', check_utils.MockTelegramBot
+        )
+        requested = []
+
+        def get_api_answer(timestamp):
+            requested.append(timestamp)
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        def sleep(seconds):
+            if len(requested) == 2:
+                raise check_utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+        monkeypatch.setattr(homework_module.time, 'sleep', sleep)
+        with pytest.raises(check_utils.BreakInfiniteLoop):
+            homework_module.main()
+
+        assert requested[1] == random_timestamp, (
+            'Убедитесь, что следующий запрос использует `current_date` '
+            'из предыдущего ответа.'
+        )
+        store = open_cursor_store(shared_store_path(cursor_store_path))
+        assert store.get(homework_module.ACCOUNT_KEY) == random_timestamp, (
+            'Убедитесь, что бот хранит курсор под тем же ключом аккаунта, '
+            'что движок и импорт истории.'
+        )
+
+    def test_main_reads_legacy_cursor(self, monkeypatch, homework_module,
+                                      cursor_store_path):
+        import tests.check_utils as check_utils
+
+        store = open_cursor_store(shared_store_path(cursor_store_path))
+        store.set('default', 1234)
+        store.close()
+        monkeypatch.setattr(homework_module, 'check_tokens', lambda: None)
+        monkeypatch.setattr(
+            homework_module, 'TeleBot', check_utils.MockTelegramBot
+        )
+        requested = []
+
+        def sleep(seconds):
+            raise check_utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(
+            homework_module, 'get_api_answer',
+            lambda timestamp: requested.append(timestamp) or {
+                'homeworks': [], 'current_date': timestamp
+            }
+        )
+        monkeypatch.setattr(homework_module.time, 'sleep', sleep)
+        with pytest.raises(check_utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert requested == [1234]
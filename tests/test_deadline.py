@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+from deadline import Deadline, check_deadline, request_timeout, tick_deadline
+from exceptions import TickTimeoutError
+
+
+class TestDeadline:
+
+    def test_expired_deadline_raises(self):
+        clock = iter([0, 5, 11]).__next__
+        deadline = Deadline(10, clock=clock)
+        deadline.check('fetch')
+        with pytest.raises(TickTimeoutError):
+            deadline.check('send_message')
+
+    def test_request_timeout_clamped_inside_tick(self):
+        assert request_timeout((5, 30)) == (5, 30)
+        with tick_deadline(2):
+            connect, read = request_timeout((5, 30))
+        assert connect <= 2 and read <= 2, (
+            'Убедитесь, что таймауты запроса не превышают остаток бюджета '
+            'цикла опроса.'
+        )
+
+    def test_check_outside_tick_is_noop(self):
+        check_deadline('send_message')
+
+    def test_api_request_has_timeout(self, monkeypatch, homework_module,
+                                     current_timestamp):
+        captured = {}
+
+        def request(method, url, **kwargs):
+            captured.update(kwargs, method=method)
+            return check_utils.MockResponseGET(
+                random_timestamp=current_timestamp
+            )
+
+        monkeypatch.setattr(
+            homework_module.get_transport().session, 'request', request
+        )
+        homework_module.get_api_answer(current_timestamp)
+        assert captured['method'] == 'GET'
+        assert captured.get('timeout'), (
+            'Убедитесь, что запрос к API выполняется с таймаутом.'
+        )
+
+
+class TestEngineDeadline:
+
+    def test_overrunning_poll_cancelled(self, random_timestamp):
+        from circuit_breaker import CircuitBreaker
+        from accounts import Account
+        from engine import PollingEngine
+
+        def slow_fetch(timestamp, headers):
+            time.sleep(0.3)
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(),
+            fetch=slow_fetch, tick_deadline=0.05,
+            breaker=CircuitBreaker('test'),
+            send=lambda *args: True
+        )
+        started = time.monotonic()
+        asyncio.run(engine.run_tick())
+        elapsed = time.monotonic() - started
+        engine.close()
+
+        assert engine.timeouts == 1, (
+            'Убедитесь, что превысивший бюджет цикл учитывается как таймаут.'
+        )
+        assert elapsed < 0.3
+        state = engine.states[Account('token', 1).key]
+        assert state.timestamp != random_timestamp
+
+
+class TestExpiredDeadline:
+
+    def test_clamp_raises_when_budget_spent(self):
+        deadline = Deadline(1, clock=iter([0, 2]).__next__)
+        with pytest.raises(TickTimeoutError):
+            deadline.clamp((5, 30))
+
+    def test_request_after_deadline_is_timeout(self, monkeypatch,
+                                               homework_module):
+        monkeypatch.setattr(
+            homework_module.get_transport().session, 'request',
+            lambda *args, **kwargs: pytest.fail(
+                'Запрос не должен уходить после дедлайна.'
+            )
+        )
+        with tick_deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(TickTimeoutError):
+                homework_module.fetch_api_answer(0, {})
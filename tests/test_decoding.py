@@ -0,0 +1,75 @@
+import json
+import sys
+
+import pytest
+
+import homework
+from decoding import Decoder, load_backend
+from exceptions import JsonTypeError
+
+BODY = json.dumps({
+    'homeworks': [{
+        'id': 1,
+        'homework_name': 'hw.zip',
+        'status': 'approved',
+        'date_updated': '2021-04-11T10:31:09Z',
+        'reviewer_comment': 'ok',
+        'lesson_name': 'lesson',
+    }],
+    'current_date': 1700000000,
+    'extra': {'nested': [1, 2, 3]},
+}).encode()
+
+BACKENDS = sorted({'json', load_backend('auto')[0]})
+
+
+class Response:
+
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {}
+        self.text = content.decode(errors='replace')
+
+    def json(self):
+        pytest.fail('Тело ответа должно разбираться выбранным декодером.')
+
+
+class TestDecoder:
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_full_mode_keeps_everything(self, backend):
+        assert Decoder(backend, fields_only=False).decode(BODY) == (
+            json.loads(BODY)
+        )
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_fields_mode_keeps_needed_fields(self, backend):
+        data = Decoder(backend, fields_only=True).decode(BODY)
+        assert data == {
+            'homeworks': [{
+                'id': 1,
+                'homework_name': 'hw.zip',
+                'status': 'approved',
+                'date_updated': '2021-04-11T10:31:09Z',
+            }],
+            'current_date': 1700000000,
+        }, 'Убедитесь, что в ответе остаются только нужные боту поля.'
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_invalid_body_raises_value_error(self, backend):
+        with pytest.raises(ValueError):
+            Decoder(backend).decode(b'{not json')
+
+    def test_auto_falls_back_to_stdlib(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'orjson', None)
+        monkeypatch.setitem(sys.modules, 'ujson', None)
+        assert load_backend('auto') == ('json', json.loads)
+
+    def test_invalid_body_reported_as_json_error(self, monkeypatch):
+        monkeypatch.setattr(
+            homework.get_transport(), 'get',
+            lambda **kwargs: Response(b'<html>')
+        )
+        with pytest.raises(JsonTypeError):
+            homework.fetch_api_answer(0, {})
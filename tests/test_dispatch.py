@@ -0,0 +1,74 @@
+import asyncio
+
+import tests.check_utils as check_utils
+from accounts import Account
+from constants import HOMEWORK_VERDICTS, RETRY_PERIOD
+from dispatch import STATUS_WEIGHTS, PollQueue, poll_priority
+from engine import PollingEngine
+from status_diff import HomeworkStateMap
+
+NOW = 1_700_000_000
+
+
+class TestPollPriority:
+
+    def test_every_verdict_has_a_weight(self):
+        assert set(STATUS_WEIGHTS) == set(HOMEWORK_VERDICTS)
+
+    def test_reviewing_goes_first(self, states_with):
+        assert poll_priority(states_with('reviewing'), now=NOW) > (
+            poll_priority(HomeworkStateMap(), now=NOW)
+        ) > poll_priority(states_with('approved'), now=NOW), (
+            'Убедитесь, что аккаунты с работой на проверке опрашиваются '
+            'первыми.'
+        )
+
+    def test_recent_change_raises_priority(self, states_with):
+        assert poll_priority(states_with('approved', NOW - 60), now=NOW) > (
+            poll_priority(states_with('approved', NOW - 10 ** 6), now=NOW)
+        )
+
+    def test_overdue_account_is_not_starved(self, states_with):
+        assert poll_priority(
+            states_with('approved'), overdue=10 * RETRY_PERIOD, now=NOW
+        ) > poll_priority(states_with('reviewing'), now=NOW), (
+            'Давно просроченный опрос должен со временем обогнать остальные.'
+        )
+
+
+class TestPollQueue:
+
+    def test_highest_priority_first_and_ties_in_order(self):
+        queue = PollQueue()
+        for item, priority in (('a', 1), ('b', 3), ('c', 1), ('d', 2)):
+            queue.push(item, priority)
+        assert [queue.pop() for _ in range(len(queue))] == [
+            'b', 'd', 'a', 'c'
+        ]
+
+
+class TestEngineDispatch:
+
+    def test_reviewing_account_is_polled_first(self, states_with,
+                                               random_timestamp):
+        accounts = [Account(f'token-{i}', i) for i in range(5)]
+        polled = []
+
+        def fetch(timestamp, headers):
+            polled.append(headers['Authorization'])
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        engine = PollingEngine(
+            accounts, check_utils.MockTelegramBot(), concurrency=1,
+            fetch=fetch
+        )
+        engine.states[accounts[3].key].homework_states = states_with(
+            'reviewing'
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+        assert polled[0] == 'OAuth token-3', (
+            'Убедитесь, что при нехватке слотов первым опрашивается аккаунт '
+            'с работой на проверке.'
+        )
+        assert len(polled) == len(accounts)
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+
+
+class TestPollingEngine:
+
+    def test_tick_polls_every_account(self, make_fetch,
+                                      data_with_new_hw_status):
+        from accounts import Account
+        from engine import PollingEngine
+
+        accounts = [Account(f'token-{i}', i) for i in range(20)]
+        sent = []
+        engine = PollingEngine(
+            accounts, check_utils.MockTelegramBot(), concurrency=5,
+            fetch=make_fetch(data_with_new_hw_status),
+            send=lambda bot, chat_id, message: sent.append(chat_id) or True
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+
+        assert engine.polls == len(accounts), (
+            'Убедитесь, что за один тик опрашиваются все аккаунты.'
+        )
+        assert sorted(sent) == list(range(20)), (
+            'Убедитесь, что уведомление отправляется в чат каждого аккаунта.'
+        )
+
+    def test_concurrency_limit(self, random_timestamp):
+        from accounts import Account
+        from engine import PollingEngine
+
+        lock = threading.Lock()
+        active = {'now': 0, 'max': 0}
+
+        def fetch(timestamp, headers):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.01)
+            with lock:
+                active['now'] -= 1
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        accounts = [Account(f'token-{i}', i) for i in range(30)]
+        engine = PollingEngine(
+            accounts, check_utils.MockTelegramBot(), concurrency=4,
+            fetch=fetch
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+
+        assert 1 < active['max'] <= 4, (
+            'Убедитесь, что число одновременных запросов ограничено '
+            'параметром `concurrency`.'
+        )
+
+    def test_same_status_sent_once(self, make_fetch,
+                                   data_with_new_hw_status):
+        from accounts import Account
+        from engine import PollingEngine
+
+        sent = []
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(),
+            fetch=make_fetch(data_with_new_hw_status),
+            send=lambda bot, chat_id, message: sent.append(message) or True
+        )
+        asyncio.run(engine.run_tick())
+        asyncio.run(engine.run_tick())
+        engine.close()
+
+        assert len(sent) == 1, (
+            'Убедитесь, что неизменившийся статус не отправляется повторно.'
+        )
+
+    def test_account_headers_hide_token(self):
+        from accounts import Account
+
+        account = Account('secret-token', 1)
+        assert account.headers == {'Authorization': 'OAuth secret-token'}
+        assert 'secret-token' not in account.key, (
+            'Ключ аккаунта не должен содержать токен.'
+        )
+
+    def test_notifications_go_through_outbox(self, make_fetch,
+                                             data_with_new_hw_status):
+        from accounts import Account
+        from engine import PollingEngine
+
+        class Outbox:
+            def __init__(self):
+                self.queued = []
+
+            def put(self, chat_id, message):
+                self.queued.append(chat_id)
+                return True
+
+            def stop(self, timeout=None):
+                pass
+
+        outbox = Outbox()
+        engine = PollingEngine(
+            [Account('token', 7)], check_utils.MockTelegramBot(),
+            fetch=make_fetch(data_with_new_hw_status), outbox=outbox,
+            send=lambda *args: pytest.fail('Отправка должна идти через очередь.')
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+        assert outbox.queued == [7]
+
+    def test_json_store_warned_for_many_accounts(self, tmp_path, caplog):
+        from accounts import Account
+        from cursor_store import FileCursorStore
+        from engine import PollingEngine
+
+        engine = PollingEngine(
+            [Account('token-1', 1), Account('token-2', 2)],
+            check_utils.MockTelegramBot(),
+            cursor_store=FileCursorStore(str(tmp_path / 'cursors.json'))
+        )
+        engine.close()
+        assert 'SQLite' in caplog.text, (
+            'Убедитесь, что движок предупреждает о JSON-хранилище курсоров '
+            'для многих аккаунтов.'
+        )
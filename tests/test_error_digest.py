@@ -0,0 +1,121 @@
+import asyncio
+
+import tests.check_utils as check_utils
+from error_digest import ErrorAggregator, format_time, normalize_message
+from exceptions import ApiConnectionError
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_aggregator(window=3600):
+    clock = Clock()
+    return ErrorAggregator(window, clock), clock
+
+
+class TestErrorAggregator:
+
+    def test_normalized_messages_share_a_group(self):
+        assert normalize_message('Status code 503 after 1.5 s') == (
+            normalize_message('Status code 502 after 12.25 s')
+        )
+        errors, _ = make_aggregator()
+        errors.record(ApiConnectionError('Status code 503'))
+        errors.record(ApiConnectionError('Status code 502'))
+        errors.record(ValueError('Status code 503'))
+        assert len(errors) == 2, (
+            'Убедитесь, что ошибки группируются по классу и сообщению без '
+            'чисел.'
+        )
+
+    def test_first_error_is_sent_at_once(self):
+        errors, _ = make_aggregator()
+        errors.record(ApiConnectionError('Status code 503'))
+        assert errors.pending() == 'Program error: Status code 503'
+        errors.delivered()
+        errors.record(ApiConnectionError('Status code 502'))
+        assert errors.pending() is None, (
+            'Убедитесь, что повтор ошибки не отправляется до конца окна.'
+        )
+
+    def test_alternating_errors_are_sent_in_one_digest(self):
+        errors, clock = make_aggregator()
+        sent = []
+        for tick in range(6):
+            error = (ApiConnectionError('Status code 503') if tick % 2
+                     else TimeoutError('timed out'))
+            errors.record(error)
+            message = errors.pending()
+            if message:
+                sent.append(message)
+                errors.delivered()
+            clock.now += 600
+        message = errors.pending()
+        errors.delivered()
+        assert len(sent) == 2, (
+            'Убедитесь, что чередующиеся ошибки не отправляются на каждом '
+            'опросе.'
+        )
+        start = 1_700_000_000
+        assert message.splitlines() == [
+            'Program errors over the last 60 min:',
+            f'TimeoutError x3 (first {format_time(start)}, '
+            f'last {format_time(start + 2400)}): timed out',
+            f'ApiConnectionError x3 (first {format_time(start + 600)}, '
+            f'last {format_time(start + 3000)}): Status code 503',
+        ]
+
+    def test_recurring_group_is_not_sent_at_once_again(self):
+        errors, clock = make_aggregator()
+        errors.record(TimeoutError('timed out'))
+        errors.pending()
+        errors.delivered()
+        clock.now += 3600
+        assert errors.pending() is None, (
+            'Ошибка без повторов не должна попадать в сводку.'
+        )
+        errors.record(TimeoutError('timed out'))
+        assert errors.pending() is None
+        clock.now += 3600
+        assert 'TimeoutError x1' in errors.pending()
+        errors.delivered()
+        clock.now += 3600
+        assert errors.pending() is None
+        assert len(errors) == 0
+
+    def test_undelivered_errors_go_into_the_digest(self):
+        errors, clock = make_aggregator()
+        errors.record(TimeoutError('timed out'))
+        assert errors.pending()
+        clock.now += 3600
+        assert 'TimeoutError x1' in errors.pending(), (
+            'Убедитесь, что неотправленная ошибка попадает в сводку.'
+        )
+
+
+class TestEngineErrors:
+
+    def test_repeated_errors_are_sent_once(self):
+        from accounts import Account
+        from engine import PollingEngine
+
+        def fetch(timestamp, headers):
+            raise ApiConnectionError('Status code 503')
+
+        sent = []
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(), fetch=fetch,
+            send=lambda bot, chat_id, message: sent.append(message) or True
+        )
+        for _ in range(3):
+            asyncio.run(engine.run_tick())
+        engine.close()
+        assert sent == ['Program error: Status code 503'], (
+            'Убедитесь, что движок не повторяет одну и ту же ошибку.'
+        )
@@ -0,0 +1,99 @@
+import io
+import logging
+
+import pytest
+
+from log_pipeline import FlightRecorder, LogPipeline, SamplingFilter
+
+
+@pytest.fixture
+def pipeline_logger():
+    stream = io.StringIO()
+    logger = logging.getLogger('tests.log_pipeline')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    pipeline = LogPipeline(
+        stream=stream, capacity=5,
+        sampling=SamplingFilter(burst=2, every=10)
+    ).attach(logger)
+    yield logger, pipeline, stream
+    pipeline.stop()
+    logger.removeHandler(pipeline.handler)
+
+
+def record(lineno, level=logging.DEBUG, created=0):
+    return logging.makeLogRecord({
+        'levelno': level, 'levelname': logging.getLevelName(level),
+        'pathname': 'homework.py', 'lineno': lineno, 'created': created,
+        'msg': f'line {lineno}',
+    })
+
+
+class TestSamplingFilter:
+
+    def test_repeated_debug_lines_are_sampled(self):
+        sampling = SamplingFilter(burst=3, every=10, window=60)
+        passed = sum(sampling.filter(record(1)) for _ in range(103))
+        assert passed == 3 + 10, (
+            'Убедитесь, что повторяющиеся DEBUG-записи прореживаются.'
+        )
+        assert sampling.dropped == 90
+
+    def test_call_sites_and_levels_are_independent(self):
+        sampling = SamplingFilter(burst=1, every=100)
+        assert sampling.filter(record(1))
+        assert not sampling.filter(record(1))
+        assert sampling.filter(record(2))
+        assert sampling.filter(record(1, logging.ERROR))
+
+    def test_window_resets_counts(self):
+        sampling = SamplingFilter(burst=1, every=100, window=60)
+        assert sampling.filter(record(1, created=0))
+        assert not sampling.filter(record(1, created=30))
+        assert sampling.filter(record(1, created=61))
+
+
+class TestFlightRecorder:
+
+    def test_dropped_records_dumped_on_error(self, pipeline_logger):
+        logger, pipeline, stream = pipeline_logger
+        for number in range(10):
+            logger.debug(f'poll {number}')
+        logger.error('API is down')
+        pipeline.stop()
+        lines = stream.getvalue().splitlines()
+        assert 'Flight recorder: 5 earlier records.' in lines[2], (
+            'Убедитесь, что при ошибке выводятся последние отброшенные '
+            'записи.'
+        )
+        assert [line.rsplit(' - ', 1)[1] for line in lines[3:]] == [
+            'poll 5', 'poll 6', 'poll 7', 'poll 8', 'poll 9', 'API is down'
+        ]
+
+    def test_records_below_level_are_kept(self):
+        stream = io.StringIO()
+        console = logging.StreamHandler(stream)
+        console.setLevel(logging.INFO)
+        recorder = FlightRecorder(console, capacity=10)
+        recorder.handle(record(1))
+        assert stream.getvalue() == ''
+        assert len(recorder.buffer) == 1
+        recorder.handle(record(2, logging.ERROR))
+        assert stream.getvalue().splitlines()[-2:] == ['line 1', 'line 2']
+        assert not recorder.buffer
+
+
+class TestLogPipeline:
+
+    def test_writes_from_background_thread(self, pipeline_logger):
+        logger, pipeline, stream = pipeline_logger
+        logger.info('started')
+        pipeline.stop()
+        assert stream.getvalue().endswith(' - INFO - started\n')
+
+    def test_homework_logger_uses_queue(self, homework_module):
+        from logging.handlers import QueueHandler
+        assert any(
+            isinstance(handler, QueueHandler)
+            for handler in homework_module.logger.handlers
+        ), 'Убедитесь, что логи пишутся через очередь.'
@@ -0,0 +1,82 @@
+import urllib.request
+
+import pytest
+
+from metrics import Registry, start_metrics_server, timed, STAGE_ERRORS
+
+
+class TestRegistry:
+
+    def test_counter_and_gauge_rendered(self):
+        registry = Registry()
+        counter = registry.counter('sent', 'Sent messages.', ('chat',))
+        counter.inc(chat='1')
+        counter.inc(2, chat='1')
+        registry.gauge('depth', 'Queue depth.', function=lambda: 5)
+
+        text = registry.render()
+        assert '# TYPE sent counter' in text
+        assert 'sent_total{chat="1"} 3.0' in text
+        assert 'depth 5.0' in text
+
+    def test_histogram_buckets_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram(
+            'latency', 'Latency.', buckets=(0.1, 1)
+        )
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert 'latency_bucket{le="0.1"} 1' in text
+        assert 'latency_bucket{le="1.0"} 2' in text
+        assert 'latency_bucket{le="+Inf"} 3' in text
+        assert 'latency_count 3' in text
+        assert 'latency_sum 5.55' in text
+
+    def test_label_values_escaped(self):
+        registry = Registry()
+        registry.counter('errors', 'Errors.', ('message',)).inc(
+            message='say "hi"\n'
+        )
+        assert 'message="say \\"hi\\"\\n"' in registry.render()
+
+
+class TestStageMetrics:
+
+    def test_errors_counted_by_exception_class(self, homework_module):
+        before = STAGE_ERRORS.value(
+            stage='check_response', exception='NotDictTypeDataError'
+        )
+        with pytest.raises(TypeError):
+            homework_module.check_response([])
+        after = STAGE_ERRORS.value(
+            stage='check_response', exception='NotDictTypeDataError'
+        )
+        assert after == before + 1, (
+            'Убедитесь, что ошибки этапов считаются по классу исключения.'
+        )
+
+    def test_timed_keeps_signature_and_doc(self):
+        @timed('stage')
+        def stage(argument):
+            """Doc."""
+            return argument
+
+        assert stage(1) == 1
+        assert stage.__doc__ == 'Doc.'
+
+    def test_endpoint_serves_prometheus_text(self):
+        server = start_metrics_server(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(
+                    f'http://127.0.0.1:{port}/metrics', timeout=1
+            ) as response:
+                body = response.read().decode()
+                content_type = response.headers['Content-Type']
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert content_type.startswith('text/plain')
+        assert 'homework_stage_seconds' in body
@@ -0,0 +1,211 @@
+import threading
+import time
+
+import pytest
+from telebot import apihelper
+
+import homework
+from exceptions import TelegramChatError, TelegramSendError
+from outbox import Outbox
+from rate_limit import TokenBucket
+
+
+class RecordingSend:
+    def __init__(self, fail_times=0, error=None):
+        self.sent = []
+        self.fail_times = fail_times
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, bot, chat_id, text):
+        self.release.wait(1)
+        if self.fail_times:
+            self.fail_times -= 1
+            if self.error is not None:
+                raise self.error
+            return False
+        self.sent.append((chat_id, text))
+        return True
+
+
+class TestTokenBucket:
+
+    def test_burst_then_sustained_rate(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+        assert [bucket.try_acquire() for _ in range(4)] == [
+            True, True, True, False
+        ]
+        assert bucket.wait_time() == 0.5
+        clock.now = 0.5
+        assert bucket.try_acquire()
+
+
+class TestOutbox:
+
+    def test_messages_for_busy_chat_coalesced(self):
+        send = RecordingSend()
+        send.release.clear()
+        outbox = Outbox(None, send=send, global_rate=100, chat_rate=100)
+        outbox.start()
+        outbox.put(1, 'first')
+        time.sleep(0.05)
+        outbox.put(1, 'second')
+        outbox.put(1, 'third')
+        send.release.set()
+        outbox.stop(1)
+
+        assert send.sent == [(1, 'first'), (1, 'second\nthird')], (
+            'Убедитесь, что накопившиеся сообщения одного чата '
+            'объединяются в одно.'
+        )
+        stats = outbox.stats()
+        assert stats['sent'] == 2
+        assert stats['coalesced'] == 1
+        assert stats['depth'] == 0
+        assert stats['max_depth'] >= 2
+
+    def test_put_does_not_block_on_slow_send(self):
+        send = RecordingSend()
+        send.release.clear()
+        outbox = Outbox(None, send=send, global_rate=100, chat_rate=100)
+        outbox.start()
+        started = time.monotonic()
+        for chat_id in range(10):
+            outbox.put(chat_id, 'status')
+        assert time.monotonic() - started < 0.1, (
+            'Убедитесь, что постановка сообщения в очередь не ждёт отправки.'
+        )
+        send.release.set()
+        outbox.stop(1)
+        assert sorted(chat_id for chat_id, _ in send.sent) == list(range(10))
+
+    def test_failed_send_retried(self):
+        send = RecordingSend(fail_times=1)
+        outbox = Outbox(
+            None, send=send, global_rate=100, chat_rate=100,
+            retry_delay=0.01
+        )
+        outbox.start()
+        outbox.put(1, 'status')
+        outbox.stop(1)
+        assert send.sent == [(1, 'status')]
+
+    def test_failing_chat_backs_off_without_dropping(self):
+        send = RecordingSend(fail_times=5)
+        outbox = Outbox(
+            None, send=send, global_rate=1000, chat_rate=1000,
+            retry_delay=0.01, max_retry_delay=0.05
+        )
+        outbox.start()
+        outbox.put(1, 'status')
+        started = time.monotonic()
+        outbox.stop(2)
+        assert send.sent == [(1, 'status')], (
+            'Убедитесь, что сообщение не теряется после нескольких '
+            'неудачных отправок.'
+        )
+        assert outbox.stats()['failed'] == 5
+        assert time.monotonic() - started >= 0.01 + 0.02 + 0.04 + 0.05, (
+            'Убедитесь, что пауза между повторами растёт.'
+        )
+
+    def test_blocked_chat_dropped(self):
+        send = RecordingSend(
+            fail_times=1, error=TelegramChatError('blocked', 403)
+        )
+        outbox = Outbox(
+            None, send=send, global_rate=100, chat_rate=100,
+            retry_delay=10
+        )
+        outbox.put(1, 'status')
+        outbox.put(2, 'status')
+        outbox.start()
+        assert outbox.stop(1) == []
+        assert send.sent == [(2, 'status')]
+        stats = outbox.stats()
+        assert stats['dropped'] == 1 and stats['depth'] == 0, (
+            'Убедитесь, что сообщения в чат, который их не примет, '
+            'не повторяются бесконечно.'
+        )
+
+    def test_flood_limit_waits_retry_after(self):
+        send = RecordingSend(
+            fail_times=1,
+            error=TelegramSendError('flood', 429, retry_after=0.2)
+        )
+        outbox = Outbox(
+            None, send=send, global_rate=100, chat_rate=100,
+            retry_delay=0.01
+        )
+        outbox.start()
+        outbox.put(1, 'status')
+        started = time.monotonic()
+        outbox.stop(2)
+        assert send.sent == [(1, 'status')]
+        assert time.monotonic() - started >= 0.2, (
+            'Убедитесь, что после ответа 429 очередь ждёт `retry_after`.'
+        )
+
+    def test_long_messages_not_coalesced_over_limit(self):
+        send = RecordingSend()
+        outbox = Outbox(
+            None, send=send, global_rate=100, chat_rate=100,
+            message_limit=10
+        )
+        outbox.put(1, 'a' * 6)
+        outbox.put(1, 'b' * 6)
+        outbox.start()
+        outbox.stop(1)
+        assert send.sent == [(1, 'a' * 6), (1, 'b' * 6)]
+
+    def test_oversized_message_split(self):
+        send = RecordingSend()
+        outbox = Outbox(
+            None, send=send, global_rate=100, chat_rate=100,
+            message_limit=10
+        )
+        outbox.put(1, '\n'.join(['a' * 6, 'b' * 6, 'c' * 25]))
+        outbox.start()
+        outbox.stop(1)
+        assert all(len(text) <= 10 for _, text in send.sent), (
+            'Убедитесь, что очередь не отправляет сообщения длиннее лимита.'
+        )
+        assert ''.join(text for _, text in send.sent).replace('\n', '') == (
+            'a' * 6 + 'b' * 6 + 'c' * 25
+        )
+
+
+class TelegramBot:
+    def __init__(self, error_code, **parameters):
+        self.result_json = {
+            'ok': False, 'error_code': error_code,
+            'description': 'error', 'parameters': parameters,
+        }
+
+    def send_message(self, chat_id, text):
+        raise apihelper.ApiTelegramException(
+            'sendMessage', None, self.result_json
+        )
+
+
+class TestDeliverChatMessage:
+
+    @pytest.mark.parametrize('error_code', [400, 403])
+    def test_chat_errors_are_fatal(self, error_code):
+        with pytest.raises(TelegramChatError) as error:
+            homework.deliver_chat_message(TelegramBot(error_code), 1, 'text')
+        assert error.value.error_code == error_code
+
+    def test_flood_limit_carries_retry_after(self):
+        with pytest.raises(TelegramSendError) as error:
+            homework.deliver_chat_message(
+                TelegramBot(429, retry_after=7), 1, 'text'
+            )
+        assert not isinstance(error.value, TelegramChatError)
+        assert error.value.retry_after == 7, (
+            'Убедитесь, что `retry_after` из ответа Bot API не теряется.'
+        )
+
+    def test_send_chat_message_reports_failure(self):
+        assert homework.send_chat_message(TelegramBot(403), 1, 'text') is False
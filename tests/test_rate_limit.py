@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+from circuit_breaker import CLOSED, CircuitBreaker
+from deadline import tick_deadline
+from exceptions import ThrottledError
+from rate_limit import FairRateLimiter, get_rate_limiter, set_rate_limit
+
+
+class TestFairRateLimiter:
+
+    def test_waiting_keys_are_served_round_robin(self, clock, wait_until):
+        limiter = FairRateLimiter(rate=4, burst=1, clock=clock)
+        assert limiter.acquire('drain')
+        served = []
+        threads = []
+        for name in ('a1', 'a2', 'a3', 'b1'):
+            thread = threading.Thread(
+                target=lambda name=name: limiter.acquire(name[0])
+                and served.append(name),
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: limiter.stats()['queued'] == len(threads))
+        for count in range(1, 5):
+            clock.now += 0.25
+            wait_until(lambda: len(served) == count)
+        for thread in threads:
+            thread.join()
+
+        assert served == ['a1', 'b1', 'a2', 'a3'], (
+            'Убедитесь, что ожидающие запросы разных аккаунтов '
+            'обслуживаются по очереди.'
+        )
+
+    def test_timeout_gives_up_without_waiting(self):
+        limiter = FairRateLimiter(rate=1, burst=1)
+        assert limiter.acquire('a')
+        started = time.monotonic()
+        assert not limiter.acquire('a', timeout=0.05)
+        assert time.monotonic() - started < 0.5, (
+            'Убедитесь, что запрос, который не дождётся токена до '
+            'таймаута, сразу получает отказ.'
+        )
+        stats = limiter.stats()
+        assert stats['timeouts'] == 1
+        assert stats['requests'] == 1
+        assert stats['queued'] == 0
+
+    def test_zero_rate_disables_limit(self):
+        limiter = FairRateLimiter(rate=0)
+        assert all(limiter.acquire('a', timeout=0) for _ in range(100))
+        assert limiter.stats()['requests'] == 100
+        assert limiter.stats()['waited'] == 0
+
+    def test_wait_is_counted(self):
+        limiter = FairRateLimiter(rate=50, burst=1)
+        assert limiter.acquire('a')
+        assert limiter.acquire('b')
+        stats = limiter.stats()
+        assert stats['waited'] == 1
+        assert 0 < stats['wait_max'] <= 0.5
+        assert stats['wait_mean'] == pytest.approx(stats['wait_max'] / 2)
+
+
+class TestSharedRateLimit:
+
+    def test_limiter_is_shared(self):
+        assert get_rate_limiter() is get_rate_limiter()
+        limiter = set_rate_limit(5, 2)
+        assert get_rate_limiter() is limiter
+        assert limiter.bucket.rate == 5 and limiter.bucket.capacity == 2
+
+    def test_request_waits_no_longer_than_deadline(self, monkeypatch,
+                                                   homework_module):
+        set_rate_limit(0.01, 1)
+        assert get_rate_limiter().acquire('other')
+        monkeypatch.setattr(
+            homework_module.get_transport().session, 'request',
+            lambda *args, **kwargs: pytest.fail(
+                'Запрос не должен уходить без токена лимита.'
+            )
+        )
+        with tick_deadline(0.1):
+            with pytest.raises(ThrottledError):
+                homework_module.request_api(0, {'Authorization': 'OAuth t'})
+
+    def test_throttling_does_not_open_circuit(self, monkeypatch,
+                                              homework_module):
+        set_rate_limit(0.01, 1)
+        assert get_rate_limiter().acquire('other')
+        breaker = CircuitBreaker('practicum', failure_threshold=1)
+        for _ in range(3):
+            with tick_deadline(0.01):
+                with pytest.raises(ThrottledError):
+                    breaker.call(
+                        homework_module.request_api, 0,
+                        {'Authorization': 'OAuth t'}
+                    )
+        assert breaker.state == CLOSED and breaker.retry_delay() is None, (
+            'Убедитесь, что запросы, не дождавшиеся лимита, не считаются '
+            'сбоями API.'
+        )
+
+    def test_engine_retries_throttled_poll_quietly(self):
+        from accounts import Account
+        from engine import PollingEngine
+
+        def fetch(timestamp, headers):
+            raise ThrottledError('No rate limit token.')
+
+        sent = []
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(),
+            fetch=fetch,
+            send=lambda bot, chat_id, message: sent.append(message) or True
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+        assert engine.throttled == 1
+        assert sent == [], (
+            'Убедитесь, что ожидание лимита не отправляется в чат как ошибка.'
+        )
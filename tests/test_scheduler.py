@@ -0,0 +1,54 @@
+import calendar
+
+import pytest
+
+from scheduler import AdaptiveSchedule, FixedSchedule
+from status_diff import HomeworkStateMap
+
+NOON = calendar.timegm((2024, 3, 1, 12, 0, 0))
+NIGHT = calendar.timegm((2024, 3, 1, 2, 0, 0))
+
+
+@pytest.fixture
+def schedule():
+    return AdaptiveSchedule(
+        min_period=60, base_period=600, max_period=1800, idle_after=3600,
+        jitter=0, review_hours='6-21'
+    )
+
+
+class TestAdaptiveSchedule:
+
+    def test_fixed_schedule_keeps_retry_period(self):
+        assert FixedSchedule().next_delay(HomeworkStateMap()) == 600
+
+    def test_reviewing_shortens_interval(self, schedule, states_with):
+        states = states_with('reviewing', NOON)
+        assert schedule.next_delay(states, now=NOON) == 60, (
+            'Убедитесь, что во время ревью интервал опроса сокращается.'
+        )
+
+    def test_recent_change_keeps_base_interval(self, schedule, states_with):
+        states = states_with('approved', NOON - 60)
+        assert schedule.next_delay(states, now=NOON) == 600
+
+    def test_idle_and_night_lengthen_interval(self, schedule, states_with):
+        idle = states_with('approved', NOON - 7200)
+        assert schedule.next_delay(idle, now=NOON) == 1800
+        recent = states_with('approved', NIGHT - 60)
+        assert schedule.next_delay(recent, now=NIGHT) == 1800, (
+            'Убедитесь, что вне часов ревью интервал опроса увеличивается.'
+        )
+
+    def test_jitter_stays_within_bounds(self, states_with):
+        schedule = AdaptiveSchedule(
+            min_period=60, base_period=600, max_period=1800, jitter=0.5
+        )
+        states = states_with('reviewing', NOON)
+        delays = {schedule.next_delay(states, now=NOON) for _ in range(50)}
+        assert all(60 <= delay <= 1800 for delay in delays)
+        assert len(delays) > 1
+
+    def test_invalid_bounds_rejected(self):
+        with pytest.raises(ValueError):
+            AdaptiveSchedule(min_period=700, base_period=600)
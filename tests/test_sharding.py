@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+from accounts import Account
+from engine import PollingEngine
+from sharding import HashRing, shard_accounts
+from supervisor import Supervisor
+
+
+def exit_at_once(shard, shards):
+    os._exit(3)
+
+
+def sleep_forever(shard, shards):
+    while True:
+        time.sleep(1)
+
+
+class TestHashRing:
+
+    def test_keys_are_spread_evenly(self):
+        ring = HashRing(range(4))
+        counts = [0] * 4
+        for number in range(8000):
+            counts[ring.node_for(f'account-{number}')] += 1
+        assert min(counts) > 8000 / 4 * 0.7, (
+            'Убедитесь, что аккаунты распределяются по шардам равномерно.'
+        )
+
+    def test_adding_node_moves_few_keys(self):
+        keys = [f'account-{number}' for number in range(5000)]
+        ring = HashRing(range(4))
+        before = {key: ring.node_for(key) for key in keys}
+        ring.add(4)
+        moved = [key for key in keys if ring.node_for(key) != before[key]]
+        assert all(ring.node_for(key) == 4 for key in moved), (
+            'Убедитесь, что при добавлении шарда ключи переходят только в '
+            'новый шард.'
+        )
+        assert len(moved) < len(keys) / 5 * 1.4
+
+    def test_removing_node_restores_assignment(self):
+        keys = [f'account-{number}' for number in range(1000)]
+        ring = HashRing(range(3))
+        before = [ring.node_for(key) for key in keys]
+        ring.add(3)
+        ring.remove(3)
+        assert [ring.node_for(key) for key in keys] == before
+
+    def test_empty_ring(self):
+        with pytest.raises(LookupError):
+            HashRing().node_for('key')
+
+    def test_shards_partition_accounts(self):
+        accounts = [Account(f'token-{i}', i) for i in range(200)]
+        shards = [shard_accounts(accounts, shard, 3) for shard in range(3)]
+        assert sorted(sum(shards, []), key=lambda a: a.chat_id) == accounts
+
+
+class TestEngineAssign:
+
+    def test_assign_keeps_remaining_state(self, random_timestamp):
+        accounts = [Account(f'token-{i}', i) for i in range(3)]
+        engine = PollingEngine(
+            accounts[:2], check_utils.MockTelegramBot(),
+            fetch=lambda timestamp, headers: {
+                'homeworks': [], 'current_date': random_timestamp
+            }
+        )
+        asyncio.run(engine.run_tick())
+        assert engine.assign(accounts[1:]) == (1, 1)
+        assert engine.states[accounts[1].key].timestamp == random_timestamp, (
+            'Убедитесь, что оставшиеся аккаунты сохраняют своё состояние.'
+        )
+        assert accounts[0].key not in engine.states
+        assert engine.accounts == accounts[1:]
+        engine.close()
+
+
+class TestSupervisor:
+
+    def test_crashed_worker_is_restarted(self, wait_until):
+        supervisor = Supervisor(
+            workers=1, target=exit_at_once, restart_delay=0
+        )
+        supervisor.start()
+        wait_until(lambda: not supervisor.processes[0].is_alive())
+        supervisor.check()
+        assert supervisor.restarts == 1, (
+            'Убедитесь, что упавший воркер перезапускается.'
+        )
+        supervisor.stop()
+
+    def test_restarts_back_off(self, wait_until):
+        now = [0]
+        supervisor = Supervisor(
+            workers=1, target=exit_at_once, restart_delay=1,
+            clock=lambda: now[0]
+        )
+        supervisor.start()
+        wait_until(lambda: not supervisor.processes[0].is_alive())
+        supervisor.check()
+        assert supervisor.restart_at[0] == 1
+        now[0] = 1
+        supervisor.check()
+        wait_until(lambda: not supervisor.processes[0].is_alive())
+        supervisor.check()
+        assert supervisor.restart_at[0] == 3, (
+            'Убедитесь, что повторные перезапуски откладываются всё дольше.'
+        )
+        supervisor.stop()
+
+    def test_resize(self):
+        supervisor = Supervisor(workers=2, target=sleep_forever)
+        supervisor.start()
+        supervisor.resize(3)
+        assert sorted(supervisor.processes) == [0, 1, 2]
+        assert supervisor.workers == 3
+        stopped = supervisor.processes[2]
+        supervisor.resize(1)
+        assert sorted(supervisor.processes) == [0]
+        assert not stopped.is_alive()
+        supervisor.stop()
+        assert not supervisor.processes
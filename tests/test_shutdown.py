@@ -0,0 +1,198 @@
+import asyncio
+import inspect
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+from accounts import Account
+from deadline import tick_deadline
+from engine import PollingEngine
+from exceptions import ShutdownRequested
+from outbox import Outbox
+from shutdown import GracefulShutdown
+
+
+def send_signal_later(delay, signum=signal.SIGTERM):
+    timer = threading.Timer(delay, os.kill, (os.getpid(), signum))
+    timer.start()
+    return timer
+
+
+class TestGracefulShutdown:
+
+    def test_signal_interrupts_wait(self):
+        started = time.monotonic()
+        with GracefulShutdown() as shutdown:
+            send_signal_later(0.05)
+            with shutdown.waiting():
+                time.sleep(5)
+            pytest.fail('Ожидание должно прерываться сигналом.')
+        assert shutdown.requested
+        assert time.monotonic() - started < 1, (
+            'Убедитесь, что сигнал сразу прерывает ожидание.'
+        )
+
+    def test_signal_during_poll_lets_it_finish(self):
+        with GracefulShutdown(timeout=1) as shutdown:
+            with tick_deadline(60) as deadline:
+                os.kill(os.getpid(), signal.SIGTERM)
+                assert shutdown.requested
+                assert deadline.remaining() <= 1, (
+                    'Убедитесь, что после сигнала у опроса остаётся '
+                    'не больше `SHUTDOWN_TIMEOUT` секунд.'
+                )
+            with pytest.raises(ShutdownRequested):
+                with shutdown.waiting():
+                    pytest.fail('После сигнала ожидание не начинается.')
+
+    def test_previous_handlers_restored(self):
+        previous = signal.getsignal(signal.SIGTERM)
+        with GracefulShutdown():
+            assert signal.getsignal(signal.SIGTERM) != previous
+        assert signal.getsignal(signal.SIGTERM) == previous
+
+    def test_main_stops_during_sleep(self, monkeypatch, random_timestamp,
+                                     homework_module):
+        monkeypatch.setattr(homework_module, 'check_tokens', lambda: None)
+        monkeypatch.setattr(
+            homework_module, 'TeleBot', check_utils.MockTelegramBot
+        )
+        monkeypatch.setattr(
+            homework_module, 'get_api_answer',
+            lambda timestamp: {'homeworks': [], 'current_date': 1}
+        )
+        main = inspect.unwrap(homework_module.main)
+        send_signal_later(0.1)
+        started = time.monotonic()
+        main()
+        assert time.monotonic() - started < 1, (
+            'Убедитесь, что `main()` завершается по SIGTERM, не дожидаясь '
+            'конца паузы.'
+        )
+
+
+class TestEngineShutdown:
+
+    def test_engine_stops_on_signal(self, random_timestamp):
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(),
+            fetch=lambda timestamp, headers: {
+                'homeworks': [], 'current_date': random_timestamp
+            }
+        )
+        send_signal_later(0.1)
+        started = time.monotonic()
+        asyncio.run(engine.run_until_signalled(timeout=1))
+        engine.close()
+        assert engine.polls == 1
+        assert time.monotonic() - started < 1
+
+    def test_no_new_polls_after_stop(self, random_timestamp):
+        engine = None
+
+        def fetch(timestamp, headers):
+            engine.stop()
+            return {'homeworks': [], 'current_date': random_timestamp}
+
+        engine = PollingEngine(
+            [Account(f'token-{i}', i) for i in range(10)],
+            check_utils.MockTelegramBot(), concurrency=2, fetch=fetch
+        )
+        asyncio.run(engine.run_tick())
+        engine.close()
+        assert engine.polls <= 2, (
+            'Убедитесь, что после `stop` движок не начинает новые опросы.'
+        )
+
+    def test_slow_poll_cancelled_after_timeout(self):
+        def fetch(timestamp, headers):
+            time.sleep(0.3)
+            return {'homeworks': [], 'current_date': 1}
+
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(), fetch=fetch
+        )
+        send_signal_later(0.05)
+        started = time.monotonic()
+        asyncio.run(engine.run_until_signalled(timeout=0.2))
+        engine.close()
+        assert time.monotonic() - started < 0.3
+
+
+class TestOutboxSpool:
+
+    def test_unsent_messages_survive_restart(self, tmp_path):
+        spool = str(tmp_path / 'spool.json')
+        release = threading.Event()
+        sent = []
+
+        def slow_send(bot, chat_id, message):
+            release.wait(1)
+            sent.append(message)
+            return True
+
+        outbox = Outbox(
+            None, send=slow_send, global_rate=100, chat_rate=100,
+            spool_path=spool
+        )
+        outbox.start()
+        outbox.put(1, 'first')
+        time.sleep(0.05)
+        outbox.put(2, 'second')
+        outbox.put(3, 'third')
+        assert outbox.stop(0.05) == [
+            (1, 'first'), (2, 'second'), (3, 'third')
+        ]
+        release.set()
+        assert os.path.exists(spool), (
+            'Убедитесь, что неотправленные сообщения сохраняются.'
+        )
+
+        restarted = Outbox(
+            None, send=lambda bot, chat_id, message: sent.append(message)
+            or True, global_rate=100, chat_rate=100, spool_path=spool
+        )
+        restarted.start()
+        restarted.stop(1)
+        assert sorted(sent) == ['first', 'first', 'second', 'third'], (
+            'Убедитесь, что отправляемое при остановке сообщение '
+            'сохраняется и отправляется после перезапуска.'
+        )
+        assert not os.path.exists(spool)
+
+    def test_send_failing_after_stop_is_spooled(self, tmp_path):
+        spool = str(tmp_path / 'spool.json')
+        release = threading.Event()
+
+        def failing_send(bot, chat_id, message):
+            release.wait(1)
+            return False
+
+        outbox = Outbox(
+            None, send=failing_send, global_rate=100, chat_rate=100,
+            spool_path=spool
+        )
+        outbox.start()
+        outbox.put(1, 'in flight')
+        time.sleep(0.05)
+        assert outbox.stop(0.1) == [(1, 'in flight')]
+        release.set()
+        outbox._thread.join(1)
+        assert not outbox._thread.is_alive()
+        assert outbox.depth() == 0
+
+        sent = []
+        restarted = Outbox(
+            None, send=lambda bot, chat_id, message: sent.append(message)
+            or True, global_rate=100, chat_rate=100, spool_path=spool
+        )
+        restarted.start()
+        restarted.stop(1)
+        assert sent == ['in flight'], (
+            'Убедитесь, что сообщение, отправка которого не удалась после '
+            'остановки, не теряется.'
+        )
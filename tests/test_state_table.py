@@ -0,0 +1,41 @@
+from state_table import StateTable
+from validation import HomeworkRecord
+
+
+class TestStateTable:
+
+    def test_numbers_live_in_columns(self):
+        table = StateTable()
+        state = table.add('a', 1700000000)
+        state.next_poll_at = 12.5
+        state.timestamp = 1700000600
+
+        assert table['a'] is state and 'a' in table and len(table) == 1
+        assert table['a'].timestamp == 1700000600
+        assert table['a'].next_poll_at == 12.5
+        assert not hasattr(state, '__dict__'), (
+            'Убедитесь, что у записи состояния есть `__slots__`.'
+        )
+
+    def test_snapshot_restored(self):
+        table = StateTable()
+        state = table.add('a', 0, [[1, 'approved', '2024-01-01']])
+        assert state.homework_states.diff(
+            [HomeworkRecord(1, 'hw', 'approved', '2024-01-01')]
+        ) == []
+        assert state.next_poll_at == 0 and state.errors is None
+
+    def test_removed_state_keeps_its_row(self):
+        table = StateTable()
+        removed = table.add('a', 100)
+        removed.next_poll_at = 5
+        del table['a']
+        added = table.add('b', 200)
+        removed.timestamp = 300
+
+        assert added.timestamp == 200 and added.next_poll_at == 0, (
+            'Убедитесь, что удалённое состояние не портит строку, '
+            'занятую новым аккаунтом.'
+        )
+        assert removed.timestamp == 300 and removed.next_poll_at == 5
+        assert list(table) == ['b'] and table.get('a') is None
@@ -0,0 +1,151 @@
+from status_diff import HomeworkStateMap
+from validation import validate_homework
+
+
+def homework(homework_id, status, date_updated='2021-04-11T10:31:09Z'):
+    return {
+        'id': homework_id,
+        'homework_name': f'hw{homework_id}.zip',
+        'status': status,
+        'date_updated': date_updated,
+    }
+
+
+def record(homework_id, status):
+    return validate_homework(homework(homework_id, status))
+
+
+class TestHomeworkStateMap:
+
+    def test_all_simultaneous_changes_found(self):
+        states = HomeworkStateMap()
+        states.update([record(1, 'reviewing'), record(2, 'reviewing')])
+
+        changed = states.diff([
+            record(1, 'approved'), record(2, 'rejected'),
+            record(3, 'reviewing'),
+        ])
+        assert [item.id for item in changed] == [1, 2, 3], (
+            'Убедитесь, что находятся все изменившиеся домашние работы, '
+            'а не только первая.'
+        )
+
+    def test_diff_does_not_commit(self):
+        states = HomeworkStateMap()
+        homeworks = [record(1, 'approved')]
+        assert states.diff(homeworks) == homeworks
+        assert states.diff(homeworks) == homeworks, (
+            'Убедитесь, что `diff` не запоминает статусы до вызова `update`.'
+        )
+        states.update(homeworks)
+        assert states.diff(homeworks) == []
+
+    def test_flip_flop_between_homeworks_not_repeated(self):
+        states = HomeworkStateMap()
+        first, second = record(1, 'approved'), record(2, 'rejected')
+        for homeworks in ([first], [second], [first], [second]):
+            states.update(states.diff(homeworks))
+        assert states.diff([first, second]) == [], (
+            'Убедитесь, что уже отправленные статусы не отправляются '
+            'повторно при чередовании домашних работ.'
+        )
+
+
+class TestProcessResponse:
+
+    def test_one_message_per_tick(self, monkeypatch, homework_module,
+                                  random_timestamp):
+        sent = []
+        monkeypatch.setattr(
+            homework_module, 'send_message',
+            lambda bot, message: sent.append(message) or True
+        )
+        response = {
+            'homeworks': [homework(1, 'approved'), homework(2, 'rejected')],
+            'current_date': random_timestamp,
+        }
+        states = HomeworkStateMap()
+        result = homework_module.process_response(response, states, None)
+
+        assert result == random_timestamp
+        assert len(sent) == 1, (
+            'Убедитесь, что за один тик отправляется одно сообщение.'
+        )
+        assert 'hw1.zip' in sent[0] and 'hw2.zip' in sent[0]
+        assert homework_module.process_response(
+            response, states, None) == random_timestamp
+        assert len(sent) == 1
+
+    def test_statuses_stored_as_enum(self):
+        from status_diff import HomeworkStatus
+
+        states = HomeworkStateMap([[1, 'reviewing', '2021-04-11T10:31:09Z']])
+        assert states.statuses() == {'reviewing'}
+        assert states.has_status('reviewing')
+        assert not states.has_status('approved')
+        assert HomeworkStatus.REVIEWING in states._states, (
+            'Убедитесь, что статус хранится как `HomeworkStatus`, '
+            'а не как строка.'
+        )
+
+    def test_map_grows_past_small_size(self):
+        from status_diff import SMALL_MAP_SIZE
+
+        states = HomeworkStateMap()
+        homeworks = [
+            record(number, 'approved') for number in range(SMALL_MAP_SIZE + 2)
+        ]
+        for count in range(1, len(homeworks) + 1):
+            states.update(homeworks[count - 1:count])
+            assert len(states) == count
+            assert states.diff(homeworks[:count]) == []
+        rows = states.snapshot()
+        assert HomeworkStateMap(rows).snapshot() == rows, (
+            'Убедитесь, что снимок восстанавливается и в компактной, '
+            'и в обычной форме.'
+        )
+
+
+class TestNotifications:
+
+    def test_messages_fit_telegram_limit(self):
+        from constants import TELEGRAM_MESSAGE_LIMIT
+        from homework import build_notifications
+
+        homeworks = [record(number, 'approved') for number in range(200)]
+        notifications = build_notifications(homeworks)
+        assert len(notifications) > 1
+        assert all(
+            len(message) <= TELEGRAM_MESSAGE_LIMIT
+            for _, message in notifications
+        ), 'Убедитесь, что уведомление не длиннее лимита Telegram.'
+        assert [
+            homework for batch, _ in notifications for homework in batch
+        ] == homeworks
+
+    def test_delivered_parts_committed(self, monkeypatch, homework_module):
+        sent = []
+
+        def send_message(bot, message):
+            if sent:
+                return False
+            sent.append(message)
+            return True
+
+        monkeypatch.setattr(homework_module, 'send_message', send_message)
+        states = HomeworkStateMap()
+        homeworks = [record(number, 'approved') for number in range(200)]
+        assert homework_module.process_response(
+            {
+                'homeworks': [
+                    homework(number, 'approved') for number in range(200)
+                ],
+                'current_date': 1,
+            },
+            states, None
+        ) is None
+        assert 0 < len(states) < len(homeworks), (
+            'Убедитесь, что статусы из доставленных частей уведомления '
+            'не отправляются повторно.'
+        )
+        assert len(states.diff(homeworks)) == len(homeworks) - len(states)
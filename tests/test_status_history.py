@@ -0,0 +1,113 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import tests.check_utils as check_utils
+from status_history import StatusHistory, open_status_history
+from validation import HomeworkRecord
+
+
+def record(homework_id, status, date_updated='2024-01-01T10:00:00Z'):
+    return HomeworkRecord(homework_id, f'hw{homework_id}.zip', status,
+                          date_updated)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = StatusHistory(str(tmp_path / 'history.db'))
+    yield history
+    history.connection.close()
+
+
+class TestStatusHistory:
+
+    def test_rows_written_on_flush(self, history):
+        history.record('a', [record(1, 'reviewing'), record(2, 'approved')])
+        assert history.between(0, float('inf')) == [], (
+            'Убедитесь, что переходы пишутся в базу только при `flush`.'
+        )
+        assert history.flush() == 2
+        assert history.flush() == 0
+        assert history.connection.execute(
+            'PRAGMA journal_mode'
+        ).fetchone()[0] == 'wal'
+
+    def test_latest_status_per_homework(self, history):
+        history.record('a', [record(1, 'reviewing')], observed_at=10)
+        history.record('a', [record(1, 'approved', 'later')], observed_at=20)
+        history.record('a', [record(2, 'rejected')], observed_at=15)
+        history.record('b', [record(1, 'rejected')], observed_at=30)
+        history.flush()
+
+        assert history.latest('a') == [
+            ('a', 1, 'approved', 'later', 20),
+            ('a', 2, 'rejected', '2024-01-01T10:00:00Z', 15),
+        ]
+
+    def test_transitions_in_time_range(self, history):
+        for observed_at in range(10):
+            history.record('a', [record(observed_at, 'reviewing')],
+                           observed_at=observed_at)
+        history.flush()
+        assert [row[1] for row in history.between(3, 6)] == [3, 4, 5]
+
+    def test_failed_write_is_kept(self, history):
+        history.record('a', [record(1, 'reviewing')])
+        history.connection.close()
+        with pytest.raises(sqlite3.Error):
+            history.flush()
+        assert len(history._pending) == 1, (
+            'Убедитесь, что незаписанные переходы не теряются.'
+        )
+
+    def test_disabled_without_path(self):
+        assert open_status_history('') is None
+
+
+class TestHistoryRecording:
+
+    def test_engine_records_notified_changes(self, tmp_path,
+                                             data_with_new_hw_status):
+        from accounts import Account
+        from engine import PollingEngine
+
+        history = StatusHistory(str(tmp_path / 'history.db'))
+        engine = PollingEngine(
+            [Account('token', 1)], check_utils.MockTelegramBot(),
+            fetch=lambda timestamp, headers: data_with_new_hw_status,
+            send=lambda bot, chat_id, message: True, history=history
+        )
+        asyncio.run(engine.run_tick())
+        asyncio.run(engine.run_tick())
+        rows = history.between(0, float('inf'))
+        engine.close()
+
+        assert [row[:3] for row in rows] == [
+            (Account('token', 1).key, 777777777, 'approved')
+        ], (
+            'Убедитесь, что движок записывает в историю каждый '
+            'отправленный переход один раз.'
+        )
+
+    @pytest.mark.parametrize('delivered', [True, False])
+    def test_bot_records_delivered_changes(self, monkeypatch, history,
+                                           homework_module, delivered,
+                                           data_with_new_hw_status):
+        from status_diff import HomeworkStateMap
+
+        monkeypatch.setattr(
+            homework_module, 'send_message', lambda bot, message: delivered
+        )
+        homework_module.process_response(
+            data_with_new_hw_status, HomeworkStateMap(),
+            check_utils.MockTelegramBot(), history
+        )
+        history.flush()
+        rows = history.between(0, float('inf'))
+        assert [row[:3] for row in rows] == (
+            [(homework_module.ACCOUNT_KEY, 777777777, 'approved')] if delivered else []
+        ), (
+            'Убедитесь, что в историю попадают только доставленные '
+            'изменения статуса.'
+        )
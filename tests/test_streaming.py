@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+import homework
+import tests.check_utils as check_utils
+from exceptions import JsonTypeError, KeyNotFoundError, NotListTypeDataError
+from status_diff import HomeworkStateMap
+from streaming import HomeworkStream, should_stream
+from validation import HomeworkRecord
+
+
+def make_body(count, current_date=1700000000):
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'hw{number}.zip',
+                'status': 'approved',
+                'reviewer_comment': 'Принято!',
+                'date_updated': '2021-04-11T10:31:09Z',
+            }
+            for number in range(count)
+        ],
+        'current_date': current_date,
+    }).encode()
+
+
+def split(body, size):
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class Response:
+
+    def __init__(self, body, chunk_size=7):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.status_code = 200
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return iter(split(self.body, self.chunk_size))
+
+    def close(self):
+        self.closed = True
+
+
+class TestHomeworkStream:
+
+    @pytest.mark.parametrize('size', [1, 3, 64, 100000])
+    def test_records_survive_any_chunking(self, size):
+        stream = HomeworkStream(split(make_body(5), size))
+        records = list(stream)
+        assert [record.id for record in records] == list(range(5)), (
+            'Убедитесь, что записи читаются независимо от границ чанков.'
+        )
+        assert records[0] == HomeworkRecord(
+            0, 'hw0.zip', 'approved', '2021-04-11T10:31:09Z'
+        )
+        assert stream.get('current_date') == 1700000000
+
+    def test_current_date_before_homeworks(self):
+        body = b'{"current_date": 5, "homeworks": []}'
+        stream = HomeworkStream(split(body, 2))
+        assert list(stream) == []
+        assert stream.get('current_date') == 5
+
+    @pytest.mark.parametrize('number', [
+        '15', '-1.5', '1.25e3', '1E-2', '2e+10', '-0.5E+1'
+    ])
+    def test_numbers_split_at_any_byte(self, number):
+        body = (
+            f'{{"x": {number}, "homeworks": [], "current_date": {number}}}'
+        ).encode()
+        for cut in range(1, len(body)):
+            stream = HomeworkStream([body[:cut], body[cut:]])
+            assert list(stream) == []
+            assert stream.get('x') == json.loads(number), (
+                'Убедитесь, что дроби и экспоненты читаются независимо от '
+                'границ чанков.'
+            )
+            assert stream.get('current_date') == json.loads(number)
+
+    @pytest.mark.parametrize('body, error', [
+        (b'{"homeworks": [], "current_date": 1', JsonTypeError),
+        (b'{"homeworks": [{"id": }], "current_date": 1}', JsonTypeError),
+        (b'{"current_date": 1}', KeyNotFoundError),
+        (b'{"homeworks": []}', KeyNotFoundError),
+        (b'{"homeworks": {}, "current_date": 1}', NotListTypeDataError),
+    ])
+    def test_invalid_body(self, body, error):
+        with pytest.raises(error):
+            list(HomeworkStream(split(body, 4)))
+
+    def test_should_stream(self):
+        assert should_stream(0, 'always')
+        assert not should_stream(0, 'never')
+        assert should_stream(0, 'auto', now=10 ** 9)
+        assert not should_stream(10 ** 9, 'auto', now=10 ** 9)
+
+
+class TestProcessStream:
+
+    def test_changes_sent_in_batches(self, monkeypatch):
+        response = Response(make_body(45))
+        requested = {}
+
+        def request(method, url, **kwargs):
+            requested.update(kwargs)
+            return response
+
+        monkeypatch.setattr(
+            homework.get_transport().session, 'request', request
+        )
+        monkeypatch.setattr(homework, 'STREAM_BATCH_SIZE', 20)
+        sent = []
+        monkeypatch.setattr(
+            homework, 'send_message',
+            lambda bot, message: sent.append(message) or True
+        )
+        states = HomeworkStateMap()
+
+        stream = homework.stream_api_answer(0, {})
+        current_date = homework.process_stream(
+            stream, states, check_utils.MockTelegramBot()
+        )
+
+        assert requested.get('stream') is True, (
+            'Убедитесь, что потоковый запрос идёт с `stream=True`.'
+        )
+        assert current_date == 1700000000
+        assert len(sent) == 3, (
+            'Убедитесь, что изменения отправляются пачками по мере чтения.'
+        )
+        assert len(states) == 45
+        assert response.closed, 'Убедитесь, что ответ закрывается.'
+
+    def test_failed_send_keeps_cursor(self, monkeypatch):
+        response = Response(make_body(3))
+        monkeypatch.setattr(
+            homework.get_transport(), 'get', lambda **kwargs: response
+        )
+        monkeypatch.setattr(
+            homework, 'send_message', lambda bot, message: False
+        )
+        states = HomeworkStateMap()
+
+        stream = homework.stream_api_answer(0, {})
+        assert homework.process_stream(
+            stream, states, check_utils.MockTelegramBot()
+        ) is None
+        assert len(states) == 0
+        assert response.closed
@@ -0,0 +1,96 @@
+import asyncio
+import math
+import random
+import time
+
+import pytest
+
+import tests.check_utils as check_utils
+from accounts import Account
+from engine import PollingEngine
+from timing_wheel import TimingWheel
+
+
+class TestTimingWheel:
+
+    def test_timers_fire_in_time(self):
+        wheel = TimingWheel(0, tick=1, slot_bits=2, levels=3)
+        for key, when in (('a', 2.5), ('b', 3), ('c', 40), ('d', 0)):
+            wheel.schedule(key, when)
+        assert wheel.advance(0) == ['d']
+        assert wheel.advance(2.9) == [], 'Таймер не должен срабатывать рано.'
+        assert sorted(wheel.advance(3)) == ['a', 'b']
+        assert wheel.advance(39) == []
+        assert wheel.advance(40) == ['c'], (
+            'Убедитесь, что таймер с верхнего уровня срабатывает вовремя.'
+        )
+        assert len(wheel) == 0
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimingWheel(0, tick=1, slot_bits=2, levels=2)
+        wheel.schedule('a', 5)
+        wheel.schedule('b', 5)
+        assert wheel.cancel('a') and not wheel.cancel('a')
+        wheel.schedule('b', 9)
+        assert 'a' not in wheel and 'b' in wheel
+        assert wheel.advance(8) == []
+        assert wheel.advance(9) == ['b']
+
+    def test_timers_beyond_the_wheel(self):
+        wheel = TimingWheel(0, tick=1, slot_bits=1, levels=2)
+        wheel.schedule('far', 100)
+        fired = [now for now in range(101) if wheel.advance(now)]
+        assert fired == [100], (
+            'Таймер дальше последнего уровня должен сработать вовремя.'
+        )
+
+    def test_next_expiry_is_not_late(self):
+        wheel = TimingWheel(0, tick=1, slot_bits=2, levels=3)
+        assert wheel.next_expiry() is None
+        wheel.schedule('a', 37.2)
+        now = 0
+        while wheel.next_expiry() < 38:
+            now = wheel.next_expiry()
+            assert wheel.advance(now) == []
+        assert wheel.advance(wheel.next_expiry()) == ['a']
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_matches_sorted_due_times(self, seed):
+        rng = random.Random(seed)
+        wheel = TimingWheel(10.3, tick=0.5, slot_bits=3, levels=2)
+        due = {}
+        now = 10.3
+        for _ in range(500):
+            key = rng.randrange(40)
+            if rng.random() < 0.6:
+                due[key] = now + rng.uniform(-2, 200)
+                wheel.schedule(key, due[key])
+            else:
+                now += rng.uniform(0, 5)
+                for fired in wheel.advance(now):
+                    assert due.pop(fired) <= now
+                assert all(
+                    math.ceil(when / 0.5) > math.floor(now / 0.5)
+                    for when in due.values()
+                ), 'Таймер не должен опаздывать больше чем на один шаг.'
+
+
+class TestEngineTimers:
+
+    def test_polled_accounts_wait_for_their_timer(self, random_timestamp):
+        accounts = [Account(f'token-{i}', i) for i in range(3)]
+        engine = PollingEngine(
+            accounts, check_utils.MockTelegramBot(),
+            fetch=lambda timestamp, headers: {
+                'homeworks': [], 'current_date': random_timestamp
+            }
+        )
+        due = engine.due_accounts(time.monotonic())
+        assert sorted(due) == sorted(accounts)
+        asyncio.run(engine.run_tick(due))
+        assert engine.due_accounts(time.monotonic()) == [], (
+            'Опрошенный аккаунт не должен сразу снова стать готовым.'
+        )
+        engine.assign(accounts[:1] + [Account('token-new', 9)])
+        engine.close()
+        assert len(engine.timers) == 2
@@ -0,0 +1,66 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from transport import Transport
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"homeworks": [], "current_date": 0}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestTransport:
+
+    def test_connection_reused(self, local_server):
+        transport = Transport()
+        for _ in range(5):
+            assert transport.get(local_server).status_code == 200
+        stats = transport.stats()
+        transport.close()
+
+        assert stats['requests'] == 5
+        assert stats['handshakes'] == 1, (
+            'Убедитесь, что соединение переиспользуется между запросами.'
+        )
+        assert stats['reused'] == 4
+
+    def test_pool_size_configurable(self):
+        transport = Transport(pool_connections=2, pool_maxsize=7)
+        assert transport.adapter._pool_maxsize == 7
+        assert transport.adapter._pool_connections == 2
+        transport.close()
+
+    def test_telegram_uses_shared_session(self, monkeypatch):
+        from telebot import apihelper
+
+        from transport import share_with_telegram
+
+        monkeypatch.setattr(apihelper, 'session', None)
+        transport = Transport()
+        share_with_telegram(transport)
+        assert apihelper.session is transport.session, (
+            'Убедитесь, что TeleBot использует общую сессию.'
+        )
+        transport.close()
@@ -0,0 +1,99 @@
+import pytest
+
+from exceptions import (
+    KeyNotFoundError,
+    NotDictTypeDataError,
+    NotListTypeDataError,
+    UnknownHomeworkError,
+)
+from validation import (
+    Field,
+    HomeworkRecord,
+    compile_schema,
+    validate_homework,
+    validate_response,
+)
+
+
+class TestCompiledValidator:
+
+    def test_returns_typed_records(self, data_with_new_hw_status):
+        result = validate_response(data_with_new_hw_status)
+        homework = data_with_new_hw_status['homeworks'][0]
+        assert result['homeworks'] == [HomeworkRecord(
+            homework['id'], homework['homework_name'], homework['status'],
+            homework['date_updated']
+        )]
+        assert result['current_date'] == (
+            data_with_new_hw_status['current_date']
+        )
+
+    def test_optional_fields_may_be_missing(self):
+        record = validate_homework({'homework_name': 'hw', 'status': 'approved'})
+        assert record == HomeworkRecord(None, 'hw', 'approved', None)
+
+    @pytest.mark.parametrize('response, error', [
+        ([], NotDictTypeDataError),
+        ({'current_date': 1}, KeyNotFoundError),
+        ({'homeworks': []}, KeyNotFoundError),
+        ({'homeworks': {}, 'current_date': 1}, NotListTypeDataError),
+        ({'homeworks': [[]], 'current_date': 1}, NotDictTypeDataError),
+        ({'homeworks': [{'status': 'approved'}], 'current_date': 1},
+         KeyNotFoundError),
+        ({'homeworks': [{'homework_name': 'hw'}], 'current_date': 1},
+         KeyNotFoundError),
+        ({'homeworks': [{'homework_name': 'hw', 'status': 'lost'}],
+          'current_date': 1}, UnknownHomeworkError),
+    ])
+    def test_error_semantics_kept(self, response, error):
+        with pytest.raises(error):
+            validate_response(response)
+
+    def test_every_homework_validated(self):
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'unknown'},
+            ],
+            'current_date': 1,
+        }
+        with pytest.raises(UnknownHomeworkError):
+            validate_response(response)
+
+    def test_unsupported_schema_rejected(self):
+        with pytest.raises(ValueError):
+            compile_schema({'name': Field(type=str)}, 'The value')
+
+
+class TestCheckResponse:
+
+    def test_check_response_returns_records(self, homework_module,
+                                            data_with_new_hw_status):
+        homeworks = homework_module.check_response(data_with_new_hw_status)
+        assert isinstance(homeworks[0], HomeworkRecord)
+        assert homework_module.parse_status(homeworks[0]).endswith(
+            'Работа проверена: ревьюеру всё понравилось. Ура!'
+        )
+
+    def test_process_response_validates_once(self, monkeypatch,
+                                             homework_module,
+                                             data_with_new_hw_status):
+        from status_diff import HomeworkStateMap
+
+        calls = []
+        original = homework_module.check_response
+
+        def check_response(response):
+            calls.append(response)
+            return original(response)
+
+        monkeypatch.setattr(homework_module, 'check_response', check_response)
+        monkeypatch.setattr(
+            homework_module, 'send_message', lambda bot, message: True
+        )
+        homework_module.process_response(
+            data_with_new_hw_status, HomeworkStateMap(), None
+        )
+        assert len(calls) == 1, (
+            'Убедитесь, что ответ API проверяется один раз за опрос.'
+        )
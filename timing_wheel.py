@@ -0,0 +1,148 @@
+import math
+
+from constants import TIMER_LEVELS, TIMER_SLOT_BITS, TIMER_TICK
+
+READY = -1
+
+
+class TimingWheel:
+    """Hierarchical timing wheel of per-key timers.
+
+    Level 0 has `2 ** slot_bits` slots of `tick` seconds each, and every
+    next level has as many slots, each as long as the whole level below.
+    A timer goes to the lowest level whose slots reach its expiry and is
+    moved one level down when the clock gets to its slot, so inserting
+    and cancelling take O(1) and `advance` touches only the timers that
+    expire or move down. Timers never fire early and fire at most one
+    `tick` late; those further away than the top level can reach are
+    parked in its farthest slot and placed again when it comes up.
+    """
+
+    def __init__(self, start=0.0, tick=TIMER_TICK, slot_bits=TIMER_SLOT_BITS,
+                 levels=TIMER_LEVELS):
+        self.tick = tick
+        self.bits = slot_bits
+        self.slots = 1 << slot_bits
+        self.mask = self.slots - 1
+        self.levels = levels
+        self._wheels = [
+            [{} for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self._where = {}
+        self._ready = {}
+        self._current = math.floor(start / tick)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _place(self, key, expires):
+        """Puts a timer into the slot that covers its expiry tick."""
+        current = self._current
+        if expires <= current:
+            self._ready[key] = expires
+            self._where[key] = (READY, 0)
+            return
+        if expires - current < self.slots:
+            slot = expires & self.mask
+            self._wheels[0][slot][key] = expires
+            self._where[key] = (0, slot)
+            return
+        for level in range(1, self.levels):
+            shift = self.bits * level
+            if (expires >> shift) - (current >> shift) < self.slots:
+                slot = (expires >> shift) & self.mask
+                break
+        else:
+            level = self.levels - 1
+            shift = self.bits * level
+            slot = ((current >> shift) + self.mask) & self.mask
+        self._wheels[level][slot][key] = expires
+        self._where[key] = (level, slot)
+
+    def schedule(self, key, when):
+        """Sets the timer of `key` to fire at `when`, replacing the old one."""
+        if key in self._where:
+            self.cancel(key)
+        self._place(key, math.ceil(when / self.tick))
+
+    def cancel(self, key):
+        """Removes the timer of `key`; returns whether there was one."""
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        if level == READY:
+            del self._ready[key]
+        else:
+            del self._wheels[level][slot][key]
+        return True
+
+    def _cascade(self, level):
+        """Moves the timers of the current slot of `level` one level down."""
+        slot = (self._current >> (self.bits * level)) & self.mask
+        timers = self._wheels[level][slot]
+        if not timers:
+            return
+        self._wheels[level][slot] = {}
+        for key, expires in timers.items():
+            self._place(key, expires)
+
+    def _take_ready(self, expired):
+        """Moves the timers that are already due to `expired`."""
+        if self._ready:
+            expired.extend(self._ready)
+            self._ready = {}
+
+    def _step(self, expired):
+        """Moves the clock one tick on, collecting the expired timers."""
+        self._current += 1
+        for level in range(1, self.levels):
+            if self._current & ((1 << (self.bits * level)) - 1):
+                break
+            self._cascade(level)
+        self._take_ready(expired)
+        slot = self._current & self.mask
+        timers = self._wheels[0][slot]
+        if not timers:
+            return
+        self._wheels[0][slot] = {}
+        for key, expires in timers.items():
+            if expires > self._current:
+                self._place(key, expires)
+            else:
+                expired.append(key)
+
+    def advance(self, now):
+        """Moves the clock to `now` and returns the keys of expired timers."""
+        target = math.floor(now / self.tick)
+        expired = []
+        self._take_ready(expired)
+        while self._current < target:
+            if len(self._where) == len(expired):
+                self._current = target
+                break
+            self._step(expired)
+        for key in expired:
+            del self._where[key]
+        return expired
+
+    def next_expiry(self):
+        """Returns a time no later than the first expiry, `None` if idle.
+
+        It is the first non-empty slot of level 0 or the next time an
+        upper level moves its timers down, whichever comes first.
+        """
+        if not self._where:
+            return None
+        if self._ready:
+            return self._current * self.tick
+        for offset in range(1, self.slots + 1):
+            tick = self._current + offset
+            if self._wheels[0][tick & self.mask]:
+                return tick * self.tick
+            if not tick & self.mask:
+                return tick * self.tick
+        return (self._current + self.slots) * self.tick
@@ -0,0 +1,70 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+
+from constants import POOL_CONNECTIONS, POOL_MAXSIZE, TELEGRAM_TIMEOUT
+
+
+class Transport:
+    """HTTP session with pooled keep-alive connections.
+
+    `pool_connections` is the number of hosts whose pools are cached and
+    `pool_maxsize` the number of connections kept open to each host.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE):
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def request(self, method, url, **kwargs):
+        """Sends a request over a pooled connection."""
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Sends a GET request over a pooled connection."""
+        return self.request('GET', url, **kwargs)
+
+    def stats(self):
+        """Returns request, handshake and connection reuse counters."""
+        requests_count = handshakes = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_count += pool.num_requests
+                handshakes += pool.num_connections
+        return {
+            'requests': requests_count,
+            'handshakes': handshakes,
+            'reused': requests_count - handshakes,
+        }
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Returns the process-wide transport, creating it on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
+
+
+def share_with_telegram(transport, timeout=TELEGRAM_TIMEOUT):
+    """Makes TeleBot send its Bot API requests through `transport`."""
+    apihelper.session = transport.session
+    apihelper.CONNECT_TIMEOUT, apihelper.READ_TIMEOUT = timeout
@@ -0,0 +1,186 @@
+from collections import namedtuple
+from itertools import count
+from operator import itemgetter
+
+from constants import HOMEWORK_VERDICTS
+from exceptions import (
+    KeyNotFoundError,
+    NotDictTypeDataError,
+    NotListTypeDataError,
+    UnknownHomeworkError,
+)
+
+Field = namedtuple(
+    'Field', ('type', 'required', 'choices', 'items', 'record'),
+    defaults=(None, True, None, None, None)
+)
+HomeworkRecord = namedtuple(
+    'HomeworkRecord', ('id', 'homework_name', 'status', 'date_updated')
+)
+
+TYPE_ERRORS = {
+    dict: NotDictTypeDataError,
+    list: NotListTypeDataError,
+}
+
+HOMEWORK_SCHEMA = {
+    'id': Field(required=False),
+    'homework_name': Field(),
+    'status': Field(choices=HOMEWORK_VERDICTS),
+    'date_updated': Field(required=False),
+}
+RESPONSE_SCHEMA = {
+    'homeworks': Field(
+        type=list, items=HOMEWORK_SCHEMA, record=HomeworkRecord
+    ),
+    'current_date': Field(),
+}
+
+
+class _Compiler:
+    """Generates the source of a validator for a schema."""
+
+    def __init__(self):
+        self.lines = []
+        self.namespace = {
+            'NotDictTypeDataError': NotDictTypeDataError,
+            'KeyNotFoundError': KeyNotFoundError,
+            'UnknownHomeworkError': UnknownHomeworkError,
+            'new_tuple': tuple.__new__,
+        }
+        self._numbers = count()
+
+    def constant(self, value):
+        """Stores a value in the validator namespace and returns its name."""
+        name = f'_c{next(self._numbers)}'
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent, line):
+        """Adds a line of source."""
+        self.lines.append('    ' * indent + line)
+
+    def check_schema(self, schema, record):
+        """Rejects schemas the compiler cannot generate code for."""
+        for name, field in schema.items():
+            if field.type is not None and field.type not in TYPE_ERRORS:
+                raise ValueError(f'Unsupported type of the field "{name}".')
+            if record is not None and field.items is not None:
+                raise ValueError(
+                    f'Record schemas cannot contain list field "{name}".'
+                )
+
+    def required_checks(self, schema, var, subject, indent):
+        """Emits the checks of required keys."""
+        for name, field in schema.items():
+            if field.required:
+                self.emit(indent, f'if {name!r} not in {var}:')
+                self.emit(indent + 1, 'raise KeyNotFoundError({})'.format(
+                    self.constant(f'{subject} is missing the key "{name}".')
+                ))
+
+    def field_checks(self, name, field, item, indent):
+        """Emits the type and allowed values checks of one field."""
+        if field.type is not None:
+            self.emit(indent, f'if not isinstance({item}, '
+                              f'{self.constant(field.type)}):')
+            self.emit(indent + 1, 'raise {}({} + str(type({})))'.format(
+                self.constant(TYPE_ERRORS[field.type]), self.constant(
+                    f'The key "{name}" must contain a '
+                    f'{field.type.__name__}, now: '
+                ), item
+            ))
+        if field.choices is not None:
+            self.emit(indent, f'if {item} not in '
+                              f'{self.constant(field.choices)}:')
+            message = self.constant(f'Unknown homework {name}: ')
+            self.emit(
+                indent + 1,
+                f'raise UnknownHomeworkError({message} + str({item}))'
+            )
+
+    def value(self, schema, var, subject, record, indent):
+        """Emits the checks of `var` and returns the result expression."""
+        self.check_schema(schema, record)
+        self.emit(indent, f'if not isinstance({var}, dict):')
+        self.emit(indent + 1, 'raise NotDictTypeDataError({} + str(type({})))'
+                  .format(self.constant(
+                      f'{subject} must be a dictionary, now: '), var))
+        if record is not None:
+            return self.record(schema, var, subject, record, indent)
+
+        self.required_checks(schema, var, subject, indent)
+        results = {}
+        for name, field in schema.items():
+            item = f'{var}[{name!r}]' if field.required else (
+                f'{var}.get({name!r})'
+            )
+            self.field_checks(name, field, item, indent)
+            if field.items is not None:
+                item = self.items(field, item, name, indent)
+            results[name] = item
+        return '{' + ', '.join(
+            f'{name!r}: {expression}' for name, expression in results.items()
+        ) + '}'
+
+    def record(self, schema, var, subject, record, indent):
+        """Emits the checks of `var` and returns a `record` expression.
+
+        All fields are read with one `itemgetter` call; only when some key
+        is absent the slow path checks the required keys one by one and
+        reads the optional ones with `get`.
+        """
+        number = next(self._numbers)
+        fields = f'fields_{number}'
+        self.emit(indent, 'try:')
+        getter = self.constant(itemgetter(*schema))
+        self.emit(indent + 1, f'{fields} = {getter}({var})')
+        self.emit(indent, 'except KeyError:')
+        self.required_checks(schema, var, subject, indent + 1)
+        self.emit(indent + 1, f'{fields} = (' + ''.join(
+            f'{var}.get({name!r}), ' for name in schema
+        ) + ')')
+        for index, (name, field) in enumerate(schema.items()):
+            self.field_checks(name, field, f'{fields}[{index}]', indent)
+        return f'new_tuple({self.constant(record)}, {fields})'
+
+    def items(self, field, source, name, indent):
+        """Emits a loop validating every list element into a list."""
+        number = next(self._numbers)
+        result, element = f'items_{number}', f'item_{number}'
+        self.emit(indent, f'{result} = []')
+        self.emit(indent, f'append_{number} = {result}.append')
+        self.emit(indent, f'for {element} in {source}:')
+        expression = self.value(
+            field.items, element, f'The key "{name}" item', field.record,
+            indent + 1
+        )
+        self.emit(indent + 1, f'append_{number}({expression})')
+        return result
+
+
+def compile_schema(schema, subject, record=None):
+    """Builds a validator for dictionaries described by `schema`.
+
+    The schema is turned into the source of one function when the module
+    is imported, so a value is checked in a single pass without walking
+    the schema again. The validator returns `record` built from the schema
+    fields, or a dictionary of them if no record type is given; list fields
+    with `items` are validated element by element into their `record`.
+    """
+    compiler = _Compiler()
+    compiler.emit(0, 'def validate(value):')
+    expression = compiler.value(schema, 'value', subject, record, 1)
+    compiler.emit(1, f'return {expression}')
+    source = '\n'.join(compiler.lines)
+    exec(compile(source, f'<validator {subject}>', 'exec'),
+         compiler.namespace)
+    validate = compiler.namespace['validate']
+    validate.source = source
+    return validate
+
+
+validate_homework = compile_schema(
+    HOMEWORK_SCHEMA, 'The homework', HomeworkRecord
+)
+validate_response = compile_schema(RESPONSE_SCHEMA, 'The API response')